@@ -0,0 +1,106 @@
+"""
+Micro-benchmark do caminho de leitura do banco de dados até o corpo JSON da resposta.
+
+Compara, por linha:
+- antes: o antigo `load_data_from_db` (ORM -> Pydantic -> dict -> DataFrame),
+  reproduzido aqui, seguido do `df.to_dict` + schema Pydantic das rotas e da
+  serialização do FastAPI;
+- depois: `load_records_from_db` (tuplas do SQLite) seguido de um único `json.dumps`.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python tech_challenge/benchmarks/bench_load_data.py [--rows 2000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+# O banco de dados do benchmark é criado em uma pasta temporária
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench_load_data_")
+
+import pandas as pd  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from icecream import ic  # noqa: E402
+
+from tech_challenge.schemas.api_schemas import ImportacaoSchema  # noqa: E402
+from tech_challenge.services.db import StoreSession  # noqa: E402
+from tech_challenge.utils.db import (  # noqa: E402
+    load_records_from_db,
+    partition_filter,
+    save_data_in_db,
+    table_mapping,
+)
+
+# Os logs do icecream custam ~1 ms por chamada e distorceriam as medições
+ic.disable()
+
+TABLE = "importacao"
+SUB_TABLE = "Vinhos de mesa"
+YEAR = 2023
+
+
+def load_data_from_db() -> pd.DataFrame:
+    # Caminho de leitura antigo, mantido só como referência de comparação
+    model, schema = table_mapping[TABLE]
+    session = StoreSession()
+    try:
+        result = (
+            session.query(model)
+            .filter(partition_filter(model, SUB_TABLE, YEAR))
+            .order_by(model.id)
+            .all()
+        )
+        return pd.DataFrame([schema.from_orm(row).dict(by_alias=True) for row in result])
+    finally:
+        session.close()
+
+
+def before() -> bytes:
+    df = load_data_from_db()
+    response = [ImportacaoSchema(**row) for row in df.to_dict(orient="records")]
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def after() -> bytes:
+    records = load_records_from_db(table=TABLE, year=YEAR, sub_table=SUB_TABLE)
+    return json.dumps(records).encode("utf-8")
+
+
+def measure(fn, repeat: int) -> float:
+    fn()  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = pd.DataFrame(
+        {
+            "Países": [f"País {i}" for i in range(args.rows)],
+            "Quantidade (Kg)": [f"{i * 1000:,}".replace(",", ".") for i in range(args.rows)],
+            "Valor (US$)": [str(i * 7) if i % 10 else "-" for i in range(args.rows)],
+        }
+    )
+    save_data_in_db(df, table=TABLE, year=YEAR, sub_table=SUB_TABLE)
+
+    assert json.loads(before()) == json.loads(after()), "Os dois caminhos divergem"
+
+    before_s = measure(before, args.repeat)
+    after_s = measure(after, args.repeat)
+    print(f"linhas: {args.rows}")
+    print(f"antes : {before_s * 1e6 / args.rows:8.2f} µs/linha ({before_s * 1e3:.2f} ms)")
+    print(f"depois: {after_s * 1e6 / args.rows:8.2f} µs/linha ({after_s * 1e3:.2f} ms)")
+    print(f"ganho : {before_s / after_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
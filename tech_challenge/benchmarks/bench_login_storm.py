@@ -0,0 +1,150 @@
+"""
+Benchmark de carga: latência das rotas de dados durante uma rajada de logins.
+
+Sobe o servidor falso da Embrapa e a API (uvicorn, em um subprocesso), aquece o
+banco com os dados de uma aba e mede a latência de `GET /producao` em duas fases:
+- base: só as requisições de dados;
+- rajada: as mesmas requisições enquanto `--logins` clientes fazem `POST /login`
+  continuamente (cada um custa um bcrypt com `BCRYPT_ROUNDS`).
+
+Com o bcrypt no pool dedicado `password_hasher`, os percentis da rota de dados
+devem ficar próximos nas duas fases, e o excesso de logins é recusado com 429.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python tech_challenge/benchmarks/bench_login_storm.py [--seconds 5] [--logins 64]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+from fake_embrapa import start_server  # noqa: E402
+
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary(latencies: list[float]) -> str:
+    ms = [value * 1000 for value in latencies]
+    return (
+        f"n={len(ms)} p50={percentile(ms, 0.5):.1f}ms p95={percentile(ms, 0.95):.1f}ms "
+        f"p99={percentile(ms, 0.99):.1f}ms média={statistics.mean(ms):.1f}ms"
+    )
+
+
+async def data_worker(client, headers, deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/producao", params={"year": 2023}, headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def login_worker(client, deadline, statuses):
+    while time.perf_counter() < deadline:
+        response = await client.post(
+            "/login", json={"username": USERNAME, "password": PASSWORD}
+        )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 429:
+            await asyncio.sleep(float(response.headers.get("retry-after", "1")))
+
+
+async def run(base_url: str, args) -> None:
+    limits = httpx.Limits(max_connections=args.logins + args.readers + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        await client.post("/register", json={"username": USERNAME, "password": PASSWORD})
+        login = await client.post("/login", json={"username": USERNAME, "password": PASSWORD})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        # Aquecimento: faz o scraping e popula o banco e o cache de respostas
+        (await client.get("/producao", params={"year": 2023}, headers=headers)).raise_for_status()
+
+        base = []
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(data_worker(client, headers, deadline, base) for _ in range(args.readers))
+        )
+
+        storm, statuses = [], {}
+        deadline = time.perf_counter() + args.seconds
+        await asyncio.gather(
+            *(data_worker(client, headers, deadline, storm) for _ in range(args.readers)),
+            *(login_worker(client, deadline, statuses) for _ in range(args.logins)),
+        )
+
+        stats = (await client.get("/stats", headers=headers)).json()["password_hasher"]
+
+    print(f"dados (base):    {summary(base)}")
+    print(f"dados (rajada):  {summary(storm)}")
+    print(f"logins:          {dict(sorted(statuses.items()))}")
+    print(f"password_hasher: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    embrapa = start_server(port=0)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATA_DIR=tempfile.mkdtemp(prefix="bench_login_storm_"),
+        EMBRAPA_URL_PREFIX=f"http://127.0.0.1:{embrapa.server_port}/index.php?",
+        BCRYPT_ROUNDS=str(args.rounds),
+    )
+    api = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "tech_challenge.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        asyncio.run(run(base_url, args))
+    finally:
+        api.terminate()
+        api.wait()
+        embrapa.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark do parser das páginas da Embrapa.
+
+Compara a implementação anterior de `parse_first_table` (BeautifulSoup com
+"html.parser", mantida como referência em `tests/test_parser.py`) com a atual (lxml
+em modo streaming). A equivalência das duas é verificada pelos testes.
+
+Por padrão usa páginas geradas pelo servidor de testes (`tests/fake_embrapa.py`) para
+todas as tabelas; páginas salvas do site real podem ser passadas com --html.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python tech_challenge/benchmarks/bench_parser.py [--html pagina1.html ...] [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from icecream import ic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tech_challenge.utils.scraper import parse_first_table  # noqa: E402
+from tests.fake_embrapa import HEADERS, render_page  # noqa: E402
+from tests.test_parser import parse_first_table_bs4  # noqa: E402
+
+# Os logs do icecream custam ~1 ms por chamada e distorceriam as medições
+ic.disable()
+
+
+def load_pages(paths: list[str]) -> dict[str, str]:
+    if paths:
+        pages = {}
+        for path in paths:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages[os.path.basename(path)] = f.read()
+        return pages
+
+    pages = {}
+    for opcao in HEADERS:
+        for subopcao in ("", "subopt_01"):
+            pages[f"{opcao}{'_' + subopcao if subopcao else ''}"] = render_page(
+                opcao, subopcao, "2023"
+            )
+    return pages
+
+
+def measure(fn, html: str, repeat: int) -> float:
+    fn(html)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--html", nargs="*", default=[], help="Páginas HTML salvas.")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    pages = load_pages(args.html)
+    total_before = total_after = 0.0
+
+    print(f"{'página':<22} {'KB':>6} {'bs4 (ms)':>10} {'lxml (ms)':>10} {'ganho':>7}")
+    for name, html in pages.items():
+        before = measure(parse_first_table_bs4, html, args.repeat)
+        after = measure(parse_first_table, html, args.repeat)
+        total_before += before
+        total_after += after
+        print(
+            f"{name:<22} {len(html) / 1024:6.1f} {before * 1e3:10.3f} "
+            f"{after * 1e3:10.3f} {before / after:6.1f}x"
+        )
+
+    print(
+        f"{'total':<22} {'':>6} {total_before * 1e3:10.3f} {total_after * 1e3:10.3f} "
+        f"{total_before / total_after:6.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Suíte de benchmarks reprodutível contra o servidor falso da Embrapa.
+
+Executa, com dados determinísticos (`tests/fake_embrapa.py`, ou páginas gravadas do
+site real com --pages):
+- micro-benchmarks de `parse_first_table`, `save_data_in_db` e `load_records_from_db`,
+  em ms por chamada;
+- um cenário de carga HTTP por rota de dados, com a API rodando em um subprocesso
+  uvicorn, reportando p50/p95/p99 (ms), requisições por segundo e erros.
+
+Os resultados são gravados em JSON (--output). Com --baseline, compara com um
+resultado anterior e termina com código 1 se alguma medição piorar mais que
+--tolerance (padrão 20%), para detectar regressões entre versões.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python tech_challenge/benchmarks/bench_suite.py --output resultados.json
+    python tech_challenge/benchmarks/bench_suite.py --baseline resultados.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# O banco de dados dos micro-benchmarks é criado em uma pasta temporária
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="bench_suite_")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import httpx  # noqa: E402
+from icecream import ic  # noqa: E402
+
+from tech_challenge.utils.db import (  # noqa: E402
+    load_records_from_db,
+    save_data_in_db,
+)
+from tech_challenge.utils.scraper import parse_first_table  # noqa: E402
+from tests.fake_embrapa import page_file_name, render_page, start_server  # noqa: E402
+
+# Os logs do icecream custam ~1 ms por chamada e distorceriam as medições
+ic.disable()
+
+YEAR = 2023
+
+# Páginas usadas nos micro-benchmarks: (tabela, sub-tabela, opcao, subopcao)
+MICRO_PAGES = [
+    ("producao", None, "opt_02", ""),
+    ("processamento", "Viníferas", "opt_03", "subopt_01"),
+    ("comercializacao", None, "opt_04", ""),
+    ("importacao", "Vinhos de mesa", "opt_05", "subopt_01"),
+    ("exportacao", "Vinhos de mesa", "opt_06", "subopt_01"),
+]
+
+# Cenários de carga: nome -> (caminho, parâmetros)
+SCENARIOS = {
+    "producao": ("/producao", {"year": YEAR}),
+    "producao_ndjson": ("/producao", {"year": YEAR, "format": "ndjson"}),
+    "producao_page": ("/producao", {"year": YEAR, "limit": 10}),
+    "producao_series": ("/producao/series", {"year_from": 2019, "year_to": YEAR}),
+    "processamento": ("/processamento", {"sub_table": "Viníferas", "year": YEAR}),
+    "processamento_series": (
+        "/processamento/series",
+        {"sub_table": "Viníferas", "year_from": 2019, "year_to": YEAR},
+    ),
+    "comercializacao": ("/comercializacao", {"year": YEAR}),
+    "comercializacao_series": (
+        "/comercializacao/series",
+        {"year_from": 2019, "year_to": YEAR},
+    ),
+    "importacao": ("/importacao", {"sub_table": "Vinhos de mesa", "year": YEAR}),
+    "importacao_csv": (
+        "/importacao",
+        {"sub_table": "Vinhos de mesa", "year": YEAR, "format": "csv"},
+    ),
+    "importacao_filter": (
+        "/importacao",
+        {"sub_table": "Vinhos de mesa", "year": YEAR, "prefix": "A"},
+    ),
+    "importacao_series": (
+        "/importacao/series",
+        {"sub_table": "Vinhos de mesa", "year_from": 2019, "year_to": YEAR},
+    ),
+    "importacao_totals": (
+        "/importacao/totals",
+        {"sub_table": "Vinhos de mesa", "year_from": 2019, "year_to": YEAR},
+    ),
+    "importacao_top": (
+        "/importacao/top",
+        {"sub_table": "Vinhos de mesa", "year_from": 2019, "year_to": YEAR},
+    ),
+    "importacao_yoy": (
+        "/importacao/yoy",
+        {"sub_table": "Vinhos de mesa", "year_from": 2020, "year_to": YEAR},
+    ),
+    "exportacao": ("/exportacao", {"sub_table": "Vinhos de mesa", "year": YEAR}),
+    "exportacao_series": (
+        "/exportacao/series",
+        {"sub_table": "Vinhos de mesa", "year_from": 2019, "year_to": YEAR},
+    ),
+    "exportacao_top": (
+        "/exportacao/top",
+        {"sub_table": "Vinhos de mesa", "year_from": 2019, "year_to": YEAR},
+    ),
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timings_ms(fn, repeat: int) -> dict:
+    fn()  # aquecimento
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "p50_ms": round(percentile(samples, 0.5), 4),
+        "p95_ms": round(percentile(samples, 0.95), 4),
+        "n": repeat,
+    }
+
+
+def load_page(pages_dir, opcao: str, subopcao: str) -> str:
+    if pages_dir:
+        path = os.path.join(pages_dir, page_file_name(opcao, subopcao, YEAR))
+        if os.path.exists(path):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                return f.read()
+    return render_page(opcao, subopcao, str(YEAR))
+
+
+def run_micro(args) -> dict:
+    results = {}
+    for table, sub_table, opcao, subopcao in MICRO_PAGES:
+        html = load_page(args.pages, opcao, subopcao)
+        df = parse_first_table(html)
+        name = table if sub_table is None else f"{table}[{sub_table}]"
+        results[f"parse_first_table/{name}"] = timings_ms(
+            lambda: parse_first_table(html), args.repeat
+        )
+        results[f"save_data_in_db/{name}"] = timings_ms(
+            lambda: save_data_in_db(df, table=table, year=YEAR, sub_table=sub_table),
+            args.repeat,
+        )
+        results[f"load_records_from_db/{name}"] = timings_ms(
+            lambda: load_records_from_db(table=table, year=YEAR, sub_table=sub_table),
+            args.repeat,
+        )
+    return results
+
+
+async def load_scenario(client, headers, path, params, seconds, concurrency) -> dict:
+    latencies, errors = [], 0
+
+    async def worker(deadline):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.get(path, params=params, headers=headers)
+            await response.aread()
+            if response.status_code >= 400:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+async def run_load_scenarios(base_url: str, args) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        credentials = {"username": "bench", "password": "bench-password"}
+        await client.post("/register", json=credentials)
+        login = await client.post("/login", json=credentials)
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        results = {}
+        for name, (path, params) in SCENARIOS.items():
+            if args.only and name not in args.only:
+                continue
+            # Aquecimento: faz o scraping e popula o banco e os caches
+            (await client.get(path, params=params, headers=headers)).raise_for_status()
+            results[name] = await load_scenario(
+                client, headers, path, params, args.seconds, args.concurrency
+            )
+            print(f"  {name:<24} {results[name]}", file=sys.stderr)
+        return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_load(args) -> dict:
+    embrapa = start_server(port=0, pages_dir=args.pages)
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATA_DIR=tempfile.mkdtemp(prefix="bench_suite_api_"),
+        EMBRAPA_URL_PREFIX=f"http://127.0.0.1:{embrapa.server_port}/index.php?",
+        BCRYPT_ROUNDS="4",
+    )
+    api = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "tech_challenge.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/")
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        return asyncio.run(run_load_scenarios(base_url, args))
+    finally:
+        api.terminate()
+        api.wait()
+        embrapa.shutdown()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lista as medições que pioraram mais que `tolerance` em relação ao `baseline`."""
+    regressions = []
+    checks = [("micro", "mean_ms", False), ("load", "p95_ms", False), ("load", "rps", True)]
+    for section, metric, higher_is_better in checks:
+        for name, current in results.get(section, {}).items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous or not previous.get(metric):
+                continue
+            ratio = current[metric] / previous[metric]
+            worse = ratio < 1 - tolerance if higher_is_better else ratio > 1 + tolerance
+            if worse:
+                regressions.append(
+                    f"{section}/{name} {metric}: {previous[metric]} -> {current[metric]}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--baseline", help="Resultado anterior para comparação.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--pages", help="Pasta com páginas gravadas do site real.")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", nargs="*", help="Cenários de carga a executar.")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pages": "recorded" if args.pages else "generated",
+            "repeat": args.repeat,
+            "seconds": args.seconds,
+            "concurrency": args.concurrency,
+        },
+        "micro": {} if args.skip_micro else run_micro(args),
+        "load": {} if args.skip_load else run_load(args),
+    }
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,88 @@
-from datetime import datetime
-
-from fastapi import FastAPI
-from icecream import ic
-
-from tech_challenge.routes.comercializacao import router as comercializacao_router
-from tech_challenge.routes.exportacao import router as exportacao_router
-from tech_challenge.routes.importacao import router as importacao_router
-from tech_challenge.routes.login import router as login_router
-from tech_challenge.routes.processamento import router as processamento_router
-from tech_challenge.routes.producao import router as producao_router
-from tech_challenge.routes.register import router as register_router
-
-app = FastAPI(
-    title="API Vitivinicultura Embrapa",
-    description="Fornece acesso público aos dados de vitivinicultura da Embrapa.",
-    version="1.0.0",
-)
-
-# Registro das rotas
-app.include_router(register_router)
-app.include_router(login_router)
-app.include_router(producao_router)
-app.include_router(processamento_router)
-app.include_router(comercializacao_router)
-app.include_router(importacao_router)
-app.include_router(exportacao_router)
-
-
-ic("✅ API Vitivinicultura Embrapa está no ar!")
-
-
-@app.get("/")
-def read_root():
-    """
-    Endpoint raiz da API - fornece informações básicas do serviço.
-    """
-    return {
-        "nome": "API de Vitivinicultura - Embrapa",
-        "descricao": "Esta API fornece acesso estruturado aos dados públicos da vitivinicultura brasileira, extraídos do site da Embrapa.",
-        "status": "Online",
-        "documentacao": "http://127.0.0.1:8000/docs",
-        "ultima_atualizacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "endpoints_disponiveis": {
-            "/producao": "Produção de uvas e vinhos no Brasil",
-            "/processamento": "Dados de processamento de uva",
-            "/comercializacao": "Comercialização de produtos vitivinícolas",
-            "/importacao": "Importações de vinhos e derivados",
-            "/exportacao": "Exportações do setor vitivinícola",
-        },
-        "github_repo": "https://github.com/ML-Group-37/tech_challenge_01",
-        "mantenedores": ["Antônio", "Iury", "Pedro", "Robson", "Thiago"],
-    }
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from fastapi import FastAPI
+from icecream import ic
+
+from tech_challenge.routes.comercializacao import router as comercializacao_router
+from tech_challenge.routes.exportacao import router as exportacao_router
+from tech_challenge.routes.importacao import router as importacao_router
+from tech_challenge.routes.login import router as login_router
+from tech_challenge.routes.metrics import router as metrics_router
+from tech_challenge.routes.processamento import router as processamento_router
+from tech_challenge.routes.producao import router as producao_router
+from tech_challenge.routes.register import router as register_router
+from tech_challenge.routes.stats import router as stats_router
+from tech_challenge.services.hashing import password_hasher
+from tech_challenge.services.metrics import MetricsMiddleware
+from tech_challenge.services.timing import ServerTimingMiddleware
+from tech_challenge.services.write_queue import store_writer
+from tech_challenge.utils.scraper import close_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Gerencia o ciclo de vida da aplicação: na inicialização, inicia a fila de escrita
+    em segundo plano (regravando as escritas que ficaram pendentes); no desligamento,
+    fecha o cliente HTTP compartilhado e o pool de hashes de senha e grava as escritas
+    pendentes.
+    """
+    store_writer.start()
+    yield
+    await close_http_client()
+    password_hasher.shutdown()
+    store_writer.shutdown()
+
+
+app = FastAPI(
+    title="API Vitivinicultura Embrapa",
+    description="Fornece acesso público aos dados de vitivinicultura da Embrapa.",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Cabeçalho Server-Timing com a duração das etapas de cada requisição (ex: auth)
+app.add_middleware(ServerTimingMiddleware)
+
+# Histograma de latência das requisições por rota, exportado em /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Registro das rotas
+app.include_router(register_router)
+app.include_router(login_router)
+app.include_router(producao_router)
+app.include_router(processamento_router)
+app.include_router(comercializacao_router)
+app.include_router(importacao_router)
+app.include_router(exportacao_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
+
+
+ic("✅ API Vitivinicultura Embrapa está no ar!")
+
+
+@app.get("/")
+def read_root():
+    """
+    Endpoint raiz da API - fornece informações básicas do serviço.
+    """
+    return {
+        "nome": "API de Vitivinicultura - Embrapa",
+        "descricao": "Esta API fornece acesso estruturado aos dados públicos da vitivinicultura brasileira, extraídos do site da Embrapa.",
+        "status": "Online",
+        "documentacao": "http://127.0.0.1:8000/docs",
+        "ultima_atualizacao": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "endpoints_disponiveis": {
+            "/producao": "Produção de uvas e vinhos no Brasil",
+            "/processamento": "Dados de processamento de uva",
+            "/comercializacao": "Comercialização de produtos vitivinícolas",
+            "/importacao": "Importações de vinhos e derivados",
+            "/exportacao": "Exportações do setor vitivinícola",
+            "/stats": "Estatísticas internas de cache",
+            "/metrics": "Métricas no formato Prometheus",
+        },
+        "github_repo": "https://github.com/ML-Group-37/tech_challenge_01",
+        "mantenedores": ["Antônio", "Iury", "Pedro", "Robson", "Thiago"],
+    }
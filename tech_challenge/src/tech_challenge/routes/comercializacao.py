@@ -1,15 +1,19 @@
+import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
 from icecream import ic
 
 from tech_challenge.schemas.api_schemas import ComercializacaoSchema
-from tech_challenge.services import scraper
-from tech_challenge.services.auth import verify_token
+from tech_challenge.schemas.sub_tables import ExportFormat, ResponseFormat
+from tech_challenge.services import exports, scraper
+from tech_challenge.services.auth import require_auth
+from tech_challenge.utils.db import MAX_PAGE_SIZE
+from tech_challenge.utils.responses import dataset_response, page_response, stream_response
+from tech_challenge.utils.scraper import MAX_YEAR, MIN_YEAR
 
 router = APIRouter()
-security = HTTPBearer()
 
 
 @router.get(
@@ -20,12 +24,31 @@ security = HTTPBearer()
     "Utiliza fallback para db local em caso de falha.",
     tags=["Dados"],
 )
-def get_comercializacao(year: Optional[int] = None, credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer())):
+async def get_comercializacao(
+    request: Request,
+    year: Optional[int] = None,
+    response_format: ResponseFormat = Query(ResponseFormat.json, alias="format"),
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    produto: Optional[str] = Query(None, alias="Produto"),
+    prefix: Optional[str] = None,
+    min_quantidade: Optional[int] = None,
+    token_data: dict = Depends(require_auth),
+):
     """
     Recupera dados de comercialização para um determinado ano.
     Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
         year (Optional[int], opcional): Ano para o qual os dados de comercialização serão recuperados. Deve estar entre 1970 e 2024. Padrão é None.
-        credentials (HTTPAuthorizationCredentials): Credenciais do token Bearer para autenticação, fornecidas automaticamente por injeção de dependência.
+        response_format (ResponseFormat, opcional): Formato da resposta (parâmetro "format"): "json" (padrão) ou, em streaming, "ndjson" ou "csv".
+        fields (Optional[str], opcional): Colunas a retornar, separadas por vírgula (ex: "Produto"). Padrão é todas.
+        limit (Optional[int], opcional): Tamanho da página, entre 1 e MAX_PAGE_SIZE. O cursor da próxima página vem no cabeçalho X-Next-Cursor.
+        cursor (Optional[str], opcional): Cursor devolvido pela página anterior.
+        produto (Optional[str], opcional): Filtra pelo valor exato de "Produto" (parâmetro "Produto").
+        prefix (Optional[str], opcional): Filtra os registros cujo "Produto" começa com o prefixo.
+        min_quantidade (Optional[int], opcional): Quantidade mínima.
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
     Raises:
         HTTPException: Se o ano não estiver no intervalo válido (1970-2024), retorna 400 Bad Request.
         HTTPException: Se ocorrer um erro de execução durante a recuperação dos dados, retorna 503 Service Unavailable.
@@ -33,9 +56,6 @@ def get_comercializacao(year: Optional[int] = None, credentials: HTTPAuthorizati
         List[ComercializacaoSchema]: Lista de entradas de dados de comercialização para o ano especificado.
     """
 
-    token = credentials.credentials
-    verify_token(token)
-
     try:
         if year and (year < 1970 or year > 2024):
             raise HTTPException(
@@ -43,9 +63,158 @@ def get_comercializacao(year: Optional[int] = None, credentials: HTTPAuthorizati
                 detail="Year must be between 1970 and 2024.",
             )
 
-        df = scraper.get_comercializacao_data(year)
+        field_list = None
+        if fields:
+            field_list = [field.strip() for field in fields.split(",") if field.strip()]
+        filters = {
+            "item": produto,
+            "prefix": prefix,
+            "min_quantidade": min_quantidade,
+        }
+        if limit is not None and (limit < 1 or limit > MAX_PAGE_SIZE):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"limit must be between 1 and {MAX_PAGE_SIZE}.",
+            )
+
+        if response_format is not ResponseFormat.json:
+            records, columns = await scraper.get_stream_data(
+                nome="comercializacao",
+                year=year,
+                fields=field_list,
+                **filters,
+            )
+            return stream_response(records, response_format.value, columns)
+
+        if field_list or limit is not None or cursor or any(
+            value is not None for value in filters.values()
+        ):
+            records, next_cursor = await scraper.get_page_data(
+                nome="comercializacao",
+                year=year,
+                fields=field_list,
+                limit=limit,
+                cursor=cursor,
+                **filters,
+            )
+            return page_response(records, next_cursor)
+
+        payload = await scraper.get_comercializacao_data(year)
         ic("Dados de Comercialização carregados com sucesso.")
-        return [ComercializacaoSchema(**row) for row in df.to_dict(orient="records")]
+        return dataset_response(request, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except RuntimeError as e:
         ic(f"Erro em /comercializacao: {e}")
         raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/comercializacao/series",
+    summary="Série histórica de comercialização",
+    description="Retorna os dados da aba Comercialização da Embrapa para um intervalo de anos "
+    "em uma única resposta, em formato longo (coluna Ano) ou pivotado por ano.",
+    tags=["Dados"],
+)
+async def get_comercializacao_series(
+    request: Request,
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    pivot: bool = False,
+    response_format: ResponseFormat = Query(ResponseFormat.json, alias="format"),
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Recupera a série histórica de comercialização entre dois anos, lida do banco de dados em uma única consulta.
+    Anos ainda não salvos são obtidos da Embrapa concorrentemente.
+    Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
+        year_from (int, opcional): Primeiro ano da série. Padrão é 1970.
+        year_to (int, opcional): Último ano da série. Padrão é 2024.
+        pivot (bool, opcional): Se True, retorna uma linha por item com os valores indexados por ano. Padrão é False.
+        response_format (ResponseFormat, opcional): Formato da resposta (parâmetro "format"): "json" (padrão) ou, em streaming, "ndjson" ou "csv" (sem pivot).
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        List[dict]: Registros da série, com a coluna "Ano" ou pivotados por ano.
+    Raises:
+        HTTPException: Se o intervalo de anos for inválido.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if year_from < MIN_YEAR or year_to > MAX_YEAR or year_from > year_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        if response_format is not ResponseFormat.json:
+            if pivot:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="pivot is only available with format=json.",
+                )
+            records, columns = await scraper.get_stream_data(
+                nome="comercializacao",
+                year_from=year_from,
+                year_to=year_to,
+            )
+            return stream_response(records, response_format.value, columns)
+
+        payload = await scraper.get_series_data(
+            nome="comercializacao",
+            year_from=year_from,
+            year_to=year_to,
+            pivot=pivot,
+        )
+        ic("Série de Comercialização carregada com sucesso.")
+        return dataset_response(request, payload)
+    except RuntimeError as e:
+        ic(f"Erro em /comercializacao/series: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/comercializacao/export",
+    summary="Exportação de comercialização em Arrow/Parquet",
+    description="Retorna os dados da aba Comercialização da Embrapa de um ou vários anos como "
+    "stream Arrow IPC ou arquivo Parquet, gerado a partir do banco de dados.",
+    tags=["Exportação"],
+)
+async def get_comercializacao_export(
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    export_format: ExportFormat = Query(ExportFormat.parquet, alias="format"),
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Exporta os dados de comercialização entre dois anos (inclusive) em Arrow IPC ou Parquet.
+    O arquivo fica em cache no disco por versão dos dados.
+    Args:
+        year_from (int, opcional): Primeiro ano exportado. Padrão é 1970.
+        year_to (int, opcional): Último ano exportado (igual a year_from para um único ano). Padrão é 2024.
+        export_format (ExportFormat, opcional): Formato do arquivo (parâmetro "format"): "arrow" ou "parquet". Padrão é "parquet".
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        FileResponse: Arquivo com as colunas da resposta da API e a coluna "Ano".
+    Raises:
+        HTTPException: Se o intervalo de anos for inválido.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if year_from < MIN_YEAR or year_to > MAX_YEAR or year_from > year_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        path, media_type = await exports.get_export_file(
+            nome="comercializacao",
+            year_from=year_from,
+            year_to=year_to,
+            fmt=export_format.value,
+        )
+        ic("Exportação de Comercialização gerada com sucesso.")
+        return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+    except RuntimeError as e:
+        ic(f"Erro em /comercializacao/export: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
@@ -1,16 +1,24 @@
+import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
 from icecream import ic
 
 from tech_challenge.schemas.api_schemas import ExportacaoSchema
-from tech_challenge.schemas.sub_tables import ExportacaoSubTables
-from tech_challenge.services import scraper
-from tech_challenge.services.auth import verify_token
+from tech_challenge.schemas.sub_tables import (
+    AggregationMetric,
+    ExportFormat,
+    ExportacaoSubTables,
+    ResponseFormat,
+)
+from tech_challenge.services import aggregations, exports, scraper
+from tech_challenge.services.auth import require_auth
+from tech_challenge.utils.db import MAX_PAGE_SIZE
+from tech_challenge.utils.responses import dataset_response, page_response, stream_response
+from tech_challenge.utils.scraper import MAX_YEAR, MIN_YEAR
 
 router = APIRouter()
-security = HTTPBearer()
 
 
 @router.get(
@@ -21,21 +29,40 @@ security = HTTPBearer()
     "Utiliza fallback para db local em caso de falha.",
     tags=["Dados"],
 )
-def get_exportacao(sub_table: Optional[ExportacaoSubTables], year: Optional[int] = None, credentials: HTTPAuthorizationCredentials = Depends(security)):
+async def get_exportacao(
+    request: Request,
+    sub_table: Optional[ExportacaoSubTables],
+    year: Optional[int] = None,
+    response_format: ResponseFormat = Query(ResponseFormat.json, alias="format"),
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    pais: Optional[str] = Query(None, alias="Países"),
+    prefix: Optional[str] = None,
+    min_quantidade: Optional[int] = None,
+    min_valor: Optional[int] = None,
+    token_data: dict = Depends(require_auth),
+):
     """
     Recupera dados de exportação para uma sub-tabela e ano especificados.
     Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
         sub_table (Optional[ExportacaoSubTables]): A sub-tabela da qual obter os dados de exportação. Deve ser um membro válido de ExportacaoSubTables.
         year (Optional[int], optional): O ano para o qual obter os dados de exportação. Deve estar entre 1970 e 2024, inclusive. Padrão é None.
-        credentials (HTTPAuthorizationCredentials): As credenciais HTTP de autorização para verificação do token.
+        response_format (ResponseFormat, opcional): Formato da resposta (parâmetro "format"): "json" (padrão) ou, em streaming, "ndjson" ou "csv".
+        fields (Optional[str], opcional): Colunas a retornar, separadas por vírgula (ex: "Países,Valor (US$)"). Padrão é todas.
+        limit (Optional[int], opcional): Tamanho da página, entre 1 e MAX_PAGE_SIZE. O cursor da próxima página vem no cabeçalho X-Next-Cursor.
+        cursor (Optional[str], opcional): Cursor devolvido pela página anterior.
+        pais (Optional[str], opcional): Filtra pelo valor exato de "Países" (parâmetro "Países").
+        prefix (Optional[str], opcional): Filtra os registros cujo "Países" começa com o prefixo.
+        min_quantidade (Optional[int], opcional): Quantidade mínima.
+        min_valor (Optional[int], opcional): Valor mínimo em US$.
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
     Returns:
         List[ExportacaoSchema]: Uma lista de registros de dados de exportação que correspondem aos critérios especificados.
     Raises:
         HTTPException: Se o ano estiver fora do intervalo permitido, a sub-tabela for inválida ou ocorrer um erro de execução durante a obtenção dos dados.
     """
-    token = credentials.credentials
-    verify_token(token)
-
     try:
         if year and (year < 1970 or year > 2024):
             raise HTTPException(
@@ -50,9 +77,342 @@ def get_exportacao(sub_table: Optional[ExportacaoSubTables], year: Optional[int]
                 detail="Invalid sub-table name.",
             )
 
-        df = scraper.get_exportacao_data(sub_table.value, year)
+        field_list = None
+        if fields:
+            field_list = [field.strip() for field in fields.split(",") if field.strip()]
+        filters = {
+            "item": pais,
+            "prefix": prefix,
+            "min_quantidade": min_quantidade,
+            "min_valor": min_valor,
+        }
+        if limit is not None and (limit < 1 or limit > MAX_PAGE_SIZE):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"limit must be between 1 and {MAX_PAGE_SIZE}.",
+            )
+
+        if response_format is not ResponseFormat.json:
+            records, columns = await scraper.get_stream_data(
+                nome="exportacao",
+                sub_table=sub_table.value,
+                year=year,
+                fields=field_list,
+                **filters,
+            )
+            return stream_response(records, response_format.value, columns)
+
+        if field_list or limit is not None or cursor or any(
+            value is not None for value in filters.values()
+        ):
+            records, next_cursor = await scraper.get_page_data(
+                nome="exportacao",
+                sub_table=sub_table.value,
+                year=year,
+                fields=field_list,
+                limit=limit,
+                cursor=cursor,
+                **filters,
+            )
+            return page_response(records, next_cursor)
+
+        payload = await scraper.get_exportacao_data(sub_table.value, year)
         ic("Dados de Exportação carregados com sucesso.")
-        return [ExportacaoSchema(**row) for row in df.to_dict(orient="records")]
+        return dataset_response(request, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except RuntimeError as e:
         ic(f"Erro em /exportacao: {e}")
         raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/exportacao/series",
+    summary="Série histórica de exportação",
+    description="Retorna os dados da aba Exportação da Embrapa para um intervalo de anos "
+    "em uma única resposta, em formato longo (coluna Ano) ou pivotado por ano.",
+    tags=["Dados"],
+)
+async def get_exportacao_series(
+    request: Request,
+    sub_table: Optional[ExportacaoSubTables],
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    pivot: bool = False,
+    response_format: ResponseFormat = Query(ResponseFormat.json, alias="format"),
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Recupera a série histórica de exportação entre dois anos, lida do banco de dados em uma única consulta.
+    Anos ainda não salvos são obtidos da Embrapa concorrentemente.
+    Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
+        sub_table (Optional[ExportacaoSubTables]): Sub-tabela da qual buscar a série. Deve ser um membro válido de ExportacaoSubTables.
+        year_from (int, opcional): Primeiro ano da série. Padrão é 1970.
+        year_to (int, opcional): Último ano da série. Padrão é 2024.
+        pivot (bool, opcional): Se True, retorna uma linha por item com os valores indexados por ano. Padrão é False.
+        response_format (ResponseFormat, opcional): Formato da resposta (parâmetro "format"): "json" (padrão) ou, em streaming, "ndjson" ou "csv" (sem pivot).
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        List[dict]: Registros da série, com a coluna "Ano" ou pivotados por ano.
+    Raises:
+        HTTPException: Se o intervalo de anos for inválido.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if year_from < MIN_YEAR or year_to > MAX_YEAR or year_from > year_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        if response_format is not ResponseFormat.json:
+            if pivot:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="pivot is only available with format=json.",
+                )
+            records, columns = await scraper.get_stream_data(
+                nome="exportacao",
+                sub_table=sub_table.value,
+                year_from=year_from,
+                year_to=year_to,
+            )
+            return stream_response(records, response_format.value, columns)
+
+        payload = await scraper.get_series_data(
+            nome="exportacao",
+            sub_table=sub_table.value,
+            year_from=year_from,
+            year_to=year_to,
+            pivot=pivot,
+        )
+        ic("Série de Exportação carregada com sucesso.")
+        return dataset_response(request, payload)
+    except RuntimeError as e:
+        ic(f"Erro em /exportacao/series: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/exportacao/totals",
+    summary="Totais anuais de exportação",
+    description="Retorna, para cada ano do intervalo, a soma da quantidade e do valor da "
+    "aba Exportação da Embrapa, calculada no banco de dados.",
+    tags=["Agregações"],
+)
+async def get_exportacao_totals(
+    request: Request,
+    sub_table: Optional[ExportacaoSubTables],
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Recupera os totais anuais de exportação (quantidade, valor e número de países) entre dois anos.
+    Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
+        sub_table (Optional[ExportacaoSubTables]): Sub-tabela analisada. Deve ser um membro válido de ExportacaoSubTables.
+        year_from (int, opcional): Primeiro ano do intervalo. Padrão é 1970.
+        year_to (int, opcional): Último ano do intervalo. Padrão é 2024.
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        List[dict]: Um registro por ano com "Quantidade (Kg)", "Valor (US$)" e "Registros".
+    Raises:
+        HTTPException: Se os parâmetros forem inválidos.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if (
+            year_from < MIN_YEAR
+            or year_to > MAX_YEAR
+            or year_from > year_to
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        payload = await aggregations.get_aggregation_data(
+            kind="totals",
+            nome="exportacao",
+            sub_table=sub_table.value,
+            year_from=year_from,
+            year_to=year_to,
+        )
+        ic("Totais anuais calculados com sucesso.")
+        return dataset_response(request, payload)
+    except RuntimeError as e:
+        ic(f"Erro em /exportacao/totals: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/exportacao/top",
+    summary="Ranking de países em exportação",
+    description="Retorna os países com maior valor ou quantidade na aba Exportação da "
+    "Embrapa, somados no intervalo de anos e calculados no banco de dados.",
+    tags=["Agregações"],
+)
+async def get_exportacao_top(
+    request: Request,
+    sub_table: Optional[ExportacaoSubTables],
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    metric: AggregationMetric = AggregationMetric.valor_usd,
+    limit: int = 10,
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Recupera os países com maior valor ou quantidade de exportação entre dois anos.
+    Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
+        sub_table (Optional[ExportacaoSubTables]): Sub-tabela analisada. Deve ser um membro válido de ExportacaoSubTables.
+        year_from (int, opcional): Primeiro ano do intervalo. Padrão é 1970.
+        year_to (int, opcional): Último ano do intervalo. Padrão é 2024.
+        metric (AggregationMetric, opcional): Coluna usada na ordenação. Padrão é Valor_USD.
+        limit (int, opcional): Quantidade de países retornados, entre 1 e 100. Padrão é 10.
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        List[dict]: Países em ordem decrescente da métrica, com a soma da quantidade e do valor.
+    Raises:
+        HTTPException: Se os parâmetros forem inválidos.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if (
+            year_from < MIN_YEAR
+            or year_to > MAX_YEAR
+            or year_from > year_to
+            or limit < 1
+            or limit > 100
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to, "
+                "and limit between 1 and 100.",
+            )
+
+        payload = await aggregations.get_aggregation_data(
+            kind="top",
+            nome="exportacao",
+            sub_table=sub_table.value,
+            year_from=year_from,
+            year_to=year_to,
+            metric=metric.value,
+            limit=limit,
+        )
+        ic("Ranking de países calculado com sucesso.")
+        return dataset_response(request, payload)
+    except RuntimeError as e:
+        ic(f"Erro em /exportacao/top: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/exportacao/yoy",
+    summary="Variação anual de exportação",
+    description="Retorna a variação ano a ano do valor ou da quantidade de cada país na aba "
+    "Exportação da Embrapa, calculada no banco de dados.",
+    tags=["Agregações"],
+)
+async def get_exportacao_yoy(
+    request: Request,
+    sub_table: Optional[ExportacaoSubTables],
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    metric: AggregationMetric = AggregationMetric.valor_usd,
+    country: Optional[str] = None,
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Recupera a variação ano a ano (absoluta e percentual) de exportação por país entre dois anos.
+    Args:
+        request (Request): Requisição recebida, usada para os cabeçalhos If-None-Match e Accept-Encoding.
+        sub_table (Optional[ExportacaoSubTables]): Sub-tabela analisada. Deve ser um membro válido de ExportacaoSubTables.
+        year_from (int, opcional): Primeiro ano do intervalo. Padrão é 1970.
+        year_to (int, opcional): Último ano do intervalo. Padrão é 2024.
+        metric (AggregationMetric, opcional): Coluna analisada. Padrão é Valor_USD.
+        country (Optional[str], opcional): Restringe o resultado a um país. Padrão é None.
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        List[dict]: Registros por país e ano com o valor, "Anterior", "Variação" e "Variação (%)".
+    Raises:
+        HTTPException: Se os parâmetros forem inválidos.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if (
+            year_from < MIN_YEAR
+            or year_to > MAX_YEAR
+            or year_from > year_to
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        payload = await aggregations.get_aggregation_data(
+            kind="yoy",
+            nome="exportacao",
+            sub_table=sub_table.value,
+            year_from=year_from,
+            year_to=year_to,
+            metric=metric.value,
+            item=country,
+        )
+        ic("Variação anual calculada com sucesso.")
+        return dataset_response(request, payload)
+    except RuntimeError as e:
+        ic(f"Erro em /exportacao/yoy: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get(
+    "/exportacao/export",
+    summary="Exportação de exportação em Arrow/Parquet",
+    description="Retorna os dados da aba Exportação da Embrapa de um ou vários anos como "
+    "stream Arrow IPC ou arquivo Parquet, gerado a partir do banco de dados.",
+    tags=["Exportação"],
+)
+async def get_exportacao_export(
+    sub_table: Optional[ExportacaoSubTables],
+    year_from: int = MIN_YEAR,
+    year_to: int = MAX_YEAR,
+    export_format: ExportFormat = Query(ExportFormat.parquet, alias="format"),
+    token_data: dict = Depends(require_auth),
+):
+    """
+    Exporta os dados de exportação entre dois anos (inclusive) em Arrow IPC ou Parquet.
+    O arquivo fica em cache no disco por versão dos dados.
+    Args:
+        sub_table (Optional[ExportacaoSubTables]): Sub-tabela exportada. Deve ser um membro válido de ExportacaoSubTables.
+        year_from (int, opcional): Primeiro ano exportado. Padrão é 1970.
+        year_to (int, opcional): Último ano exportado (igual a year_from para um único ano). Padrão é 2024.
+        export_format (ExportFormat, opcional): Formato do arquivo (parâmetro "format"): "arrow" ou "parquet". Padrão é "parquet".
+        token_data (dict): Claims do token JWT verificado pela dependência require_auth.
+    Returns:
+        FileResponse: Arquivo com as colunas da resposta da API e a coluna "Ano".
+    Raises:
+        HTTPException: Se o intervalo de anos for inválido.
+        HTTPException: Se ocorrer um erro de execução ao recuperar algum dos anos.
+    """
+    try:
+        if year_from < MIN_YEAR or year_to > MAX_YEAR or year_from > year_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Years must be between 1970 and 2024, with year_from <= year_to.",
+            )
+
+        path, media_type = await exports.get_export_file(
+            nome="exportacao",
+            sub_table=sub_table.value,
+            year_from=year_from,
+            year_to=year_to,
+            fmt=export_format.value,
+        )
+        ic("Exportação de Exportação gerada com sucesso.")
+        return FileResponse(path, media_type=media_type, filename=os.path.basename(path))
+    except RuntimeError as e:
+        ic(f"Erro em /exportacao/export: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
@@ -1,18 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from tech_challenge.schemas.api_schemas import RegisterSchema
-from tech_challenge.schemas.db_schemas import User
 from tech_challenge.services.auth import create_access_token
-from tech_challenge.utils.db import get_db, verify_password
+from tech_challenge.services.hashing import HashingBusyError, password_hasher
+from tech_challenge.utils.db import find_user, get_db
 
 router = APIRouter()
 
 
 @router.post("/login", summary="Autenticação de usuário", tags=["Autenticação"])
-def login(credentials: RegisterSchema, db: Session = Depends(get_db)):
+async def login(credentials: RegisterSchema, db: Session = Depends(get_db)):
     """
     Autentica um usuário com as credenciais fornecidas e retorna um token JWT se for bem-sucedido.
+
+    A verificação bcrypt roda no pool dedicado `password_hasher`, fora do event loop e
+    do threadpool usado pelas rotas de dados.
+
     Args:
         credentials (RegisterSchema): Credenciais de login do usuário (username e senha).
         db (Session, opcional): Sessão do banco de dados SQLAlchemy.
@@ -20,10 +25,21 @@ def login(credentials: RegisterSchema, db: Session = Depends(get_db)):
         dict: Um dicionário contendo o token de acesso e o tipo de token.
     Raises:
         HTTPException: Se o usuário não existir ou a senha estiver incorreta, retorna erro 401 Unauthorized.
+            Se a fila de hashes estiver cheia, retorna erro 429 Too Many Requests.
     """
 
-    user = db.query(User).filter(User.username == credentials.username).first()
-    if not user or not verify_password(credentials.password, user.password):
+    user = await run_in_threadpool(find_user, db, credentials.username)
+    try:
+        valid = user is not None and await password_hasher.verify(
+            credentials.password, user.password
+        )
+    except HashingBusyError:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitas autenticações simultâneas, tente novamente.",
+            headers={"Retry-After": "1"},
+        )
+    if not valid:
         raise HTTPException(status_code=401, detail="Usuário ou senha inválidos")
 
     access_token = create_access_token(data={"sub": credentials.username})
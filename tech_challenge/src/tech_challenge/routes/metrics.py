@@ -0,0 +1,32 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from tech_challenge.services.auth import require_monitoring_access
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Métricas Prometheus",
+    description="Exporta, no formato de texto do Prometheus, a latência das requisições "
+    "e das etapas de obtenção dos dados (fetch, parse, enqueue, load, serialize) por "
+    "tabela e sub-tabela, as taxas de acerto dos caches, as falhas de acesso ao site "
+    "da Embrapa e os scrapings em andamento. Exige token, exceto para os IPs em "
+    "MONITORING_ALLOWED_IPS.",
+    tags=["Monitoramento"],
+)
+def get_metrics(token_data: Optional[dict] = Depends(require_monitoring_access)):
+    """
+    Retorna as métricas do processo no formato de exposição do Prometheus.
+
+    Args:
+        token_data (Optional[dict]): Claims do token verificado pela dependência
+            `require_monitoring_access` (None para um IP liberado).
+
+    Returns:
+        Response: Corpo `text/plain` gerado pelo registro padrão do `prometheus_client`.
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,35 +1,61 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from tech_challenge.schemas.api_schemas import RegisterSchema
 from tech_challenge.schemas.db_schemas import User
-from tech_challenge.utils.db import get_db, hash_password
+from tech_challenge.services.hashing import HashingBusyError, password_hasher
+from tech_challenge.utils.db import find_user, get_db
 
 router = APIRouter()
 
 
+def add_user(db: Session, username: str, hashed_password: str) -> None:
+    """
+    Insere um novo usuário no banco de dados.
+
+    Args:
+        db (Session): Sessão do banco de dados SQLAlchemy.
+        username (str): Nome de usuário.
+        hashed_password (str): Hash bcrypt da senha.
+    """
+    new_user = User(username=username, password=hashed_password)
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+
+
 @router.post("/register", summary="Cadastro de novo usuário", tags=["Autenticação"])
-def register(user: RegisterSchema, db: Session = Depends(get_db)):
+async def register(user: RegisterSchema, db: Session = Depends(get_db)):
     """
     Registra um novo usuário no sistema.
+
+    O hash bcrypt da senha é gerado no pool dedicado `password_hasher`, fora do event
+    loop e do threadpool usado pelas rotas de dados.
+
     Args:
         user (RegisterSchema): Dados de registro contendo nome de usuário e senha.
         db (Session, opcional): Dependência da sessão do banco de dados SQLAlchemy.
     Raises:
         HTTPException: Se um usuário com o nome de usuário informado já existir (código de status 400).
+            Se a fila de hashes estiver cheia (código de status 429).
     Returns:
         dict: Mensagem indicando o sucesso no cadastro do usuário.
     """
 
-    db_user = db.query(User).filter(User.username == user.username).first()
+    db_user = await run_in_threadpool(find_user, db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Usuário já existe")
 
-    hashed_password = hash_password(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HashingBusyError:
+        raise HTTPException(
+            status_code=429,
+            detail="Muitos cadastros simultâneos, tente novamente.",
+            headers={"Retry-After": "1"},
+        )
 
-    new_user = User(username=user.username, password=hashed_password)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await run_in_threadpool(add_user, db, user.username, hashed_password)
 
     return {"message": "Usuário cadastrado com sucesso"}
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+
+from tech_challenge.services.auth import require_monitoring_access, token_cache
+from tech_challenge.services.breaker import embrapa_breaker
+from tech_challenge.services.cache import response_cache
+from tech_challenge.services.db import store_pool_stats
+from tech_challenge.services.hashing import password_hasher
+from tech_challenge.services.singleflight import scrape_flight
+from tech_challenge.services.write_queue import store_writer
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Estatísticas internas",
+    description="Retorna os contadores do cache de respostas, do registro de engines, "
+    "do agrupamento de scrapings concorrentes, do cache de tokens verificados, "
+    "do pool de hashes de senha, do disjuntor do site da Embrapa, dos pools de "
+    "conexões do banco das abas e da fila de escrita em segundo plano. Exige token, "
+    "exceto para os IPs em MONITORING_ALLOWED_IPS.",
+    tags=["Monitoramento"],
+)
+def get_stats(token_data: Optional[dict] = Depends(require_monitoring_access)):
+    """
+    Retorna as estatísticas de execução dos caches da API.
+
+    Args:
+        token_data (Optional[dict]): Claims do token verificado pela dependência
+            `require_monitoring_access` (None para um IP liberado).
+
+    Returns:
+        dict: Estatísticas do cache de respostas (`response_cache`), dos scrapings
+        agrupados (`scrape_flight`), dos tokens JWT verificados (`token_cache`),
+        do pool de hashes de senha (`password_hasher`), do disjuntor do site da
+        Embrapa (`embrapa_breaker`), dos pools de escrita e leitura do banco das
+        abas (`store_pools`) e da fila de escrita em segundo plano (`store_writer`).
+    """
+    return {
+        "response_cache": response_cache.stats(),
+        "scrape_flight": scrape_flight.stats(),
+        "token_cache": token_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "embrapa_breaker": embrapa_breaker.stats(),
+        "store_pools": store_pool_stats(),
+        "store_writer": store_writer.stats(),
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String
 
 from tech_challenge.db_bases import DynamicBase, UserBase
 
@@ -13,41 +13,89 @@ class User(UserBase):
 
 class Producao(DynamicBase):
     __tablename__ = "producao"
+    __table_args__ = (
+        Index("ix_producao_sub_table_year", "sub_table", "year"),
+        Index("ix_producao_sub_table_year_produto", "sub_table", "year", "Produto"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     Produto = Column(String, nullable=False)
     Quantidade_L = Column(Integer, nullable=True)
+    sub_table = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
 
 
 class Processamento(DynamicBase):
     __tablename__ = "processamento"
+    __table_args__ = (
+        Index("ix_processamento_sub_table_year", "sub_table", "year"),
+        Index("ix_processamento_sub_table_year_cultivar", "sub_table", "year", "Cultivar"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     Cultivar = Column(String, nullable=False)
     Quantidade_Kg = Column(Integer, nullable=True)
+    sub_table = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
 
 
 class Comercializacao(DynamicBase):
     __tablename__ = "comercializacao"
+    __table_args__ = (
+        Index("ix_comercializacao_sub_table_year", "sub_table", "year"),
+        Index("ix_comercializacao_sub_table_year_produto", "sub_table", "year", "Produto"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     Produto = Column(String, nullable=False)
     Quantidade_L = Column(Integer, nullable=True)
+    sub_table = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
 
 
 class Importacao(DynamicBase):
     __tablename__ = "importacao"
+    __table_args__ = (
+        Index("ix_importacao_sub_table_year", "sub_table", "year"),
+        Index("ix_importacao_sub_table_year_paises", "sub_table", "year", "Países"),
+        Index("ix_importacao_sub_table_year_valor_usd", "sub_table", "year", "Valor_USD"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     Países = Column(String, nullable=False)
     Quantidade_Kg = Column(Float, nullable=True)
     Valor_USD = Column(Integer, nullable=True)
+    sub_table = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
 
 
 class Exportacao(DynamicBase):
     __tablename__ = "exportacao"
+    __table_args__ = (
+        Index("ix_exportacao_sub_table_year", "sub_table", "year"),
+        Index("ix_exportacao_sub_table_year_paises", "sub_table", "year", "Países"),
+        Index("ix_exportacao_sub_table_year_valor_usd", "sub_table", "year", "Valor_USD"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     Países = Column(String, nullable=False)
     Quantidade_Kg = Column(Float, nullable=True)
     Valor_USD = Column(Integer, nullable=True)
+    sub_table = Column(String, nullable=True)
+    year = Column(Integer, nullable=True)
+
+
+class DatasetVersion(DynamicBase):
+    __tablename__ = "dataset_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class PartitionFreshness(DynamicBase):
+    __tablename__ = "partition_freshness"
+
+    partition = Column(String, primary_key=True)
+    table_name = Column(String, nullable=False)
+    scraped_at = Column(DateTime, nullable=False)
@@ -21,3 +21,19 @@ class ExportacaoSubTables(str, Enum):
     sub_table2 = "Espumantes"
     sub_table3 = "Uvas frescas"
     sub_table4 = "Suco de uva"
+
+
+class AggregationMetric(str, Enum):
+    valor_usd = "Valor_USD"
+    quantidade_kg = "Quantidade_Kg"
+
+
+class ResponseFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class ExportFormat(str, Enum):
+    arrow = "arrow"
+    parquet = "parquet"
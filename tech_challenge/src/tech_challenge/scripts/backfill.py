@@ -0,0 +1,250 @@
+"""
+Pré-carrega no banco de dados todas as combinações de tabela, sub-tabela e ano do
+site da Embrapa, em paralelo e com limite de requisições por segundo.
+
+O progresso é salvo em um arquivo de estado a cada página gravada no banco: se o
+comando for interrompido, a próxima execução continua de onde parou. Partições que
+já existem no banco também são ignoradas (exceto com --force).
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python -m tech_challenge.scripts.backfill [--tables producao importacao]
+        [--year-from 1970] [--year-to 2024] [--concurrency 4] [--rate 2]
+        [--base-url http://127.0.0.1:8081/index.php?]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from tech_challenge.services.db import DATA_DIR
+from tech_challenge.services.singleflight import scrape_flight
+from tech_challenge.services.write_queue import store_writer
+from tech_challenge.utils import scraper
+from tech_challenge.utils.db import generate_table_name, partition_exists
+
+# Arquivo padrão com as partições já concluídas
+DEFAULT_STATE_FILE = os.path.join(DATA_DIR, "backfill_state.json")
+
+
+class RateLimiter:
+    """
+    Limita o início de requisições a no máximo `rate` por segundo, espaçando-as igualmente.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def enumerate_partitions(
+    tables: list[str], year_from: int, year_to: int
+) -> list[tuple]:
+    """
+    Lista todas as combinações (tabela, sub-tabela, ano) a partir dos códigos da Embrapa.
+
+    Args:
+        tables (list[str]): Tabelas a incluir.
+        year_from (int): Primeiro ano (inclusive).
+        year_to (int): Último ano (inclusive).
+
+    Returns:
+        list[tuple]: Combinações (tabela, sub-tabela, ano); sub-tabela é None quando a
+        tabela não possui sub-tabelas.
+    """
+    partitions = []
+    for table in tables:
+        sub_tables = list(scraper.SUB_TABLE_CODES[table]) or [None]
+        for sub_table in sub_tables:
+            for year in range(year_from, year_to + 1):
+                partitions.append((table, sub_table, year))
+    return partitions
+
+
+def load_state(state_file: str) -> set[str]:
+    if not os.path.exists(state_file):
+        return set()
+    with open(state_file, encoding="utf-8") as f:
+        return set(json.load(f))
+
+
+def save_state(state_file: str, done: set[str]):
+    # Escrita atômica: uma interrupção no meio não corrompe o arquivo de estado
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(sorted(done), f, ensure_ascii=False)
+    os.replace(tmp_file, state_file)
+
+
+async def backfill(
+    partitions: list[tuple],
+    concurrency: int,
+    rate: float,
+    state_file: str,
+    force: bool = False,
+) -> dict:
+    """
+    Faz o scraping das partições informadas com um pool limitado de tarefas concorrentes.
+
+    Args:
+        partitions (list[tuple]): Combinações (tabela, sub-tabela, ano) a carregar.
+        concurrency (int): Quantidade máxima de páginas sendo processadas ao mesmo tempo.
+        rate (float): Máximo de requisições por segundo ao site (0 desativa o limite).
+        state_file (str): Arquivo onde as partições concluídas são registradas.
+        force (bool, opcional): Se True, refaz partições já concluídas ou existentes no banco.
+
+    Returns:
+        dict: Contadores de partições concluídas, ignoradas e com falha, e a duração.
+    """
+    done = set() if force else load_state(state_file)
+    limiter = RateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    counters = {"ok": 0, "skipped": 0, "failed": 0}
+    total = len(partitions)
+    started = time.monotonic()
+
+    def report(name: str, status: str):
+        finished = sum(counters.values())
+        elapsed = time.monotonic() - started
+        fetched = counters["ok"] + counters["failed"]
+        throughput = fetched / elapsed if elapsed else 0.0
+        print(
+            f"[{finished}/{total}] {status:<8} {name} | "
+            f"ok={counters['ok']} ignoradas={counters['skipped']} "
+            f"falhas={counters['failed']} | {throughput:.2f} páginas/s",
+            flush=True,
+        )
+
+    def fail(name: str, error: Exception):
+        counters["failed"] += 1
+        report(name, "falha")
+        print(f"    {type(error).__name__}: {error}", flush=True)
+
+    async def run(table: str, sub_table: str, year: int):
+        name = generate_table_name(table, sub_table, year)
+        if not force and (
+            name in done
+            or await run_in_threadpool(partition_exists, table, sub_table, year)
+        ):
+            counters["skipped"] += 1
+            done.add(name)
+            report(name, "ignorada")
+            return
+
+        async with semaphore:
+            await limiter.wait()
+            url = scraper.generate_url(table=table, sub_table=sub_table, year=year)
+            try:
+                await scrape_flight.do_async(
+                    (table, sub_table, year),
+                    scraper.scrape_aba,
+                    table,
+                    url,
+                    sub_table,
+                    year,
+                )
+            except Exception as e:
+                fail(name, e)
+                return
+
+        # Só marca a partição como concluída depois de gravada pela fila de escrita
+        try:
+            await scraper.wait_for_writes(table, [(table, sub_table, year)])
+        except RuntimeError as e:
+            fail(name, e)
+            return
+
+        counters["ok"] += 1
+        done.add(name)
+        save_state(state_file, done)
+        report(name, "ok")
+
+    store_writer.start()
+    try:
+        await asyncio.gather(*(run(*partition) for partition in partitions))
+    finally:
+        save_state(state_file, done)
+        await scraper.close_http_client()
+        # Grava as partições ainda na fila de escrita antes de encerrar
+        await run_in_threadpool(store_writer.shutdown)
+
+    return {**counters, "seconds": time.monotonic() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pré-carrega as tabelas, sub-tabelas e anos da Embrapa no banco local."
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(scraper.TABLE_CODES),
+        default=list(scraper.TABLE_CODES),
+        help="Tabelas a carregar (padrão: todas).",
+    )
+    parser.add_argument("--year-from", type=int, default=scraper.MIN_YEAR)
+    parser.add_argument("--year-to", type=int, default=scraper.MAX_YEAR)
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Páginas processadas em paralelo."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=2.0,
+        help="Máximo de requisições por segundo (0 = sem limite).",
+    )
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE)
+    parser.add_argument(
+        "--base-url",
+        help="Prefixo das URLs da Embrapa (ex: servidor local de testes).",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Refaz também as partições já carregadas."
+    )
+    args = parser.parse_args()
+
+    if args.base_url:
+        scraper.URL_PREFIX = args.base_url
+
+    partitions = enumerate_partitions(args.tables, args.year_from, args.year_to)
+    print(f"{len(partitions)} partições a processar.", flush=True)
+
+    try:
+        summary = asyncio.run(
+            backfill(
+                partitions,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                state_file=args.state_file,
+                force=args.force,
+            )
+        )
+    except KeyboardInterrupt:
+        print("Interrompido. Execute novamente para continuar de onde parou.")
+        raise SystemExit(130)
+
+    fetched = summary["ok"] + summary["failed"]
+    print(
+        f"Concluído em {summary['seconds']:.1f}s: ok={summary['ok']} "
+        f"ignoradas={summary['skipped']} falhas={summary['failed']} "
+        f"({fetched / summary['seconds'] if summary['seconds'] else 0:.2f} páginas/s)"
+    )
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Migra os bancos de dados legados (um arquivo `.db` por tabela, sub-tabela e ano)
+para o banco de dados único `vitivinicultura.db`.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python -m tech_challenge.scripts.migrate_legacy_db [--data-dir PASTA] [--remove]
+"""
+
+import argparse
+
+from tech_challenge.services.db import DATA_DIR
+from tech_challenge.utils.db import migrate_legacy_databases
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Importa os bancos legados por ano/sub-tabela para o banco único."
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=DATA_DIR,
+        help="Pasta com os subdiretórios legados de cada tabela (padrão: pasta 'data').",
+    )
+    parser.add_argument(
+        "--remove",
+        action="store_true",
+        help="Apaga cada arquivo legado após importá-lo.",
+    )
+    args = parser.parse_args()
+
+    summary = migrate_legacy_databases(data_dir=args.data_dir, remove=args.remove)
+    print(
+        f"Arquivos importados: {summary['imported']} | "
+        f"ignorados: {summary['skipped']} | linhas: {summary['rows']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
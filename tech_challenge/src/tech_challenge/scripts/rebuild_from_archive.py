@@ -0,0 +1,35 @@
+"""
+Reconstrói o banco de dados único a partir do arquivo de páginas brutas baixadas da
+Embrapa (`ARCHIVE_DIR`), sem acessar o site.
+
+Uso:
+    export PYTHONPATH=tech_challenge/src
+    python -m tech_challenge.scripts.rebuild_from_archive [--tables producao importacao]
+"""
+
+import argparse
+
+from tech_challenge.utils.scraper import TABLE_CODES, rebuild_from_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Reprocessa as páginas arquivadas e salva os dados no banco único."
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="+",
+        choices=list(TABLE_CODES),
+        help="Tabelas a reconstruir (padrão: todas).",
+    )
+    args = parser.parse_args()
+
+    summary = rebuild_from_archive(tables=args.tables)
+    print(
+        f"Páginas reconstruídas: {summary['rebuilt']} | ignoradas: {summary['skipped']} | "
+        f"falhas: {summary['failed']} | linhas: {summary['rows']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from fastapi.concurrency import run_in_threadpool
+
+from tech_challenge.services.cache import response_cache
+from tech_challenge.utils.db import (
+    aggregate_top,
+    aggregate_totals,
+    aggregate_year_over_year,
+    get_dataset_version,
+)
+from tech_challenge.utils.responses import DatasetPayload, build_payload
+from tech_challenge.utils.scraper import MIN_YEAR, ensure_years
+
+# Agregações disponíveis, todas calculadas no SQLite (ver utils/db.py)
+AGGREGATIONS = {
+    "totals": aggregate_totals,
+    "top": aggregate_top,
+    "yoy": aggregate_year_over_year,
+}
+
+
+async def get_aggregation_data(
+    kind: str,
+    nome: str,
+    year_from: int,
+    year_to: int,
+    sub_table: str = None,
+    **params,
+) -> DatasetPayload:
+    """
+    Obtém uma agregação de uma aba (totais, ranking ou variação anual), já serializada.
+
+    Os anos ausentes do intervalo são obtidos da Embrapa antes do cálculo. O resultado
+    fica no cache de respostas com a versão atual da tabela na chave: quando novos
+    dados são salvos, a versão muda e a agregação é recalculada.
+
+    Args:
+        kind (str): Tipo da agregação ("totals", "top" ou "yoy").
+        nome (str): Nome da aba (ex: "importacao", "exportacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, optional): Nome da sub-tabela.
+        **params: Parâmetros específicos da agregação (ex: metric, limit, item).
+
+    Returns:
+        DatasetPayload: Corpo pré-serializado da agregação, com variantes comprimidas e ETag.
+
+    Raises:
+        RuntimeError: Se não for possível obter algum dos anos ausentes no banco de dados.
+    """
+    # a variação do primeiro ano do intervalo depende do ano anterior
+    ensure_from = year_from - 1 if kind == "yoy" and year_from > MIN_YEAR else year_from
+    await ensure_years(nome=nome, year_from=ensure_from, year_to=year_to, sub_table=sub_table)
+    version = await run_in_threadpool(get_dataset_version, nome)
+
+    key = (
+        "aggregation",
+        kind,
+        nome,
+        sub_table,
+        year_from,
+        year_to,
+        tuple(sorted(params.items())),
+        version,
+    )
+    payload = response_cache.get(key)
+    if payload is not None:
+        return payload
+
+    records = await run_in_threadpool(
+        AGGREGATIONS[kind],
+        table=nome,
+        year_from=year_from,
+        year_to=year_to,
+        sub_table=sub_table,
+        **params,
+    )
+    payload = await run_in_threadpool(build_payload, records)
+    response_cache.set(key, payload, nbytes=payload.nbytes)
+    return payload
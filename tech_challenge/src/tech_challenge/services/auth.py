@@ -1,11 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Optional
 
 import jwt
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from tech_challenge.services.timing import record_timing
 
 SECRET_KEY = "ML_GROUP_37_Key"
 ALGORITHM = "HS256"
 
+# Quantidade máxima de tokens verificados mantidos em cache
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+
+# IPs (separados por vírgula) que acessam /stats e /metrics sem token (ex: o Prometheus)
+MONITORING_ALLOWED_IPS = {
+    ip.strip() for ip in os.getenv("MONITORING_ALLOWED_IPS", "").split(",") if ip.strip()
+}
+
+security = HTTPBearer()
+
+# Extrai o token Bearer, se houver, sem responder erro (usado pelas rotas de monitoramento)
+optional_security = HTTPBearer(auto_error=False)
+
+
+class TokenCache:
+    """
+    Cache LRU limitado de tokens JWT já verificados → claims decodificadas.
+
+    Cada entrada vale até o `exp` do próprio token: depois disso é descartada e o
+    token volta a ser decodificado (e rejeitado como expirado). Tokens inválidos
+    nunca são armazenados.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, token: str):
+        """
+        Retorna as claims de um token verificado, se estiver em cache e não tiver expirado.
+
+        Args:
+            token (str): Token JWT recebido.
+
+        Returns:
+            dict | None: Claims do token ou None em caso de falta.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        """
+        Armazena as claims de um token verificado até o seu `exp`.
+
+        Args:
+            token (str): Token JWT verificado.
+            claims (dict): Claims decodificadas; tokens sem `exp` não são armazenados.
+        """
+        expires_at = claims.get("exp")
+        if expires_at is None:
+            return
+        with self._lock:
+            self._entries[token] = (claims, float(expires_at))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Remove todos os tokens do cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do cache de tokens.
+
+        Returns:
+            dict: Tamanho atual, limite, acertos, faltas, taxa de acerto, remoções e expirações.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# Cache único de tokens verificados, compartilhado por todas as rotas
+token_cache = TokenCache()
+
 
 def create_access_token(data: dict, expires_delta: timedelta = timedelta(minutes=30)):
     """
@@ -29,6 +144,9 @@ def verify_token(token: str):
     """
     Verifica a validade de um token JWT.
 
+    Tokens já verificados são respondidos pelo `token_cache` enquanto não expirarem,
+    sem decodificar e validar a assinatura novamente.
+
     Args:
         token (str): Token JWT a ser verificado.
 
@@ -38,10 +156,71 @@ def verify_token(token: str):
     Raises:
         HTTPException: Se o token estiver expirado ou for inválido.
     """
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expirado")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Token inválido")
+
+
+async def require_auth(
+    request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """
+    Dependência FastAPI que exige um token Bearer válido nas rotas protegidas.
+
+    Assíncrona para não ocupar o threadpool: com o `token_cache`, a verificação de um
+    token já visto é só uma consulta em memória. O tempo gasto é registrado na
+    requisição e devolvido no cabeçalho `Server-Timing` (métrica "auth").
+
+    Args:
+        request (Request): Requisição recebida.
+        credentials (HTTPAuthorizationCredentials): Credenciais Bearer extraídas do cabeçalho Authorization.
+
+    Returns:
+        dict: Claims do token verificado.
+
+    Raises:
+        HTTPException: Se o token estiver expirado ou for inválido.
+    """
+    start = time.perf_counter()
+    try:
+        return verify_token(credentials.credentials)
+    finally:
+        record_timing(request, "auth", time.perf_counter() - start)
+
+
+async def require_monitoring_access(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Optional[dict]:
+    """
+    Dependência FastAPI das rotas de monitoramento (`/stats` e `/metrics`).
+
+    Clientes em `MONITORING_ALLOWED_IPS` (ex: o coletor do Prometheus) acessam sem
+    token; os demais precisam de um token Bearer válido, como nas rotas de dados.
+
+    Args:
+        request (Request): Requisição recebida.
+        credentials (Optional[HTTPAuthorizationCredentials]): Credenciais Bearer, se enviadas.
+
+    Returns:
+        Optional[dict]: Claims do token verificado, ou None para um IP liberado.
+
+    Raises:
+        HTTPException: Se o cliente não estiver liberado e o token faltar, estiver
+            expirado ou for inválido.
+    """
+    if request.client is not None and request.client.host in MONITORING_ALLOWED_IPS:
+        return None
+    if credentials is None:
+        # Responde o mesmo erro das rotas de dados para requisições sem token
+        credentials = await security(request)
+    return await require_auth(request, credentials)
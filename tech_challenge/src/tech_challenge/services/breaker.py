@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+# Falhas consecutivas do site da Embrapa que abrem o circuito
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+
+# Tempo (segundos) com o circuito aberto antes de liberar uma requisição de teste
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+# Estados do circuito (o valor numérico é o exportado em /metrics)
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Erro lançado quando o circuito está aberto e a chamada é recusada sem acessar o site.
+    """
+
+
+class CircuitBreaker:
+    """
+    Disjuntor (circuit breaker) das requisições ao site da Embrapa.
+
+    Fechado, deixa todas as chamadas passarem e conta as falhas consecutivas. Ao
+    atingir `failure_threshold`, abre: as chamadas são recusadas na hora com
+    `CircuitOpenError`, sem esperar o timeout do cliente HTTP. Depois de
+    `reset_timeout` segundos, passa a meio-aberto e libera uma única chamada de
+    teste: se ela funcionar, o circuito fecha; se falhar, volta a abrir.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Estado atual do circuito (`CLOSED`, `HALF_OPEN` ou `OPEN`)."""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Verifica se uma chamada ao site pode ser feita.
+
+        Raises:
+            CircuitOpenError: Se o circuito estiver aberto, ou meio-aberto com a
+                chamada de teste já em andamento.
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError("Site da Embrapa indisponível (circuito aberto).")
+                self._state = HALF_OPEN
+                self._probing = False
+
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise CircuitOpenError(
+                        "Site da Embrapa indisponível (circuito em teste)."
+                    )
+                self._probing = True
+
+    def record_success(self) -> None:
+        """
+        Registra uma chamada bem-sucedida, fechando o circuito.
+        """
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """
+        Registra uma chamada com falha, abrindo o circuito se for a chamada de teste ou
+        se o limite de falhas consecutivas for atingido.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self) -> None:
+        """
+        Libera a chamada de teste do meio-aberto sem contar sucesso nem falha (ex: a
+        requisição foi cancelada pelo cliente); a próxima chamada passa a ser o teste.
+        """
+        with self._lock:
+            self._probing = False
+
+    def reset(self) -> None:
+        """
+        Fecha o circuito e zera as falhas consecutivas.
+        """
+        self.record_success()
+
+    def stats(self) -> dict:
+        """
+        Retorna o estado e os contadores do circuito.
+
+        Returns:
+            dict: Estado, falhas consecutivas, limites, aberturas e chamadas recusadas.
+        """
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout": self.reset_timeout,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+# Disjuntor único das requisições ao site da Embrapa
+embrapa_breaker = CircuitBreaker()
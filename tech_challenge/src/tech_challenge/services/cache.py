@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Tempo de vida (segundos) de uma entrada do cache de respostas
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "21600"))
+
+# Tamanho máximo (bytes) ocupado pelas entradas do cache de respostas
+RESPONSE_CACHE_MAX_BYTES = int(
+    os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+
+
+def estimate_size(value) -> int:
+    """
+    Estima, em bytes, a memória ocupada por uma lista de registros.
+
+    Args:
+        value: Lista de dicionários (ou qualquer objeto) a ser medida.
+
+    Returns:
+        int: Tamanho aproximado em bytes.
+    """
+    if isinstance(value, list):
+        size = sys.getsizeof(value)
+        for item in value:
+            size += estimate_size(item)
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class ResponseCache:
+    """
+    Cache em memória com expiração por tempo (TTL) e remoção LRU limitada por bytes.
+
+    As chaves são tuplas (tabela, sub-tabela, ano). Quando a soma dos tamanhos das
+    entradas ultrapassa `max_bytes`, as entradas usadas há mais tempo são removidas.
+    """
+
+    def __init__(
+        self, ttl: float = RESPONSE_CACHE_TTL, max_bytes: int = RESPONSE_CACHE_MAX_BYTES
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key: tuple) -> None:
+        _, _, nbytes = self._entries.pop(key)
+        self.current_bytes -= nbytes
+
+    def get(self, key: tuple):
+        """
+        Retorna o valor armazenado para a chave, se existir e não estiver expirado.
+
+        Args:
+            key (tuple): Chave (tabela, sub-tabela, ano).
+
+        Returns:
+            O valor armazenado ou None em caso de falta.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: tuple, value, nbytes: int = None) -> None:
+        """
+        Armazena um valor no cache, removendo entradas antigas se o limite de bytes for excedido.
+
+        Valores maiores que o limite total do cache não são armazenados.
+
+        Args:
+            key (tuple): Chave (tabela, sub-tabela, ano).
+            value: Valor a ser armazenado.
+            nbytes (int, opcional): Tamanho do valor em bytes. Se None, é estimado.
+        """
+        if nbytes is None:
+            nbytes = estimate_size(value)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, nbytes)
+            self.current_bytes += nbytes
+
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, key: tuple) -> None:
+        """
+        Remove a entrada de uma chave, se existir.
+
+        Args:
+            key (tuple): Chave (tabela, sub-tabela, ano).
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas do cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas do cache.
+
+        Returns:
+            dict: Quantidade de entradas, bytes ocupados, limites e contadores de
+            acertos, faltas, remoções, expirações e invalidações.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Cache único das respostas das abas da Embrapa
+response_cache = ResponseCache()
@@ -1,18 +1,80 @@
 import os
+import threading
+from collections import OrderedDict
 
-from sqlalchemy import MetaData, create_engine
+from sqlalchemy import MetaData, create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from tech_challenge.db_bases import UserBase
+from tech_challenge.db_bases import DynamicBase, UserBase
 from tech_challenge.schemas.db_schemas import User
 
-# Garante que a pasta 'data' exista
+# Garante que a pasta 'data' exista (pode ser trocada pela variável de ambiente DATA_DIR)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, "../../../data")
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(BASE_DIR, "../../../data"))
 os.makedirs(DATA_DIR, exist_ok=True)
 
 metadata = MetaData()
 
+# Modo de sincronização do SQLite em WAL (NORMAL só faz fsync nos checkpoints)
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Tamanho (bytes) da região do arquivo do banco mapeada em memória por conexão
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Cache de páginas por conexão (valores negativos são em KiB, como no PRAGMA cache_size)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024)))
+
+# Tempo (milissegundos) que uma conexão espera por um lock antes de falhar com "database is locked"
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+
+# Conexões somente leitura mantidas abertas no pool de leitura do banco das abas
+STORE_READ_POOL_SIZE = int(os.getenv("STORE_READ_POOL_SIZE", "8"))
+
+# Tempo (segundos) que uma escrita espera pela conexão única de escrita
+STORE_WRITE_TIMEOUT = float(os.getenv("STORE_WRITE_TIMEOUT", "30"))
+
+
+def configure_sqlite(engine, read_only: bool = False, writer: bool = False) -> None:
+    """
+    Configura as conexões SQLite de um engine para acesso concorrente em modo WAL.
+
+    Cada nova conexão recebe `busy_timeout`, `synchronous`, `cache_size` e
+    `mmap_size`. Conexões que escrevem ativam o journal WAL (persistente no arquivo),
+    em que uma escrita não bloqueia as leituras; conexões somente leitura recebem
+    `query_only`. No engine de escrita, as transações são abertas com
+    `BEGIN IMMEDIATE`, reservando o lock de escrita logo no início em vez de falhar
+    com "database is locked" ao promover uma leitura a escrita.
+
+    Args:
+        engine (sqlalchemy.Engine): Engine SQLite a ser configurado.
+        read_only (bool): Se as conexões do engine são somente leitura.
+        writer (bool): Se o engine é o de escrita, com transações `BEGIN IMMEDIATE`.
+    """
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        else:
+            cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.close()
+        if writer:
+            # Desliga o BEGIN implícito do sqlite3; o BEGIN é emitido no evento "begin"
+            dbapi_connection.isolation_level = None
+
+    if writer:
+
+        @event.listens_for(engine, "begin")
+        def begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
 # Caminho fixo para o banco de dados de usuários
 USERS_DB_PATH = os.path.join(DATA_DIR, "users.db")
 
@@ -20,9 +82,165 @@ USERS_DB_PATH = os.path.join(DATA_DIR, "users.db")
 users_engine = create_engine(
     f"sqlite:///{USERS_DB_PATH}", connect_args={"check_same_thread": False}
 )
+configure_sqlite(users_engine)
 
 # Sessão para o banco de dados de usuários
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=users_engine)
 
 # Cria apenas a tabela de usuários no banco de dados `users.db`
 UserBase.metadata.create_all(bind=users_engine)
+
+# Caminho do banco de dados único com os dados de todas as abas da Embrapa
+STORE_DB_PATH = os.path.join(DATA_DIR, "vitivinicultura.db")
+
+# Engine de escrita do banco das abas: uma única conexão, pela qual todas as escritas
+# do processo passam em fila (o pool serializa quem espera pela conexão)
+store_engine = create_engine(
+    f"sqlite:///{STORE_DB_PATH}",
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=1,
+    max_overflow=0,
+    pool_timeout=STORE_WRITE_TIMEOUT,
+)
+configure_sqlite(store_engine, writer=True)
+
+# Cria as tabelas das abas (e seus índices) no banco de dados `vitivinicultura.db`
+DynamicBase.metadata.create_all(bind=store_engine)
+
+# O create_all não cria índices novos em tabelas que já existem
+for store_table in DynamicBase.metadata.sorted_tables:
+    for index in store_table.indexes:
+        index.create(bind=store_engine, checkfirst=True)
+
+# Engine de leitura do banco das abas: pool de conexões somente leitura, que em WAL
+# leem o último commit sem esperar pela escrita em andamento
+store_read_engine = create_engine(
+    f"sqlite:///file:{STORE_DB_PATH}?mode=ro&uri=true",
+    connect_args={"check_same_thread": False},
+    poolclass=QueuePool,
+    pool_size=STORE_READ_POOL_SIZE,
+)
+configure_sqlite(store_read_engine, read_only=True)
+
+# Sessão (somente leitura) para o banco de dados das abas
+StoreSession = sessionmaker(autocommit=False, autoflush=False, bind=store_read_engine)
+
+
+def store_pool_stats() -> dict:
+    """
+    Retorna a ocupação dos pools de escrita e de leitura do banco das abas.
+
+    Returns:
+        dict: Conexões em uso e tamanho de cada pool.
+    """
+    return {
+        "writer": {
+            "in_use": store_engine.pool.checkedout(),
+            "size": store_engine.pool.size(),
+        },
+        "readers": {
+            "in_use": store_read_engine.pool.checkedout(),
+            "size": store_read_engine.pool.size(),
+        },
+    }
+
+
+# Quantidade máxima de engines mantidas abertas simultaneamente pelo registro
+ENGINE_REGISTRY_MAX_SIZE = int(os.getenv("ENGINE_REGISTRY_MAX_SIZE", "64"))
+
+
+class EngineRegistry:
+    """
+    Registro de engines SQLAlchemy compartilhado por todo o processo.
+
+    Usado apenas pela migração dos bancos de dados legados, com um arquivo por
+    tabela, sub-tabela e ano (`migrate_legacy_databases`), sem abrir um pool de
+    conexões novo a cada acesso. Mantém no máximo `max_size` engines abertos,
+    indexados pela chave (tabela, sub-tabela, ano). Quando o limite é atingido, o
+    engine usado há mais tempo é removido e tem seu pool de conexões descartado.
+    """
+
+    def __init__(self, max_size: int = ENGINE_REGISTRY_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_engine(self, key: tuple, db_path: str):
+        """
+        Retorna o engine associado à chave, criando-o se necessário.
+
+        Args:
+            key (tuple): Chave (tabela, sub-tabela, ano) do banco de dados.
+            db_path (str): Caminho do arquivo SQLite, usado apenas na criação do engine.
+
+        Returns:
+            sqlalchemy.Engine: Engine compartilhado para o banco de dados.
+        """
+        evicted = None
+        with self._lock:
+            engine = self._entries.get(key)
+            if engine is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return engine
+
+            self.misses += 1
+            engine = create_engine(
+                f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
+            )
+            self._entries[key] = engine
+
+            if len(self._entries) > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.evictions += 1
+
+        # O descarte do pool é feito fora do lock para não bloquear outras threads
+        if evicted is not None:
+            evicted.dispose()
+        return engine
+
+    def discard(self, key: tuple) -> None:
+        """
+        Remove o engine de uma chave do registro, descartando seu pool de conexões.
+
+        Args:
+            key (tuple): Chave (tabela, sub-tabela, ano) do banco de dados.
+        """
+        with self._lock:
+            engine = self._entries.pop(key, None)
+        if engine is not None:
+            engine.dispose()
+
+    def clear(self) -> None:
+        """
+        Remove todos os engines do registro, descartando seus pools de conexões.
+        """
+        with self._lock:
+            engines = list(self._entries.values())
+            self._entries.clear()
+        for engine in engines:
+            engine.dispose()
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do registro.
+
+        Returns:
+            dict: Tamanho atual, limite, acertos, faltas e remoções.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Registro único de engines da migração dos bancos de dados legados das abas
+engine_registry = EngineRegistry()
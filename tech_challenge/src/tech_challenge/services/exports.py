@@ -0,0 +1,46 @@
+from fastapi.concurrency import run_in_threadpool
+
+from tech_challenge.services.singleflight import SingleFlight
+from tech_challenge.utils.exports import EXPORT_FORMATS, write_export
+from tech_challenge.utils.scraper import ensure_years
+
+# Agrupa pedidos concorrentes da mesma exportação em uma única geração do arquivo
+export_flight = SingleFlight()
+
+
+async def get_export_file(
+    nome: str, year_from: int, year_to: int, fmt: str, sub_table: str = None
+) -> tuple[str, str]:
+    """
+    Obtém o arquivo Arrow IPC ou Parquet de um intervalo de anos de uma aba.
+
+    Os anos ausentes são obtidos da Embrapa antes da exportação; o arquivo é gerado a
+    partir do banco de dados no threadpool (uma única vez por versão dos dados, mesmo
+    com pedidos concorrentes) e reaproveitado do disco nas chamadas seguintes.
+
+    Args:
+        nome (str): Nome da aba (ex: "importacao", "exportacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        fmt (str): Formato da exportação ("arrow" ou "parquet").
+        sub_table (str, optional): Nome da sub-tabela.
+
+    Returns:
+        tuple[str, str]: Caminho do arquivo e seu tipo de conteúdo.
+
+    Raises:
+        RuntimeError: Se não for possível obter algum dos anos ausentes no banco de dados.
+    """
+    await ensure_years(nome=nome, year_from=year_from, year_to=year_to, sub_table=sub_table)
+    path = await run_in_threadpool(
+        export_flight.do,
+        (nome, sub_table, year_from, year_to, fmt),
+        write_export,
+        table=nome,
+        year_from=year_from,
+        year_to=year_to,
+        fmt=fmt,
+        sub_table=sub_table,
+    )
+    _, media_type = EXPORT_FORMATS[fmt]
+    return path, media_type
@@ -0,0 +1,105 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Idade (segundos) a partir da qual os dados salvos são servidos e atualizados em segundo plano
+DATA_SOFT_TTL = float(os.getenv("DATA_SOFT_TTL", str(24 * 3600)))
+
+# Idade (segundos) a partir da qual a requisição aguarda um novo scraping da Embrapa
+DATA_HARD_TTL = float(os.getenv("DATA_HARD_TTL", str(30 * 24 * 3600)))
+
+# Estados de frescor dos dados salvos de uma partição
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+@dataclass(frozen=True)
+class FreshnessPolicy:
+    """
+    Política de frescor dos dados salvos de uma aba.
+
+    Attributes:
+        soft_ttl (float): Até essa idade, em segundos, os dados são servidos sem atualização.
+            Depois dela, são servidos e atualizados em segundo plano.
+        hard_ttl (float): Depois dessa idade, em segundos, a requisição aguarda o scraping.
+    """
+
+    soft_ttl: float
+    hard_ttl: float
+
+    def state(self, age: Optional[float]) -> str:
+        """
+        Classifica a idade dos dados salvos.
+
+        Args:
+            age (Optional[float]): Idade em segundos, ou None se for desconhecida
+                (dados salvos antes do registro de frescor), tratada como `STALE`.
+
+        Returns:
+            str: `FRESH`, `STALE` ou `EXPIRED`.
+        """
+        if age is None:
+            return STALE
+        if age >= self.hard_ttl:
+            return EXPIRED
+        if age >= self.soft_ttl:
+            return STALE
+        return FRESH
+
+
+def policy_from_env(table: str) -> FreshnessPolicy:
+    """
+    Monta a política de uma aba a partir de `<ABA>_SOFT_TTL` e `<ABA>_HARD_TTL`
+    (ex: `IMPORTACAO_SOFT_TTL`), usando `DATA_SOFT_TTL` e `DATA_HARD_TTL` como padrão.
+
+    Args:
+        table (str): Nome da aba (ex: "importacao").
+
+    Returns:
+        FreshnessPolicy: Política da aba.
+    """
+    prefix = table.upper()
+    return FreshnessPolicy(
+        soft_ttl=float(os.getenv(f"{prefix}_SOFT_TTL", str(DATA_SOFT_TTL))),
+        hard_ttl=float(os.getenv(f"{prefix}_HARD_TTL", str(DATA_HARD_TTL))),
+    )
+
+
+# Política de frescor de cada aba da Embrapa
+FRESHNESS_POLICIES = {
+    table: policy_from_env(table)
+    for table in ("producao", "processamento", "comercializacao", "importacao", "exportacao")
+}
+
+
+def get_policy(table: str) -> FreshnessPolicy:
+    """
+    Retorna a política de frescor de uma aba.
+
+    Args:
+        table (str): Nome da aba (ex: "importacao").
+
+    Returns:
+        FreshnessPolicy: Política da aba, ou a padrão se a aba não tiver uma própria.
+    """
+    policy = FRESHNESS_POLICIES.get(table)
+    if policy is None:
+        policy = FreshnessPolicy(soft_ttl=DATA_SOFT_TTL, hard_ttl=DATA_HARD_TTL)
+    return policy
+
+
+def data_age(scraped_at: Optional[float]) -> Optional[float]:
+    """
+    Calcula a idade de dados obtidos em `scraped_at`.
+
+    Args:
+        scraped_at (Optional[float]): Timestamp Unix do scraping.
+
+    Returns:
+        Optional[float]: Idade em segundos, ou None se `scraped_at` for desconhecido.
+    """
+    if scraped_at is None:
+        return None
+    return max(0.0, time.time() - scraped_at)
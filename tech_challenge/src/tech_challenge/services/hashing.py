@@ -0,0 +1,150 @@
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tech_challenge.utils.db import hash_password, verify_password
+
+# Threads dedicadas ao bcrypt (o bcrypt libera o GIL durante o cálculo do hash)
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+# Prioridade (nice) das threads do bcrypt no Linux, para cederem CPU às rotas de dados
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", "10"))
+
+# Quantidade máxima de hashes em execução ou aguardando; acima disso, responde 429
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+
+def _lower_thread_priority(nice: int) -> None:
+    """
+    Reduz a prioridade de escalonamento da thread atual (apenas no Linux, onde o
+    `setpriority` com o id nativo da thread afeta só aquela thread).
+    """
+    if nice <= 0 or not sys.platform.startswith("linux"):
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), nice)
+    except OSError:
+        pass
+
+
+class HashingBusyError(RuntimeError):
+    """
+    Erro lançado quando a fila de hashes de senha está cheia.
+    """
+
+
+class PasswordHasher:
+    """
+    Executa o bcrypt de login e cadastro em um pool de threads próprio e limitado.
+
+    O bcrypt é propositalmente lento; rodá-lo no threadpool padrão do FastAPI faz uma
+    rajada de logins ocupar as threads usadas pelas rotas de dados. Aqui ele roda em
+    `workers` threads dedicadas, e no máximo `max_pending` operações podem estar em
+    execução ou na fila: acima disso a chamada falha na hora com `HashingBusyError`.
+    No Linux, as threads do pool rodam com prioridade reduzida (`nice`), para que o
+    event loop e as rotas de dados não disputem CPU em pé de igualdade com o bcrypt.
+    """
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        nice: int = PASSWORD_HASH_NICE,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="bcrypt",
+            initializer=_lower_thread_priority,
+            initargs=(nice,),
+        )
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusyError("Fila de hashes de senha cheia.")
+            self.pending += 1
+
+        succeeded = False
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, fn, *args)
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self.pending -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Gera o hash bcrypt de uma senha no pool dedicado.
+
+        Args:
+            password (str): Senha em texto plano.
+
+        Returns:
+            str: Hash bcrypt da senha.
+
+        Raises:
+            HashingBusyError: Se a fila de hashes estiver cheia.
+        """
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifica uma senha contra o hash armazenado no pool dedicado.
+
+        Args:
+            plain_password (str): Senha em texto plano fornecida pelo usuário.
+            hashed_password (str): Hash bcrypt armazenado.
+
+        Returns:
+            bool: True se a senha corresponder ao hash.
+
+        Raises:
+            HashingBusyError: Se a fila de hashes estiver cheia.
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """
+        Encerra as threads do pool, aguardando as operações em andamento.
+        """
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores do pool de hashes.
+
+        Returns:
+            dict: Threads, limite da fila, operações pendentes, concluídas, que falharam
+                (ex: hash inválido ou requisição cancelada) e rejeitadas.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+# Pool único de hashes de senha usado por /login e /register
+password_hasher = PasswordHasher()
@@ -0,0 +1,273 @@
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Intervalos (segundos) dos histogramas de latência, de 1 ms a 10 s
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Duração de cada etapa do caminho de dados: fetch, parse, validate, enqueue, load,
+# query e serialize
+STAGE_LATENCY = Histogram(
+    "embrapa_stage_duration_seconds",
+    "Duração das etapas de obtenção dos dados de uma aba.",
+    ["stage", "table", "sub_table"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Duração total de `get_dados_por_aba`, pela origem dos dados (db, stale, scrape ou error)
+DADOS_POR_ABA_LATENCY = Histogram(
+    "embrapa_get_dados_por_aba_duration_seconds",
+    "Duração de get_dados_por_aba, pela origem dos dados.",
+    ["table", "sub_table", "source"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Duração das requisições HTTP, pelo caminho da rota (ex: /importacao/top)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP até o fim da resposta.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Falhas ao acessar o site da Embrapa, pelo motivo (código HTTP ou tipo da exceção)
+UPSTREAM_ERRORS = Counter(
+    "embrapa_upstream_errors_total",
+    "Falhas ao acessar o site da Embrapa.",
+    ["table", "sub_table", "reason"],
+)
+
+# Páginas baixadas sem mudanças desde o último scraping (not_modified = 304, same_hash = mesmo conteúdo)
+UPSTREAM_UNCHANGED = Counter(
+    "embrapa_upstream_unchanged_total",
+    "Páginas da Embrapa sem mudanças, cujo parse e gravação foram evitados.",
+    ["table", "reason"],
+)
+
+# Atualizações em segundo plano de dados desatualizados, pelo resultado (ok ou error)
+BACKGROUND_REFRESHES = Counter(
+    "embrapa_background_refreshes_total",
+    "Atualizações em segundo plano de partições desatualizadas.",
+    ["table", "result"],
+)
+
+# Scrapings (download + parse + gravação) em andamento
+ACTIVE_SCRAPES = Gauge(
+    "embrapa_active_scrapes",
+    "Scrapings do site da Embrapa em andamento.",
+    ["table"],
+)
+
+
+def label(value: Optional[str]) -> str:
+    """
+    Converte um valor opcional (ex: sub-tabela None) em rótulo Prometheus.
+
+    Args:
+        value (Optional[str]): Valor do rótulo.
+
+    Returns:
+        str: O valor, ou "" quando None.
+    """
+    return "" if value is None else str(value)
+
+
+@contextmanager
+def observe_stage(stage: str, table: str, sub_table: Optional[str] = None):
+    """
+    Mede a duração do bloco como uma etapa em `embrapa_stage_duration_seconds`.
+
+    A duração é registrada mesmo quando o bloco lança uma exceção.
+
+    Args:
+        stage (str): Nome da etapa (ex: "fetch", "parse", "load").
+        table (str): Nome da aba.
+        sub_table (Optional[str]): Nome da sub-tabela.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage, table, label(sub_table)).observe(
+            time.perf_counter() - start
+        )
+
+
+class StatsCollector:
+    """
+    Coletor Prometheus que expõe os contadores internos já usados em `/stats`.
+
+    Os valores são lidos no momento da coleta a partir dos `stats()` do cache de
+    respostas, do cache de tokens, do `scrape_flight`, do disjuntor do site da
+    Embrapa, do pool de hashes de senha e da fila de escrita em segundo plano, sem
+    duplicar contadores nos caminhos quentes.
+    """
+
+    def collect(self):
+        # Importados aqui para evitar import circular com os módulos instrumentados
+        from tech_challenge.services.auth import token_cache
+        from tech_challenge.services.breaker import STATE_VALUES, embrapa_breaker
+        from tech_challenge.services.cache import response_cache
+        from tech_challenge.services.hashing import password_hasher
+        from tech_challenge.services.singleflight import scrape_flight
+        from tech_challenge.services.write_queue import store_writer
+
+        caches = {
+            "response": response_cache.stats(),
+            "token": token_cache.stats(),
+        }
+        lookups = CounterMetricFamily(
+            "embrapa_cache_lookups",
+            "Consultas aos caches internos, por resultado.",
+            labels=["cache", "result"],
+        )
+        hit_ratio = GaugeMetricFamily(
+            "embrapa_cache_hit_ratio",
+            "Taxa de acerto dos caches internos desde o início do processo.",
+            labels=["cache"],
+        )
+        entries = GaugeMetricFamily(
+            "embrapa_cache_entries",
+            "Entradas mantidas nos caches internos.",
+            labels=["cache"],
+        )
+        for name, stats in caches.items():
+            total = stats["hits"] + stats["misses"]
+            lookups.add_metric([name, "hit"], stats["hits"])
+            lookups.add_metric([name, "miss"], stats["misses"])
+            hit_ratio.add_metric([name], stats["hits"] / total if total else 0.0)
+            entries.add_metric([name], stats.get("entries", stats.get("size", 0)))
+        yield lookups
+        yield hit_ratio
+        yield entries
+
+        yield GaugeMetricFamily(
+            "embrapa_response_cache_bytes",
+            "Bytes ocupados pelo cache de respostas.",
+            value=caches["response"]["bytes"],
+        )
+
+        flight = scrape_flight.stats()
+        yield GaugeMetricFamily(
+            "embrapa_scrape_flight_in_flight",
+            "Scrapings distintos em andamento no scrape_flight.",
+            value=flight["in_flight"],
+        )
+        deduplicated = CounterMetricFamily(
+            "embrapa_scrape_flight_calls",
+            "Chamadas ao scrape_flight, por papel (leader executa, follower aguarda).",
+            labels=["role"],
+        )
+        deduplicated.add_metric(["leader"], flight["leaders"])
+        deduplicated.add_metric(["follower"], flight["followers"])
+        yield deduplicated
+
+        breaker = embrapa_breaker.stats()
+        yield GaugeMetricFamily(
+            "embrapa_circuit_breaker_state",
+            "Estado do disjuntor do site da Embrapa (0 = fechado, 1 = meio-aberto, 2 = aberto).",
+            value=STATE_VALUES[breaker["state"]],
+        )
+        yield CounterMetricFamily(
+            "embrapa_circuit_breaker_opened",
+            "Vezes em que o disjuntor do site da Embrapa abriu.",
+            value=breaker["opened"],
+        )
+        yield CounterMetricFamily(
+            "embrapa_circuit_breaker_rejected",
+            "Chamadas ao site da Embrapa recusadas com o disjuntor aberto.",
+            value=breaker["rejected"],
+        )
+
+        writer = store_writer.stats()
+        yield GaugeMetricFamily(
+            "embrapa_write_queue_pending",
+            "Partições obtidas da Embrapa aguardando gravação no banco.",
+            value=writer["pending"],
+        )
+        writes = CounterMetricFamily(
+            "embrapa_write_queue_writes",
+            "Partições processadas pela fila de escrita, por resultado.",
+            labels=["result"],
+        )
+        writes.add_metric(["written"], writer["written"])
+        writes.add_metric(["failed"], writer["failed"])
+        yield writes
+        yield GaugeMetricFamily(
+            "embrapa_write_queue_failed_partitions",
+            "Partições cuja gravação esgotou as tentativas e ainda não foram regravadas.",
+            value=writer["failed_partitions"],
+        )
+        yield CounterMetricFamily(
+            "embrapa_write_queue_retries",
+            "Novas tentativas agendadas de escritas da fila que falharam.",
+            value=writer["retries"],
+        )
+        yield CounterMetricFamily(
+            "embrapa_write_queue_batches",
+            "Transações (lotes) gravadas pela fila de escrita.",
+            value=writer["batches"],
+        )
+
+        hasher = password_hasher.stats()
+        yield GaugeMetricFamily(
+            "embrapa_password_hash_pending",
+            "Hashes de senha em execução ou na fila.",
+            value=hasher["pending"],
+        )
+        yield CounterMetricFamily(
+            "embrapa_password_hash_failed",
+            "Hashes de senha que terminaram com erro ou foram cancelados.",
+            value=hasher["failed"],
+        )
+        yield CounterMetricFamily(
+            "embrapa_password_hash_rejected",
+            "Hashes de senha recusados com 429 por fila cheia.",
+            value=hasher["rejected"],
+        )
+
+
+REGISTRY.register(StatsCollector())
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra a duração das requisições em `http_request_duration_seconds`.
+
+    O rótulo `route` é o caminho declarado da rota (ex: "/importacao"), e não a URL
+    da requisição, para manter a cardinalidade baixa; requisições sem rota
+    correspondente usam "unmatched". A duração vai até o fim do corpo da resposta,
+    incluindo as respostas em streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
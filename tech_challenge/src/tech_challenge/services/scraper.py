@@ -1,12 +1,229 @@
-import pandas as pd
+import time
+from typing import Iterator, Optional
 
+from fastapi.concurrency import run_in_threadpool
+
+from tech_challenge.services.cache import response_cache
+from tech_challenge.services.freshness import EXPIRED, STALE, data_age, get_policy
+from tech_challenge.services.metrics import observe_stage
+from tech_challenge.utils.common import pivot_series
+from tech_challenge.utils.db import (
+    get_dataset_version,
+    iter_records_from_db,
+    project_columns,
+    query_records_from_db,
+    record_filters,
+    table_mapping,
+)
+from tech_challenge.utils.responses import DatasetPayload, build_payload
 from tech_challenge.utils.scraper import (
+    ensure_partition,
+    ensure_years,
     generate_url,
-    get_dados_por_aba,
+    get_dados_por_aba_com_idade,
+    get_series_por_aba,
+    schedule_refresh,
 )
 
 
-def get_producao_data(year: int = None, force: bool = False) -> pd.DataFrame:
+async def get_cached_data(
+    nome: str, sub_table: str = None, year: int = None, force: bool = False
+) -> DatasetPayload:
+    """
+    Obtém os dados de uma aba, já serializados, passando pelo cache de respostas em memória.
+
+    Em caso de acerto, o corpo pré-serializado é retornado sem acessar o banco de dados
+    nem o site da Embrapa; se os dados em cache passaram do TTL suave da aba, uma
+    atualização é agendada em segundo plano, e se passaram do TTL rígido, o cache é
+    ignorado. Em caso de falta, os registros são serializados em JSON (e
+    comprimidos) uma única vez. Com `force=True`, a entrada da chave é invalidada antes
+    do novo scraping.
+
+    Args:
+        nome (str): Nome da aba (ex: "producao", "importacao").
+        sub_table (str, optional): Nome da sub-tabela.
+        year (int, optional): Ano dos dados a serem obtidos.
+        force (bool, optional): Se True, força o scraping do site, ignorando o cache e o db local.
+
+    Returns:
+        DatasetPayload: Corpo pré-serializado da resposta, com variantes comprimidas e ETag.
+    """
+    key = (nome, sub_table, year)
+    policy = get_policy(nome)
+    url = generate_url(table=nome, year=year, sub_table=sub_table)
+    if force:
+        response_cache.invalidate(key)
+    else:
+        payload = response_cache.get(key)
+        if payload is not None:
+            state = policy.state(data_age(payload.scraped_at))
+            if state == STALE:
+                schedule_refresh(nome, url, sub_table, year)
+            if state != EXPIRED:
+                return payload
+
+    records, scraped_at = await get_dados_por_aba_com_idade(
+        nome=nome, url=url, sub_table=sub_table, year=year, force=force
+    )
+    # Com idade desconhecida, os dados já são considerados desatualizados
+    fresh_until = time.time() if scraped_at is None else scraped_at + policy.soft_ttl
+    with observe_stage("serialize", nome, sub_table):
+        payload = await run_in_threadpool(
+            build_payload, records, scraped_at=scraped_at, fresh_until=fresh_until
+        )
+    response_cache.set(key, payload, nbytes=payload.nbytes)
+    return payload
+
+
+async def get_series_data(
+    nome: str,
+    year_from: int,
+    year_to: int,
+    sub_table: str = None,
+    pivot: bool = False,
+) -> DatasetPayload:
+    """
+    Obtém a série histórica de uma aba para um intervalo de anos, já serializada.
+
+    A série é montada a partir de uma única leitura do banco de dados (os anos ausentes
+    são obtidos da Embrapa concorrentemente) e passa pelo mesmo cache de respostas
+    dos dados de um único ano, com a versão atual da tabela na chave: quando novos
+    dados são salvos, a versão muda e a série é montada de novo.
+
+    Args:
+        nome (str): Nome da aba (ex: "producao", "importacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, optional): Nome da sub-tabela.
+        pivot (bool, optional): Se True, retorna uma linha por item com os valores
+            indexados por ano; caso contrário, um registro por item e ano (com "Ano").
+
+    Returns:
+        DatasetPayload: Corpo pré-serializado da série, com variantes comprimidas e ETag.
+    """
+    version = await run_in_threadpool(get_dataset_version, nome)
+    key = ("series", nome, sub_table, year_from, year_to, pivot, version)
+    payload = response_cache.get(key)
+    if payload is not None:
+        return payload
+
+    records = await get_series_por_aba(
+        nome=nome, year_from=year_from, year_to=year_to, sub_table=sub_table
+    )
+    if pivot:
+        _, schema = table_mapping[nome]
+        key_columns = [
+            field.alias or name
+            for name, field in schema.model_fields.items()
+            if field.annotation is str
+        ]
+        records = pivot_series(records, key_columns)
+    with observe_stage("serialize", nome, sub_table):
+        payload = await run_in_threadpool(build_payload, records)
+    response_cache.set(key, payload, nbytes=payload.nbytes)
+    return payload
+
+
+async def get_stream_data(
+    nome: str,
+    sub_table: str = None,
+    year: int = None,
+    year_from: int = None,
+    year_to: int = None,
+    fields: Optional[list[str]] = None,
+    **filters,
+) -> tuple[Iterator[dict], list[str]]:
+    """
+    Prepara a leitura em streaming dos dados de uma aba (um ano ou um intervalo de anos).
+
+    Garante que os dados estejam salvos no banco (fazendo o scraping do que faltar) e
+    devolve um gerador que lê as linhas do SQLite por cursor, sem carregá-las de uma vez.
+
+    Args:
+        nome (str): Nome da aba (ex: "producao", "importacao").
+        sub_table (str, optional): Nome da sub-tabela.
+        year (int, optional): Ano dos dados (quando não há intervalo de anos).
+        year_from (int, optional): Primeiro ano do intervalo (inclusive).
+        year_to (int, optional): Último ano do intervalo (inclusive).
+        fields (Optional[list[str]], optional): Colunas a retornar. Padrão é todas.
+        **filters: Filtros simples (ver `record_filters`).
+
+    Returns:
+        tuple[Iterator[dict], list[str]]: Gerador de registros no formato de resposta da
+            API e a lista de colunas desses registros.
+
+    Raises:
+        ValueError: Se campos ou filtros forem inválidos (antes de iniciar o streaming).
+        RuntimeError: Se não for possível obter os dados ausentes no banco de dados.
+    """
+    columns = [column.name for column in project_columns(nome, fields)]
+    record_filters(nome, **filters)
+    if year_from is not None:
+        await ensure_years(nome=nome, year_from=year_from, year_to=year_to, sub_table=sub_table)
+        columns.append("Ano")
+    else:
+        await ensure_partition(nome=nome, sub_table=sub_table, year=year)
+
+    records = iter_records_from_db(
+        table=nome,
+        year=year,
+        sub_table=sub_table,
+        year_from=year_from,
+        year_to=year_to,
+        fields=fields,
+        **filters,
+    )
+    return records, columns
+
+
+async def get_page_data(
+    nome: str,
+    sub_table: str = None,
+    year: int = None,
+    fields: Optional[list[str]] = None,
+    limit: int = None,
+    cursor: str = None,
+    **filters,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Obtém uma página dos dados de uma aba com projeção, filtros e paginação feitos no SQL.
+
+    Diferente de `get_cached_data`, o resultado não passa pelo cache de respostas: só as
+    linhas e colunas pedidas são lidas do banco e serializadas.
+
+    Args:
+        nome (str): Nome da aba (ex: "producao", "importacao").
+        sub_table (str, optional): Nome da sub-tabela.
+        year (int, optional): Ano dos dados.
+        fields (Optional[list[str]], optional): Colunas a retornar. Padrão é todas.
+        limit (int, optional): Tamanho da página. Se None, retorna todos os registros.
+        cursor (str, optional): Cursor da página anterior.
+        **filters: Filtros simples (ver `record_filters`).
+
+    Returns:
+        tuple[list[dict], Optional[str]]: Registros da página e o cursor da próxima página.
+
+    Raises:
+        ValueError: Se campos, filtros ou cursor forem inválidos.
+        RuntimeError: Se a partição não estiver salva e o scraping falhar.
+    """
+    await ensure_partition(nome=nome, sub_table=sub_table, year=year)
+    with observe_stage("query", nome, sub_table):
+        return await run_in_threadpool(
+            query_records_from_db,
+            table=nome,
+            year=year,
+            sub_table=sub_table,
+            fields=fields,
+            limit=limit,
+            cursor=cursor,
+            **filters,
+        )
+
+
+async def get_producao_data(
+    year: int = None, force: bool = False
+) -> DatasetPayload:
     """
     Obtém os dados de produção da Embrapa para um ano específico, com fallback local e opção de forçar scraping.
 
@@ -15,15 +232,14 @@ def get_producao_data(year: int = None, force: bool = False) -> pd.DataFrame:
         force (bool, optional): Se True, força o scraping do site, ignorando o db local.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados de produção.
+        DatasetPayload: Corpo pré-serializado com os dados de produção.
     """
-    url = generate_url(table="producao", year=year)
-    return get_dados_por_aba(nome="producao", url=url, year=year, force=force)
+    return await get_cached_data(nome="producao", year=year, force=force)
 
 
-def get_processamento_data(
+async def get_processamento_data(
     sub_table: str = None, year: int = None, force: bool = False
-) -> pd.DataFrame:
+) -> DatasetPayload:
     """
     Obtém os dados de processamento da Embrapa para uma sub-tabela e ano específicos,
     com fallback local e opção de forçar scraping.
@@ -34,15 +250,16 @@ def get_processamento_data(
         force (bool, optional): Se True, força o scraping do site, ignorando o db local.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados de processamento.
+        DatasetPayload: Corpo pré-serializado com os dados de processamento.
     """
-    url = generate_url(table="processamento", year=year, sub_table=sub_table)
-    return get_dados_por_aba(
-        nome="processamento", url=url, sub_table=sub_table, year=year, force=force
+    return await get_cached_data(
+        nome="processamento", sub_table=sub_table, year=year, force=force
     )
 
 
-def get_comercializacao_data(year: int = None, force: bool = False) -> pd.DataFrame:
+async def get_comercializacao_data(
+    year: int = None, force: bool = False
+) -> DatasetPayload:
     """
     Obtém os dados de comercialização da Embrapa para um ano específico,
     com fallback local e opção de forçar scraping.
@@ -52,15 +269,14 @@ def get_comercializacao_data(year: int = None, force: bool = False) -> pd.DataFr
         force (bool, optional): Se True, força o scraping do site, ignorando o db local.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados de comercialização.
+        DatasetPayload: Corpo pré-serializado com os dados de comercialização.
     """
-    url = generate_url(table="comercializacao", year=year)
-    return get_dados_por_aba(nome="comercializacao", url=url, year=year, force=force)
+    return await get_cached_data(nome="comercializacao", year=year, force=force)
 
 
-def get_importacao_data(
+async def get_importacao_data(
     sub_table: str = None, year: int = None, force: bool = False
-) -> pd.DataFrame:
+) -> DatasetPayload:
     """
     Obtém os dados de importação da Embrapa para uma sub-tabela e ano específicos,
     com fallback local e opção de forçar scraping.
@@ -71,17 +287,16 @@ def get_importacao_data(
         force (bool, optional): Se True, força o scraping do site, ignorando o db local.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados de importação.
+        DatasetPayload: Corpo pré-serializado com os dados de importação.
     """
-    url = generate_url(table="importacao", year=year, sub_table=sub_table)
-    return get_dados_por_aba(
-        nome="importacao", url=url, sub_table=sub_table, year=year, force=force
+    return await get_cached_data(
+        nome="importacao", sub_table=sub_table, year=year, force=force
     )
 
 
-def get_exportacao_data(
+async def get_exportacao_data(
     sub_table: str = None, year: int = None, force: bool = False
-) -> pd.DataFrame:
+) -> DatasetPayload:
     """
     Obtém os dados de exportação da Embrapa para uma sub-tabela e ano específicos,
     com fallback local e opção de forçar scraping.
@@ -92,9 +307,8 @@ def get_exportacao_data(
         force (bool, optional): Se True, força o scraping do site, ignorando o db local.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados de exportação.
+        DatasetPayload: Corpo pré-serializado com os dados de exportação.
     """
-    url = generate_url(table="exportacao", year=year, sub_table=sub_table)
-    return get_dados_por_aba(
-        nome="exportacao", url=url, sub_table=sub_table, year=year, force=force
+    return await get_cached_data(
+        nome="exportacao", sub_table=sub_table, year=year, force=force
     )
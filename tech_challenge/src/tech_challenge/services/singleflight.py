@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes para a mesma chave em uma única execução.
+
+    A primeira chamada para uma chave (a "líder") executa a função; as chamadas que
+    chegam enquanto ela está em andamento aguardam e recebem o mesmo resultado (ou a
+    mesma exceção). O estado é compartilhado por meio de `concurrent.futures.Future`,
+    então líderes e seguidores podem estar em threads diferentes ou em corrotinas.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.followers += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result=None, error=None) -> None:
+        # A chave é liberada antes de publicar o resultado: novas chamadas iniciam uma nova execução
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa `fn` uma única vez por chave entre as threads concorrentes.
+
+        Args:
+            key (Hashable): Chave que identifica a operação (ex: (tabela, sub-tabela, ano)).
+            fn (Callable): Função síncrona a ser executada pela líder.
+            *args, **kwargs: Argumentos repassados a `fn`.
+
+        Returns:
+            Any: Resultado da execução compartilhada.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """
+        Executa a corrotina `fn` uma única vez por chave entre corrotinas e threads concorrentes.
+
+        Args:
+            key (Hashable): Chave que identifica a operação (ex: (tabela, sub-tabela, ano)).
+            fn (Callable): Função assíncrona a ser executada pela líder.
+            *args, **kwargs: Argumentos repassados a `fn`.
+
+        Returns:
+            Any: Resultado da execução compartilhada.
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores de execuções.
+
+        Returns:
+            dict: Execuções em andamento, execuções líderes e chamadas agrupadas.
+        """
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "leaders": self.leaders,
+                "followers": self.followers,
+            }
+
+
+# Agrupa os scrapings concorrentes de uma mesma (tabela, sub-tabela, ano)
+scrape_flight = SingleFlight()
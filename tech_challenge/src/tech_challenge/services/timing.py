@@ -0,0 +1,56 @@
+import time
+
+from fastapi import Request
+
+# Nome do cabeçalho com as durações das etapas da requisição
+SERVER_TIMING_HEADER = b"server-timing"
+
+
+def record_timing(request: Request, name: str, seconds: float) -> None:
+    """
+    Registra a duração de uma etapa da requisição para o cabeçalho `Server-Timing`.
+
+    Args:
+        request (Request): Requisição em andamento.
+        name (str): Nome da etapa (ex: "auth").
+        seconds (float): Duração da etapa, em segundos.
+    """
+    timings = getattr(request.state, "timings", None)
+    if timings is None:
+        timings = request.state.timings = {}
+    timings[name] = timings.get(name, 0.0) + seconds
+
+
+class ServerTimingMiddleware:
+    """
+    Middleware ASGI que adiciona o cabeçalho `Server-Timing` às respostas.
+
+    Inclui as etapas registradas com `record_timing` durante a requisição e a duração
+    total ("total") até o início da resposta, em milissegundos. Por ser ASGI puro,
+    não interfere nas respostas em streaming.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                state = scope.get("state") or {}
+                timings = dict(state.get("timings") or {})
+                timings["total"] = time.perf_counter() - start
+                value = ", ".join(
+                    f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings.items()
+                )
+                headers = list(message.get("headers", []))
+                headers.append((SERVER_TIMING_HEADER, value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
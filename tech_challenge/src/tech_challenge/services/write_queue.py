@@ -0,0 +1,451 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from icecream import ic
+
+from tech_challenge.services.db import DATA_DIR
+from tech_challenge.utils.db import generate_table_name, save_partitions_in_db
+
+# Diretório onde cada escrita pendente é registrada até ser gravada no banco
+WRITE_QUEUE_DIR = os.getenv("WRITE_QUEUE_DIR", os.path.join(DATA_DIR, "write_queue"))
+
+# Quantidade máxima de partições gravadas em uma mesma transação
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "32"))
+
+# Tempo (segundos) que a thread de escrita espera para acumular escritas em um lote
+WRITE_BATCH_WINDOW = float(os.getenv("WRITE_BATCH_WINDOW", "0.05"))
+
+# Novas tentativas de uma escrita com falha antes de deixá-la para o próximo início do processo
+WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", "5"))
+
+# Espera (segundos) antes da primeira nova tentativa; dobra a cada tentativa
+WRITE_RETRY_DELAY = float(os.getenv("WRITE_RETRY_DELAY", "0.5"))
+
+# Se "1", faz fsync dos arquivos da fila (sobrevivem a queda de energia, não só do processo)
+WRITE_QUEUE_FSYNC = os.getenv("WRITE_QUEUE_FSYNC", "0") == "1"
+
+# Tempo máximo (segundos) de espera pela gravação das escritas pendentes no desligamento
+WRITE_SHUTDOWN_TIMEOUT = float(os.getenv("WRITE_SHUTDOWN_TIMEOUT", "30"))
+
+
+class WriteFailedError(RuntimeError):
+    """
+    Erro lançado ao aguardar partições cuja gravação esgotou as novas tentativas.
+    """
+
+
+@dataclass
+class PendingWrite:
+    """
+    Partição obtida da Embrapa aguardando gravação no banco de dados.
+
+    Attributes:
+        table (str): Nome da aba (ex: "importacao").
+        sub_table (Optional[str]): Nome da sub-tabela.
+        year (Optional[int]): Ano dos dados.
+        records (list[dict]): Registros de `validate_records` (nomes do modelo).
+        scraped_at (datetime): Momento em que a página foi obtida (UTC).
+        spool_path (Optional[str]): Arquivo da fila que torna a escrita durável.
+        attempts (int): Tentativas de gravação que já falharam.
+        due (float): Instante (`time.monotonic`) a partir do qual a escrita pode ser gravada.
+    """
+
+    table: str
+    sub_table: Optional[str]
+    year: Optional[int]
+    records: list[dict]
+    scraped_at: datetime
+    spool_path: Optional[str] = None
+    attempts: int = 0
+    due: float = 0.0
+
+    @property
+    def key(self) -> tuple:
+        """Chave (aba, sub-tabela, ano) da partição."""
+        return (self.table, self.sub_table, self.year)
+
+    def as_write(self) -> dict:
+        """Argumentos da partição para `save_partitions_in_db`."""
+        return {
+            "table": self.table,
+            "sub_table": self.sub_table,
+            "year": self.year,
+            "records": self.records,
+            "scraped_at": self.scraped_at,
+        }
+
+
+class WriteBehindQueue:
+    """
+    Fila de escrita em segundo plano (write-behind) das partições obtidas da Embrapa.
+
+    O scraping devolve os registros assim que o parse termina e entrega a gravação
+    à fila com `submit`. Cada escrita é antes registrada em um arquivo JSON em
+    `spool_dir`, apagado só depois do commit: escritas interrompidas (queda do
+    processo, falhas esgotadas) são regravadas no próximo `start`. Uma única thread
+    grava as escritas em lotes de até `batch_size` partições por transação
+    (`save_partitions_in_db`), esperando até `batch_window` segundos para acumular
+    o lote; se a mesma partição for enviada mais de uma vez, só a escrita mais
+    recente é gravada. As escritas de um lote com falha voltam para a fila com um
+    horário para a nova tentativa (espera exponencial, até `max_retries` vezes),
+    sem bloquear a thread: as demais escritas continuam sendo gravadas nesse meio
+    tempo. Enquanto não são gravadas, as partições ficam disponíveis em
+    `pending_records`, para que as leituras não refaçam o scraping; as que esgotam
+    as tentativas fazem `wait` lançar `WriteFailedError`.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str = WRITE_QUEUE_DIR,
+        batch_size: int = WRITE_BATCH_SIZE,
+        batch_window: float = WRITE_BATCH_WINDOW,
+        max_retries: int = WRITE_MAX_RETRIES,
+        retry_delay: float = WRITE_RETRY_DELAY,
+        fsync: bool = WRITE_QUEUE_FSYNC,
+    ):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._queue: deque[PendingWrite] = deque()
+        self._pending: dict[tuple, PendingWrite] = {}
+        self._failed: dict[tuple, str] = {}
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._sequence = itertools.count()
+        self.submitted = 0
+        self.recovered = 0
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+
+    def _spool(self, write: PendingWrite) -> str:
+        os.makedirs(self.spool_dir, exist_ok=True)
+        partition = generate_table_name(write.table, write.sub_table, write.year)
+        path = os.path.join(
+            self.spool_dir, f"{time.time_ns()}-{next(self._sequence)}-{partition}.json"
+        )
+        data = json.dumps(
+            {**write.as_write(), "scraped_at": write.scraped_at.isoformat()},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return path
+
+    def _recover(self) -> list[PendingWrite]:
+        if not os.path.isdir(self.spool_dir):
+            return []
+        queued = {write.spool_path for write in self._queue}
+        recovered = []
+        for file_name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, file_name)
+            if not file_name.endswith(".json") or path in queued:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                ic(f"Escrita pendente ilegível ignorada ({file_name}): {e}")
+                continue
+            recovered.append(
+                PendingWrite(
+                    table=data["table"],
+                    sub_table=data["sub_table"],
+                    year=data["year"],
+                    records=data["records"],
+                    scraped_at=datetime.fromisoformat(data["scraped_at"]),
+                    spool_path=path,
+                )
+            )
+        return recovered
+
+    def start(self) -> None:
+        """
+        Inicia a thread de escrita, se ainda não estiver rodando, e enfileira as
+        escritas que ficaram pendentes em `spool_dir` (ex: de uma execução interrompida).
+        """
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            recovered = self._recover()
+            for write in recovered:
+                self._queue.append(write)
+                self._pending[write.key] = write
+                self._failed.pop(write.key, None)
+            self.recovered += len(recovered)
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._run, name="store-writer", daemon=True
+            )
+            self._thread.start()
+        if recovered:
+            ic(f"{len(recovered)} escrita(s) pendente(s) recuperada(s) de {self.spool_dir}")
+
+    def submit(
+        self,
+        table: str,
+        records: list[dict],
+        sub_table: str = None,
+        year: int = None,
+        scraped_at: datetime = None,
+    ) -> PendingWrite:
+        """
+        Registra a escrita de uma partição e a entrega à thread de escrita, sem aguardá-la.
+
+        Args:
+            table (str): Nome da aba (ex: "importacao").
+            records (list[dict]): Registros de `validate_records` (nomes do modelo).
+            sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+            year (int, opcional): Ano dos dados. Padrão é None.
+            scraped_at (datetime, opcional): Momento do scraping. Padrão é agora.
+
+        Returns:
+            PendingWrite: Escrita registrada.
+        """
+        write = PendingWrite(
+            table=table,
+            sub_table=sub_table,
+            year=year,
+            records=records,
+            scraped_at=scraped_at or datetime.now(timezone.utc),
+        )
+        # Inicia (e recupera as escritas antigas) antes de registrar a nova, para não enfileirá-la duas vezes
+        self.start()
+        write.spool_path = self._spool(write)
+        with self._cond:
+            self._queue.append(write)
+            self._pending[write.key] = write
+            self._failed.pop(write.key, None)
+            self.submitted += 1
+            self._cond.notify_all()
+        return write
+
+    def pending_records(
+        self, table: str, sub_table: str = None, year: int = None
+    ) -> Optional[tuple[list[dict], float]]:
+        """
+        Retorna os registros de uma partição que ainda aguarda gravação.
+
+        Args:
+            table (str): Nome da aba (ex: "importacao").
+            sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+            year (int, opcional): Ano dos dados. Padrão é None.
+
+        Returns:
+            Optional[tuple[list[dict], float]]: Registros (nomes do modelo) e timestamp
+            Unix do scraping, ou None se a partição não tiver escrita pendente.
+        """
+        with self._cond:
+            write = self._pending.get((table, sub_table, year))
+        if write is None:
+            return None
+        return write.records, write.scraped_at.timestamp()
+
+    @staticmethod
+    def _remove_spool(writes: list[PendingWrite]) -> None:
+        for write in writes:
+            try:
+                os.remove(write.spool_path)
+            except OSError:
+                # Sem o arquivo apagado, a partição só é regravada no próximo início
+                pass
+
+    def _due_count(self, now: float) -> int:
+        return sum(1 for write in self._queue if write.due <= now)
+
+    def _next_batch(self) -> Optional[list[PendingWrite]]:
+        with self._cond:
+            while not self._due_count(time.monotonic()):
+                if self._closing:
+                    # Escritas aguardando nova tentativa ficam para o próximo início
+                    return None
+                if self._queue:
+                    # Só há escritas aguardando nova tentativa: acorda na primeira delas
+                    next_due = min(write.due for write in self._queue)
+                    self._cond.wait(next_due - time.monotonic())
+                else:
+                    self._cond.wait()
+
+            deadline = time.monotonic() + self.batch_window
+            while self._due_count(time.monotonic()) < self.batch_size and not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            now = time.monotonic()
+            batch, waiting = [], deque()
+            for write in self._queue:
+                if len(batch) < self.batch_size and write.due <= now:
+                    batch.append(write)
+                else:
+                    waiting.append(write)
+            self._queue = waiting
+            self._in_flight = len(batch)
+            return batch
+
+    def _write_batch(self, batch: list[PendingWrite]) -> None:
+        # Só a escrita mais recente de cada partição é gravada; as anteriores são descartadas
+        with self._cond:
+            current = [write for write in batch if self._pending.get(write.key) is write]
+        current_ids = {id(write) for write in current}
+        # Escritas concluídas (gravadas ou descartadas), cujos arquivos da fila são apagados
+        finished = [write for write in batch if id(write) not in current_ids]
+
+        error = None
+        try:
+            if current:
+                save_partitions_in_db([write.as_write() for write in current])
+        except Exception as e:
+            error = e
+        if error is None:
+            finished.extend(current)
+        # Os arquivos são apagados antes de a conclusão ficar visível em `wait`
+        self._remove_spool(finished)
+
+        superseded, exhausted = [], []
+        now = time.monotonic()
+        with self._cond:
+            if error is None:
+                for write in current:
+                    if self._pending.get(write.key) is write:
+                        del self._pending[write.key]
+                if current:
+                    self.written += len(current)
+                    self.batches += 1
+            else:
+                for write in current:
+                    if self._pending.get(write.key) is not write:
+                        # Uma escrita mais recente da partição chegou durante a tentativa
+                        superseded.append(write)
+                    elif write.attempts < self.max_retries:
+                        write.due = now + self.retry_delay * 2**write.attempts
+                        write.attempts += 1
+                        self._queue.append(write)
+                        self.retries += 1
+                    else:
+                        del self._pending[write.key]
+                        self._failed[write.key] = repr(error)
+                        exhausted.append(write)
+                self.failed += len(exhausted)
+            self._in_flight = 0
+            self._cond.notify_all()
+
+        self._remove_spool(superseded)
+        if error is not None:
+            message = (
+                f"Falha ao gravar {len(current)} partição(ões) ({len(exhausted)} sem novas "
+                f"tentativas, ficam para o próximo início): {error!r}"
+            )
+            ic(message)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write_batch(batch)
+
+    def wait(self, keys: Optional[Iterable[tuple]] = None, timeout: float = None) -> bool:
+        """
+        Aguarda a gravação das escritas pendentes.
+
+        Args:
+            keys (Optional[Iterable[tuple]]): Chaves (aba, sub-tabela, ano) a aguardar.
+                Padrão é aguardar todas as escritas pendentes.
+            timeout (float, opcional): Tempo máximo de espera, em segundos.
+
+        Returns:
+            bool: True se as escritas foram gravadas dentro do tempo.
+
+        Raises:
+            WriteFailedError: Se alguma das partições aguardadas (ou qualquer uma, sem
+                `keys`) esgotou as tentativas de gravação.
+        """
+        keys = None if keys is None else set(keys)
+
+        def done() -> bool:
+            if keys is None:
+                return not self._queue and not self._in_flight
+            return not keys.intersection(self._pending)
+
+        with self._cond:
+            finished = self._cond.wait_for(done, timeout)
+            failed = {
+                key: error
+                for key, error in self._failed.items()
+                if keys is None or key in keys
+            }
+        if failed:
+            partitions = ", ".join(generate_table_name(*key) for key in failed)
+            error = next(iter(failed.values()))
+            raise WriteFailedError(f"Falha ao gravar as partições {partitions}: {error}")
+        return finished
+
+    def shutdown(self, timeout: float = WRITE_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Grava as escritas pendentes e encerra a thread de escrita.
+
+        O que não for gravado dentro do tempo continua em `spool_dir` e é regravado
+        no próximo `start`.
+
+        Args:
+            timeout (float, opcional): Tempo máximo de espera, em segundos.
+
+        Returns:
+            bool: True se todas as escritas pendentes foram concluídas.
+        """
+        with self._cond:
+            thread = self._thread
+            self._closing = True
+            self._cond.notify_all()
+        if thread is None:
+            return True
+        thread.join(timeout)
+        with self._cond:
+            finished = not thread.is_alive()
+            if finished:
+                self._thread = None
+            return finished and not self._queue
+
+    def stats(self) -> dict:
+        """
+        Retorna os contadores da fila de escrita.
+
+        Returns:
+            dict: Partições pendentes, enviadas, recuperadas, gravadas, lotes, novas
+            tentativas, falhas esgotadas e partições com falha ainda não regravadas.
+        """
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "failed_partitions": len(self._failed),
+                "submitted": self.submitted,
+                "recovered": self.recovered,
+                "written": self.written,
+                "batches": self.batches,
+                "retries": self.retries,
+                "failed": self.failed,
+            }
+
+
+# Fila única de escrita em segundo plano do banco das abas da Embrapa
+store_writer = WriteBehindQueue()
@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from tech_challenge.services.db import DATA_DIR
+
+# Diretório do arquivo de páginas brutas baixadas da Embrapa (uma por URL)
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(DATA_DIR, "archive"))
+
+# Nível de compressão gzip das páginas arquivadas
+ARCHIVE_GZIP_LEVEL = 6
+
+
+def content_hash(html: str) -> str:
+    """
+    Calcula o hash do conteúdo de uma página.
+
+    Args:
+        html (str): Conteúdo HTML da página.
+
+    Returns:
+        str: SHA-256 do conteúdo em UTF-8, em hexadecimal.
+    """
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def archive_paths(url: str) -> tuple[str, str]:
+    """
+    Retorna os caminhos da página comprimida e dos metadados arquivados de uma URL.
+
+    Args:
+        url (str): URL da página no site da Embrapa.
+
+    Returns:
+        tuple[str, str]: Caminhos do `.html.gz` e do `.json`, nomeados pelo hash da URL.
+    """
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return (
+        os.path.join(ARCHIVE_DIR, f"{name}.html.gz"),
+        os.path.join(ARCHIVE_DIR, f"{name}.json"),
+    )
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def read_archive_meta(url: str) -> Optional[dict]:
+    """
+    Lê os metadados arquivados de uma URL.
+
+    Args:
+        url (str): URL da página no site da Embrapa.
+
+    Returns:
+        Optional[dict]: URL, validadores (`etag`, `last_modified`), `content_hash`,
+        `fetched_at` e a partição (`table`, `sub_table`, `year`), ou None se a URL
+        nunca foi arquivada.
+    """
+    _, meta_path = archive_paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def read_archived_html(url: str) -> Optional[str]:
+    """
+    Lê a página arquivada de uma URL.
+
+    Args:
+        url (str): URL da página no site da Embrapa.
+
+    Returns:
+        Optional[str]: Conteúdo HTML descomprimido, ou None se não estiver arquivado.
+    """
+    html_path, _ = archive_paths(url)
+    try:
+        with gzip.open(html_path, "rt", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def write_archive(
+    url: str,
+    html: Optional[str],
+    meta: dict,
+) -> dict:
+    """
+    Grava (de forma atômica) a página e os metadados de uma URL no arquivo.
+
+    Args:
+        url (str): URL da página no site da Embrapa.
+        html (Optional[str]): Conteúdo HTML. Se None, apenas os metadados são gravados
+            (ex: resposta 304, em que a página arquivada continua válida).
+        meta (dict): Validadores, hash e partição da página (ver `read_archive_meta`).
+
+    Returns:
+        dict: Metadados gravados, com `url` e `fetched_at` preenchidos.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    html_path, meta_path = archive_paths(url)
+    meta = {
+        **meta,
+        "url": url,
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if html is not None:
+        _write_atomic(
+            html_path,
+            gzip.compress(html.encode("utf-8"), compresslevel=ARCHIVE_GZIP_LEVEL, mtime=0),
+        )
+    _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return meta
+
+
+def iter_archive() -> Iterator[dict]:
+    """
+    Percorre os metadados de todas as páginas arquivadas.
+
+    Returns:
+        Iterator[dict]: Metadados de cada página (ver `read_archive_meta`).
+    """
+    if not os.path.isdir(ARCHIVE_DIR):
+        return
+    for file_name in sorted(os.listdir(ARCHIVE_DIR)):
+        if not file_name.endswith(".json"):
+            continue
+        with open(os.path.join(ARCHIVE_DIR, file_name), encoding="utf-8") as f:
+            try:
+                yield json.load(f)
+            except json.JSONDecodeError:
+                continue
@@ -1,5 +1,9 @@
 import math
 
+import numpy as np
+import pandas as pd
+
+
 def parse_quantity(value: str | int | float | None) -> int | None:
     """
     Converte um valor que representa quantidade para um inteiro, tratando casos especiais.
@@ -28,4 +32,82 @@ def parse_quantity(value: str | int | float | None) -> int | None:
         except ValueError:
             return None
 
-    return None
\ No newline at end of file
+    return None
+
+
+# Valores de texto interpretados como ausência de quantidade
+NULL_QUANTITY_TOKENS = ["-", "", "nan", "NaN"]
+
+
+def parse_quantity_column(values: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de `parse_quantity` para uma coluna inteira.
+
+    Remove os separadores de milhar ("." e ",") de todas as strings de uma vez e
+    converte "-", "", "nan", NaN e valores não numéricos para nulo, produzindo os
+    mesmos resultados de `parse_quantity` aplicada célula a célula.
+
+    Args:
+        values (pd.Series): Coluna com strings, números ou nulos.
+
+    Returns:
+        pd.Series: Coluna de inteiros anuláveis (dtype "Int64"), com o mesmo índice.
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return values.astype("Int64")
+    if pd.api.types.is_numeric_dtype(values):
+        return pd.Series(np.trunc(values.astype("float64")), index=values.index).astype(
+            "Int64"
+        )
+
+    result = pd.Series(pd.NA, index=values.index, dtype="Int64")
+
+    # Valores numéricos misturados com texto: mesmo tratamento de int()/NaN de parse_quantity
+    is_number = values.map(lambda value: isinstance(value, (int, float))).astype(bool)
+    if is_number.any():
+        numbers = values[is_number].astype("float64")
+        numbers = numbers[numbers.notna()]
+        result[numbers.index] = np.trunc(numbers).astype("int64")
+
+    is_text = values.map(type).eq(str)
+    if is_text.any():
+        text = values[is_text].str.strip()
+        text = text[~text.isin(NULL_QUANTITY_TOKENS)]
+        text = text.str.replace(".", "", regex=False).str.replace(",", "", regex=False)
+        text = text[text.str.fullmatch(r"[+-]?\d+(?:_\d+)*")]
+        result[text.index] = text.str.replace("_", "", regex=False).astype("int64")
+
+    return result
+
+
+def pivot_series(records: list[dict], key_columns: list[str]) -> list[dict]:
+    """
+    Converte uma série em formato longo (um registro por item e ano) para o formato pivotado.
+
+    Cada item passa a ter uma única linha, e cada coluna de valor vira um dicionário
+    indexado pelo ano (ex: {"Produto": "Tinto", "Quantidade (L.)": {"2019": 10, "2020": 12}}).
+    Itens repetidos dentro do mesmo ano (ex: "Tinto" em mais de uma categoria) são
+    mantidos separados pela ordem em que aparecem.
+
+    Args:
+        records (list[dict]): Registros em formato longo, com a chave "Ano".
+        key_columns (list[str]): Colunas que identificam o item (ex: ["Produto"]).
+
+    Returns:
+        list[dict]: Registros pivotados, na ordem da primeira ocorrência de cada item.
+    """
+    rows: dict[tuple, dict] = {}
+    occurrences: dict[tuple, int] = {}
+    for record in records:
+        key = tuple(record[column] for column in key_columns)
+        year = record["Ano"]
+        occurrence = occurrences.get((year, key), 0)
+        occurrences[(year, key)] = occurrence + 1
+
+        row = rows.get((key, occurrence))
+        if row is None:
+            row = rows[(key, occurrence)] = {column: record[column] for column in key_columns}
+        for column, value in record.items():
+            if column != "Ano" and column not in key_columns:
+                row.setdefault(column, {})[str(year)] = value
+    return list(rows.values())
@@ -1,12 +1,28 @@
+import base64
+import binascii
 import os
-from typing import Optional
+import re
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
 
 import bcrypt
 import pandas as pd
 from icecream import ic
-from pydantic import ValidationError
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from tech_challenge.schemas.api_schemas import (
     ComercializacaoSchema,
@@ -17,12 +33,22 @@ from tech_challenge.schemas.api_schemas import (
 )
 from tech_challenge.schemas.db_schemas import (
     Comercializacao,
+    DatasetVersion,
     Exportacao,
     Importacao,
+    PartitionFreshness,
     Processamento,
     Producao,
+    User,
+)
+from tech_challenge.services.db import (
+    DATA_DIR,
+    SessionLocal,
+    engine_registry,
+    store_engine,
+    store_read_engine,
 )
-from tech_challenge.services.db import DATA_DIR, SessionLocal
+from tech_challenge.utils.common import parse_quantity_column
 
 table_mapping = {
     "producao": (Producao, ProducaoSchema),
@@ -32,18 +58,33 @@ table_mapping = {
     "exportacao": (Exportacao, ExportacaoSchema),
 }
 
+# Linhas buscadas por vez pelo cursor das respostas em streaming
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "1000"))
+
+# Custo (log2 das iterações) do bcrypt usado nos novos hashes de senha
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Quantidade máxima de registros por página nas rotas de dados (parâmetro `limit`)
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
 
-def hash_password(password: str) -> str:
+# Rótulo da linha de totais das tabelas da Embrapa, ignorada nas agregações
+TOTAL_ROW_LABEL = "Total"
+
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """
     Gera o hash de uma senha utilizando o algoritmo bcrypt.
 
     Args:
         password (str): A senha em texto plano que será convertida em hash.
+        rounds (int, opcional): Custo do bcrypt. Padrão é `BCRYPT_ROUNDS`.
 
     Returns:
         str: A senha convertida em um hash seguro.
     """
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)
+    ).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -79,6 +120,22 @@ def get_db():
         db.close()
 
 
+def find_user(db, username: str):
+    """
+    Busca um usuário pelo nome.
+
+    A sessão continua aberta; quem a fecha é a dependência `get_db`.
+
+    Args:
+        db (Session): Sessão do banco de dados de usuários.
+        username (str): Nome de usuário.
+
+    Returns:
+        User | None: Usuário encontrado ou None.
+    """
+    return db.query(User).filter(User.username == username).first()
+
+
 def generate_table_name(
     table: str, sub_table: Optional[str] = None, year: Optional[int] = None
 ) -> str:
@@ -110,139 +167,1192 @@ def generate_table_name(
 
 def get_database_path(table: str, year: int = None, sub_table: str = None) -> str:
     """
-    Retorna o caminho completo para o arquivo de banco de dados de uma seção específica e ano.
+    Retorna o caminho completo para o arquivo de banco de dados legado de uma seção específica e ano.
+
+    Antes da consolidação no banco único, cada combinação de tabela, sub-tabela e ano
+    era salva em um arquivo próprio. O caminho é usado apenas pela migração.
 
     Args:
         table (str): Nome da seção (ex: "producao", "processamento").
-        year (int, opcional): Ano para o qual o banco de dados será criado.
+        year (int, opcional): Ano do banco de dados.
         sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
 
     Returns:
         str: Caminho completo para o arquivo de banco de dados.
     """
     section_dir = os.path.join(DATA_DIR, table)
-    os.makedirs(section_dir, exist_ok=True)
     table_name = generate_table_name(table=table, sub_table=sub_table, year=year)
     return os.path.join(section_dir, f"{table_name}.db")
 
 
-def get_engine(table: str, year: int = None, sub_table: str = None):
+def get_engine():
+    """
+    Retorna o engine SQLAlchemy de escrita do banco de dados único das abas da Embrapa.
+
+    As leituras usam o pool somente leitura `store_read_engine`.
+
+    Returns:
+        sqlalchemy.Engine: Engine de escrita (conexão única) de `vitivinicultura.db`.
+    """
+    return store_engine
+
+
+def partition_filter(model, sub_table: str = None, year: int = None):
     """
-    Retorna um engine SQLAlchemy para o banco de dados de uma seção específica e ano.
+    Monta a condição SQL que seleciona a partição (sub-tabela, ano) de uma tabela.
 
     Args:
-        table (str): Nome da tabela principal (ex: "producao", "processamento").
-        year (int, opcional): Ano para o qual o banco de dados será criado. Padrão é None.
-        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        model: Modelo ORM da tabela.
+        sub_table (str, opcional): Nome da sub-tabela. None seleciona linhas sem sub-tabela.
+        year (int, opcional): Ano dos dados. None seleciona linhas sem ano.
 
     Returns:
-        sqlalchemy.Engine: Engine SQLAlchemy conectado ao banco de dados especificado.
+        sqlalchemy.ColumnElement: Condição a ser usada em um `WHERE`.
     """
-    db_path = get_database_path(table=table, year=year, sub_table=sub_table)
-    return create_engine(
-        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}
+    return and_(
+        model.sub_table.is_(None) if sub_table is None else model.sub_table == sub_table,
+        model.year.is_(None) if year is None else model.year == year,
     )
 
 
-def create_table(table: str, year: int = None, sub_table: str = None):
+def partition_recorded(connection, table: str, sub_table: str = None, year: int = None) -> bool:
     """
-    Cria a tabela correspondente no banco de dados específico para a seção e ano.
+    Verifica, em uma conexão aberta, se uma partição já foi salva, mesmo que sem linhas.
+
+    Toda escrita registra a partição em `partition_freshness`; partições salvas antes
+    desse registro (ex: migradas dos bancos legados) são reconhecidas pelas linhas.
 
     Args:
+        connection: Conexão SQLAlchemy de leitura.
         table (str): Nome da tabela principal (ex: "producao", "processamento").
-        year (int, opcional): Ano para o qual a tabela será criada. Padrão é None.
         sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+
+    Returns:
+        bool: True se a partição estiver registrada ou tiver ao menos uma linha salva.
 
     Raises:
         ValueError: Se o modelo correspondente à tabela não for encontrado.
+    """
+    model, _ = table_mapping.get(table, (None, None))
+    if not model:
+        raise ValueError(f"Modelo para a tabela '{table}' não encontrado.")
+
+    partition = generate_table_name(table=table, sub_table=sub_table, year=year)
+    recorded = connection.execute(
+        select(PartitionFreshness.partition).where(PartitionFreshness.partition == partition)
+    ).first()
+    if recorded is not None:
+        return True
+    row = connection.execute(
+        select(model.id).where(partition_filter(model, sub_table, year)).limit(1)
+    ).first()
+    return row is not None
+
+
+def partition_exists(table: str, sub_table: str = None, year: int = None) -> bool:
+    """
+    Verifica se uma partição (sub-tabela, ano) de uma tabela já foi salva.
+
+    Uma página da Embrapa sem linhas (ex: ano ainda não publicado) também conta como
+    salva, para não ser obtida de novo a cada requisição, assim como uma partição
+    que ainda aguarda gravação na fila de escrita (`store_writer`).
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+
+    Returns:
+        bool: True se a partição já foi salva, mesmo que vazia, ou está na fila de escrita.
+    """
+    # Importado aqui para evitar import circular (a fila grava por meio deste módulo)
+    from tech_challenge.services.write_queue import store_writer
+
+    if store_writer.pending_records(table, sub_table, year) is not None:
+        return True
+    with store_read_engine.connect() as connection:
+        return partition_recorded(connection, table, sub_table, year)
+
+
+def normalize_dataframe(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """
+    Normaliza um DataFrame coluna a coluna segundo o schema Pydantic da tabela.
+
+    Equivale a validar cada linha com o schema, mas as colunas de quantidade são
+    convertidas de uma só vez com `parse_quantity_column` e as linhas cujo texto
+    (ex: "Produto", "Países") não é uma string são descartadas em bloco.
+
+    Args:
+        df (pd.DataFrame): DataFrame com os dados, com colunas pelo nome do modelo
+            ou pelo alias da resposta da API (ex: "Quantidade (L.)").
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+
+    Returns:
+        pd.DataFrame: DataFrame com as colunas do modelo; quantidades em `Int64`.
+
+    Raises:
+        ValueError: Se o schema não for encontrado ou faltar alguma coluna.
+    """
+    _, schema = table_mapping.get(table, (None, None))
+    if not schema:
+        raise ValueError(f"Schema para a tabela '{table}' não encontrado.")
+
+    columns = {}
+    text_columns = []
+    for name, field in schema.model_fields.items():
+        alias = field.alias or name
+        source = alias if alias in df.columns else name
+        if source not in df.columns:
+            raise ValueError(f"Coluna '{alias}' ausente nos dados da tabela '{table}'.")
+        if field.annotation is str:
+            columns[name] = df[source]
+            text_columns.append(name)
+        else:
+            columns[name] = parse_quantity_column(df[source])
+
+    normalized = pd.DataFrame(columns, index=df.index)
+    valid = pd.Series(True, index=df.index)
+    for name in text_columns:
+        valid &= normalized[name].map(lambda value: isinstance(value, str))
+    if not valid.all():
+        ic(f"{int((~valid).sum())} linha(s) inválida(s) descartada(s) em '{table}'")
+        normalized = normalized[valid]
+    return normalized.reset_index(drop=True)
+
+
+def validate_records(
+    df: pd.DataFrame, table: str, by_alias: bool = False
+) -> list[dict]:
+    """
+    Valida as linhas de um DataFrame com o schema Pydantic da tabela.
+
+    A validação é feita por coluna (ver `normalize_dataframe`); linhas inválidas
+    são descartadas e registradas no log.
+
+    Args:
+        df (pd.DataFrame): DataFrame com os dados extraídos da Embrapa.
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        by_alias (bool, opcional): Se True, usa os nomes de coluna da resposta da API
+            (ex: "Quantidade (L.)"); caso contrário, os nomes do modelo. Padrão é False.
+
+    Returns:
+        list[dict]: Registros validados.
+
+    Raises:
+        ValueError: Se o modelo ou schema correspondente à tabela não for encontrado.
+    """
+    normalized = normalize_dataframe(df, table)
+    if by_alias:
+        _, schema = table_mapping[table]
+        normalized = normalized.rename(
+            columns={name: field.alias or name for name, field in schema.model_fields.items()}
+        )
+    # object + None para que o SQLAlchemy e o json recebam int/None nativos
+    normalized = normalized.astype(object).where(normalized.notna(), None)
+    return normalized.to_dict(orient="records")
+
+
+def response_records(records: list[dict], table: str) -> list[dict]:
+    """
+    Converte registros validados com os nomes do modelo para os nomes da resposta da API.
+
+    Equivale a `validate_records(df, table, by_alias=True)` sobre os mesmos dados, sem
+    normalizar o DataFrame novamente.
+
+    Args:
+        records (list[dict]): Registros de `validate_records` (nomes do modelo).
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+
+    Returns:
+        list[dict]: Registros com as chaves da resposta (ex: "Produto", "Quantidade (L.)").
+    """
+    _, schema = table_mapping[table]
+    aliases = {name: field.alias or name for name, field in schema.model_fields.items()}
+    return [
+        {aliases[name]: value for name, value in record.items() if name in aliases}
+        for record in records
+    ]
+
+
+def bump_dataset_version(connection, table: str) -> None:
+    """
+    Incrementa a versão de uma tabela dentro da transação que alterou seus dados.
+
+    A versão identifica o conteúdo atual da tabela e compõe a chave dos resultados
+    derivados em cache (ex: agregações), que deixam de ser usados quando ela muda.
+
+    Args:
+        connection: Conexão SQLAlchemy com a transação de escrita em andamento.
+        table (str): Nome da tabela principal (ex: "importacao").
 
     Returns:
         None
     """
-    engine = get_engine(table, year, sub_table)
+    statement = sqlite_insert(DatasetVersion).values(
+        table_name=table, version=1, updated_at=datetime.now(timezone.utc)
+    )
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DatasetVersion.table_name],
+            set_={
+                "version": DatasetVersion.version + 1,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+    )
+
+
+@contextmanager
+def read_snapshot() -> Iterator:
+    """
+    Abre uma conexão de leitura em que todas as consultas veem o mesmo commit do banco.
+
+    O sqlite3 não abre transação para consultas; sem o `BEGIN` explícito, cada
+    consulta veria o último commit. Dentro da transação, o snapshot do WAL é fixado
+    na primeira leitura e mantido até a conexão ser devolvida ao pool.
+
+    Yields:
+        sqlalchemy.Connection: Conexão do pool de leitura.
+    """
+    with store_read_engine.connect() as connection:
+        connection.exec_driver_sql("BEGIN")
+        yield connection
 
+
+def get_dataset_version(table: str, connection=None) -> int:
+    """
+    Retorna a versão atual dos dados de uma tabela.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        connection (opcional): Conexão de leitura a ser usada (ex: de `read_snapshot`).
+            Padrão é uma conexão do pool de leitura.
+
+    Returns:
+        int: Versão da tabela, ou 0 se nenhum dado foi salvo ainda.
+    """
+    if connection is None:
+        with store_read_engine.connect() as connection:
+            return get_dataset_version(table, connection)
+
+    version = connection.execute(
+        select(DatasetVersion.version).where(DatasetVersion.table_name == table)
+    ).scalar()
+    return version or 0
+
+
+def mark_partition_scraped(
+    connection,
+    table: str,
+    sub_table: str = None,
+    year: int = None,
+    scraped_at: datetime = None,
+) -> None:
+    """
+    Registra, dentro da transação de escrita, o momento em que uma partição foi obtida da Embrapa.
+
+    Args:
+        connection: Conexão SQLAlchemy com a transação de escrita em andamento.
+        table (str): Nome da tabela principal (ex: "importacao").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+        scraped_at (datetime, opcional): Momento do scraping. Padrão é agora.
+
+    Returns:
+        None
+    """
+    statement = sqlite_insert(PartitionFreshness).values(
+        partition=generate_table_name(table=table, sub_table=sub_table, year=year),
+        table_name=table,
+        scraped_at=scraped_at or datetime.now(timezone.utc),
+    )
+    connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PartitionFreshness.partition],
+            set_={"scraped_at": statement.excluded.scraped_at},
+        )
+    )
+
+
+def touch_partition_scraped(table: str, sub_table: str = None, year: int = None) -> None:
+    """
+    Marca uma partição como obtida agora, sem alterar seus dados.
+
+    Usado quando a página da Embrapa não mudou desde o último scraping: os dados
+    salvos continuam válidos e voltam a ser considerados frescos.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+    """
+    with store_engine.begin() as connection:
+        mark_partition_scraped(connection, table, sub_table, year)
+
+
+def get_partition_scraped_at(
+    table: str, sub_table: str = None, year: int = None, connection=None
+) -> Optional[float]:
+    """
+    Retorna quando uma partição foi obtida da Embrapa pela última vez.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+        connection (opcional): Conexão de leitura a ser usada (ex: de `read_snapshot`).
+            Padrão é uma conexão do pool de leitura.
+
+    Returns:
+        Optional[float]: Timestamp Unix do último scraping, ou None se a partição
+        foi salva antes desse registro existir (ex: migrada dos bancos legados).
+    """
+    if connection is None:
+        with store_read_engine.connect() as connection:
+            return get_partition_scraped_at(table, sub_table, year, connection)
+
+    partition = generate_table_name(table=table, sub_table=sub_table, year=year)
+    scraped_at = connection.execute(
+        select(PartitionFreshness.scraped_at).where(
+            PartitionFreshness.partition == partition
+        )
+    ).scalar()
+    if scraped_at is None:
+        return None
+    # O SQLite não guarda o fuso horário; os valores são sempre gravados em UTC
+    return scraped_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+def write_partition(
+    connection,
+    table: str,
+    records: list[dict],
+    sub_table: str = None,
+    year: int = None,
+    scraped_at: datetime = None,
+) -> None:
+    """
+    Substitui, dentro da transação de escrita, as linhas de uma partição (sub-tabela, ano).
+
+    As linhas da partição são apagadas com um `DELETE` e as novas inseridas com um
+    único `INSERT` em lote (executemany); o momento do scraping é registrado em
+    `partition_freshness`. A versão da tabela não é incrementada aqui (ver
+    `bump_dataset_version`), para que um lote com várias partições a incremente uma vez.
+
+    Args:
+        connection: Conexão SQLAlchemy com a transação de escrita em andamento.
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        records (list[dict]): Registros de `validate_records` (nomes do modelo).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+        scraped_at (datetime, opcional): Momento em que a página foi obtida. Padrão é agora.
+
+    Raises:
+        ValueError: Se o modelo correspondente à tabela não for encontrado.
+    """
     model, _ = table_mapping.get(table, (None, None))
     if not model:
         raise ValueError(f"Modelo para a tabela '{table}' não encontrado.")
 
-    inspector = inspect(engine)
-    if not inspector.has_table(model.__tablename__):
-        model.__table__.create(bind=engine)
+    connection.execute(delete(model).where(partition_filter(model, sub_table, year)))
+    if records:
+        connection.execute(
+            insert(model),
+            [{**record, "sub_table": sub_table, "year": year} for record in records],
+        )
+    mark_partition_scraped(connection, table, sub_table, year, scraped_at)
 
 
 def save_data_in_db(
-    df: pd.DataFrame, table: str, year: int = None, sub_table: str = None
+    df: pd.DataFrame,
+    table: str,
+    year: int = None,
+    sub_table: str = None,
+    scraped_at: datetime = None,
 ):
     """
-    Salva os dados de um DataFrame em uma tabela dinâmica no banco de dados.
+    Salva os dados de um DataFrame na tabela correspondente do banco de dados único.
+
+    A escrita é idempotente: as linhas da partição (sub-tabela, ano) são substituídas
+    pelas novas em uma única transação (ver `write_partition`). Repetir o scraping de
+    uma partição não duplica linhas. O momento da escrita é registrado em
+    `partition_freshness` (ver `get_partition_scraped_at`).
 
     Args:
         df (pd.DataFrame): DataFrame contendo os dados a serem salvos.
         table (str): Nome da tabela principal (ex: "producao", "processamento").
         year (int, opcional): Ano para o qual os dados serão salvos.
         sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        scraped_at (datetime, opcional): Momento em que a página foi obtida. Padrão é agora.
 
     Returns:
         None
     """
-    engine = get_engine(table, year, sub_table)
-    create_table(table, year, sub_table)  # Garante que a tabela exista
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
+    model, schema = table_mapping.get(table, (None, None))
+    if not model or not schema:
+        raise ValueError(
+            f"Modelo ou schema para a tabela '{table}' não encontrado."
+        )
 
-    try:
-        model, schema = table_mapping.get(table, (None, None))
-        if not model or not schema:
-            raise ValueError(
-                f"Modelo ou schema para a tabela '{table}' não encontrado."
+    records = validate_records(df, table)
+    with store_engine.begin() as connection:
+        write_partition(connection, table, records, sub_table, year, scraped_at)
+        bump_dataset_version(connection, table)
+
+
+def save_partitions_in_db(writes: list[dict]) -> None:
+    """
+    Salva várias partições em uma única transação de escrita.
+
+    Usado pela fila de escrita em segundo plano (`store_writer`) para gravar em lote
+    os scrapings acumulados: cada partição é substituída com `write_partition` e a
+    versão de cada tabela alterada é incrementada uma única vez.
+
+    Args:
+        writes (list[dict]): Partições a salvar, cada uma com `table`, `sub_table`,
+            `year`, `records` (nomes do modelo) e `scraped_at`.
+
+    Returns:
+        None
+    """
+    with store_engine.begin() as connection:
+        for write in writes:
+            write_partition(
+                connection,
+                write["table"],
+                write["records"],
+                write["sub_table"],
+                write["year"],
+                write["scraped_at"],
             )
+        for table in sorted({write["table"] for write in writes}):
+            bump_dataset_version(connection, table)
 
-        validated_records = []
-        for record in df.to_dict(orient="records"):
-            try:
-                validated_record = schema(**record).dict(by_alias=False)
-                validated_records.append(validated_record)
-            except ValidationError as e:
-                ic(f"Erro de validação: {e}")
-
-        for record in validated_records:
-            session.add(model(**record))
-        session.commit()
-    finally:
-        session.close()
+
+def response_columns(table: str) -> list:
+    """
+    Retorna as colunas do modelo de uma tabela rotuladas com os nomes usados na resposta da API.
+
+    Colunas de quantidade são convertidas para inteiro no próprio SQL, como faz o
+    validador do schema Pydantic.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+
+    Returns:
+        list: Expressões SQLAlchemy prontas para um `select`, na ordem dos campos do schema.
+
+    Raises:
+        ValueError: Se o modelo ou schema correspondente à tabela não for encontrado.
+    """
+    model, schema = table_mapping.get(table, (None, None))
+    if not model or not schema:
+        raise ValueError(
+            f"Modelo ou schema para a tabela '{table}' não encontrado."
+        )
+
+    columns = []
+    for name, field in schema.model_fields.items():
+        column = getattr(model, name)
+        if not isinstance(column.type, String):
+            column = cast(column, Integer)
+        columns.append(column.label(field.alias or name))
+    return columns
 
 
-def load_data_from_db(
+def load_records_from_db(
     table: str, year: int = None, sub_table: str = None
-) -> pd.DataFrame:
+) -> list[dict]:
     """
-    Carrega os dados de uma tabela dinâmica no banco de dados e retorna como DataFrame.
+    Carrega os dados de uma partição (sub-tabela, ano) já no formato de resposta da API.
+
+    Caminho rápido de leitura: as colunas são lidas como tuplas diretamente do SQLite,
+    sem materializar objetos ORM, schemas Pydantic ou DataFrames.
 
     Args:
         table (str): Nome da tabela principal (ex: "producao", "processamento").
-        year (int, opcional): Ano da tabela a ser carregada.
+        year (int, opcional): Ano dos dados a serem carregados.
         sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
 
     Returns:
-        pd.DataFrame: DataFrame contendo os dados da tabela.
+        list[dict]: Registros com as chaves da resposta (ex: "Produto", "Quantidade (L.)"),
+        ou lista vazia se a partição foi salva sem linhas.
 
     Raises:
         ValueError: Se o modelo ou schema correspondente à tabela não for encontrado.
+        LookupError: Se a partição nunca foi salva.
+    """
+    model, _ = table_mapping.get(table, (None, None))
+    columns = response_columns(table)
+    keys = [column.name for column in columns]
+
+    with store_read_engine.connect() as connection:
+        rows = connection.execute(
+            select(*columns)
+            .where(partition_filter(model, sub_table, year))
+            .order_by(model.id)
+        ).all()
+
+        if not rows and not partition_recorded(connection, table, sub_table, year):
+            raise LookupError(
+                f"Nenhum dado salvo para {generate_table_name(table, sub_table, year)}."
+            )
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def load_series_from_db(
+    table: str, year_from: int, year_to: int, sub_table: str = None, connection=None
+) -> list[dict]:
     """
-    engine = get_engine(table, year, sub_table)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
+    Carrega os dados de um intervalo de anos de uma tabela com uma única consulta indexada.
+
+    Usa o mesmo caminho rápido de `load_records_from_db` (tuplas lidas direto do SQLite),
+    acrescentando a coluna "Ano" a cada registro.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        connection (opcional): Conexão de leitura a ser usada (ex: de `read_snapshot`).
+            Padrão é uma conexão do pool de leitura.
+
+    Returns:
+        list[dict]: Registros no formato de resposta da API com a chave "Ano", ordenados
+            por ano. Anos sem dados salvos simplesmente não aparecem.
 
+    Raises:
+        ValueError: Se o modelo ou schema correspondente à tabela não for encontrado.
+    """
+    if connection is None:
+        with store_read_engine.connect() as connection:
+            return load_series_from_db(table, year_from, year_to, sub_table, connection)
+
+    model, _ = table_mapping.get(table, (None, None))
+    columns = response_columns(table)
+    keys = [column.name for column in columns] + ["Ano"]
+
+    sub_table_filter = (
+        model.sub_table.is_(None) if sub_table is None else model.sub_table == sub_table
+    )
+    rows = connection.execute(
+        select(*columns, model.year)
+        .where(sub_table_filter, model.year.between(year_from, year_to))
+        .order_by(model.year, model.id)
+    ).all()
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def project_columns(table: str, fields: Optional[list[str]] = None) -> list:
+    """
+    Restringe as colunas de resposta de uma tabela aos campos pedidos (projeção).
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+        fields (Optional[list[str]], opcional): Nomes das colunas na resposta da API
+            (ex: ["Países", "Valor (US$)"]). Se None ou vazio, retorna todas.
+
+    Returns:
+        list: Expressões SQLAlchemy das colunas pedidas, na ordem pedida.
+
+    Raises:
+        ValueError: Se algum campo não existir na tabela.
+    """
+    columns = response_columns(table)
+    if not fields:
+        return columns
+
+    by_name = {column.name: column for column in columns}
+    unknown = [field for field in fields if field not in by_name]
+    if unknown:
+        raise ValueError(
+            f"Campos inválidos para a tabela '{table}': {unknown}. "
+            f"Disponíveis: {list(by_name)}."
+        )
+    return [by_name[field] for field in dict.fromkeys(fields)]
+
+
+def record_filters(
+    table: str,
+    item: str = None,
+    prefix: str = None,
+    min_valor: int = None,
+    min_quantidade: int = None,
+) -> list:
+    """
+    Traduz os filtros simples das rotas de dados em condições SQL.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+        item (str, opcional): Valor exato do campo identificador (ex: "Países", "Produto").
+        prefix (str, opcional): Prefixo do campo identificador (ex: "Vinho").
+        min_valor (int, opcional): Valor mínimo de "Valor_USD" (importação e exportação).
+        min_quantidade (int, opcional): Quantidade mínima ("Quantidade_L" ou "Quantidade_Kg").
+
+    Returns:
+        list: Condições SQLAlchemy para uso em `where`.
+
+    Raises:
+        ValueError: Se `min_valor` for usado em uma tabela sem a coluna "Valor_USD".
+    """
+    model, key_field, metrics = aggregation_fields(table)
+    key = getattr(model, key_field)
+
+    conditions = []
+    if item is not None:
+        conditions.append(key == item)
+    if prefix:
+        # Intervalo em vez de LIKE para que o índice do campo seja usado
+        conditions.append(and_(key >= prefix, key < prefix + "\U0010ffff"))
+    if min_valor is not None:
+        if "Valor_USD" not in metrics:
+            raise ValueError(f"A tabela '{table}' não possui a coluna 'Valor_USD'.")
+        conditions.append(model.Valor_USD >= min_valor)
+    if min_quantidade is not None:
+        quantity = next(name for name in metrics if name.startswith("Quantidade"))
+        conditions.append(getattr(model, quantity) >= min_quantidade)
+    return conditions
+
+
+def encode_cursor(last_id: int, version: int = 0) -> str:
+    """
+    Codifica o id da última linha de uma página, e a versão da partição lida, como cursor opaco.
+
+    Args:
+        last_id (int): Id da última linha retornada.
+        version (int, opcional): Versão da partição (ver `partition_version`). Padrão é 0.
+
+    Returns:
+        str: Cursor em base64 seguro para URLs.
+    """
+    return (
+        base64.urlsafe_b64encode(f"id:{last_id}:{version}".encode()).decode().rstrip("=")
+    )
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor recebido do cliente.
+
+    Returns:
+        tuple[int, int]: Id da última linha da página anterior e a versão da partição
+            em que ela foi lida.
+
+    Raises:
+        ValueError: Se o cursor for inválido.
+    """
     try:
-        model, schema = table_mapping.get(table, (None, None))
-        if not model or not schema:
+        decoded = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Cursor inválido.")
+    parts = decoded.split(":")
+    if len(parts) != 3 or parts[0] != "id" or not all(p.isdigit() for p in parts[1:]):
+        raise ValueError("Cursor inválido.")
+    return int(parts[1]), int(parts[2])
+
+
+def partition_version(
+    connection, table: str, sub_table: str = None, year: int = None
+) -> int:
+    """
+    Retorna a versão de uma partição: o momento do último scraping, em microssegundos.
+
+    Cada regravação da partição (ver `write_partition`) apaga e reinsere as linhas com
+    novos ids e registra um novo momento de scraping; a versão identifica, portanto,
+    o conjunto de ids ao qual um cursor se refere.
+
+    Args:
+        connection: Conexão de leitura (ex: de `read_snapshot`).
+        table (str): Nome da tabela principal (ex: "importacao").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year (int, opcional): Ano dos dados. Padrão é None.
+
+    Returns:
+        int: Versão da partição, ou 0 se o momento do scraping não foi registrado.
+    """
+    scraped_at = get_partition_scraped_at(table, sub_table, year, connection)
+    return 0 if scraped_at is None else round(scraped_at * 1_000_000)
+
+
+def query_records_from_db(
+    table: str,
+    year: int = None,
+    sub_table: str = None,
+    fields: Optional[list[str]] = None,
+    limit: int = None,
+    cursor: str = None,
+    **filters,
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Lê uma página de uma partição com projeção, filtros e paginação feitos no SQL.
+
+    A paginação é por conjunto de chaves (keyset): a página seguinte começa após o id
+    da última linha da anterior, sem `OFFSET`, então o custo não cresce com a página.
+    Como os ids mudam a cada regravação da partição, o cursor leva também a versão da
+    partição (ver `partition_version`); um cursor de uma versão anterior é recusado e
+    a paginação deve recomeçar da primeira página.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+        year (int, opcional): Ano da partição.
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        fields (Optional[list[str]], opcional): Colunas da resposta a retornar (ver `project_columns`).
+        limit (int, opcional): Quantidade máxima de registros. Se None, retorna todos.
+        cursor (str, opcional): Cursor da página anterior (ver `encode_cursor`).
+        **filters: Filtros aceitos por `record_filters` (item, prefix, min_valor, min_quantidade).
+
+    Returns:
+        tuple[list[dict], Optional[str]]: Registros da página e o cursor da próxima
+            página (None quando não há mais registros).
+
+    Raises:
+        ValueError: Se campos, filtros ou cursor forem inválidos, ou se a partição foi
+            regravada depois que o cursor foi gerado.
+    """
+    model, _ = table_mapping.get(table, (None, None))
+    columns = project_columns(table, fields)
+    keys = [column.name for column in columns]
+
+    conditions = [partition_filter(model, sub_table, year), *record_filters(table, **filters)]
+    last_id, cursor_version = decode_cursor(cursor) if cursor else (None, None)
+    if last_id is not None:
+        conditions.append(model.id > last_id)
+    statement = select(model.id, *columns).where(*conditions).order_by(model.id)
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+
+    # Versão e linhas lidas no mesmo snapshot: uma regravação entre as duas consultas
+    # não mistura ids de versões diferentes
+    with read_snapshot() as connection:
+        version = partition_version(connection, table, sub_table, year)
+        if cursor_version is not None and cursor_version != version:
             raise ValueError(
-                f"Modelo ou schema para a tabela '{table}' não encontrado."
+                "Cursor expirado: os dados da partição foram atualizados. "
+                "Recomece a paginação sem cursor."
             )
+        rows = connection.execute(statement).all()
 
-        result = session.query(model).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], version)
+    return [dict(zip(keys, row[1:])) for row in rows], next_cursor
 
-        records = [schema.from_orm(row).dict(by_alias=True) for row in result]
-        return pd.DataFrame(records)
-    finally:
-        session.close()
+
+def iter_records_from_db(
+    table: str,
+    year: int = None,
+    sub_table: str = None,
+    year_from: int = None,
+    year_to: int = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+    fields: Optional[list[str]] = None,
+    **filters,
+) -> Iterator[dict]:
+    """
+    Percorre os registros de uma partição, ou de um intervalo de anos, com um cursor do SQLite.
+
+    As linhas são buscadas em lotes de `batch_size` à medida que o gerador é consumido,
+    sem materializar o resultado inteiro. Com `year_from`/`year_to`, lê o intervalo de
+    anos (como `load_series_from_db`) e inclui a chave "Ano".
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        year (int, opcional): Ano da partição (ignorado quando há intervalo de anos).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        year_from (int, opcional): Primeiro ano do intervalo (inclusive).
+        year_to (int, opcional): Último ano do intervalo (inclusive).
+        batch_size (int, opcional): Linhas buscadas por vez. Padrão é `STREAM_BATCH_SIZE`.
+        fields (Optional[list[str]], opcional): Colunas da resposta a retornar (ver `project_columns`).
+        **filters: Filtros aceitos por `record_filters` (item, prefix, min_valor, min_quantidade).
+
+    Returns:
+        Iterator[dict]: Registros no formato de resposta da API.
+
+    Raises:
+        ValueError: Se a tabela não for encontrada ou se campos ou filtros forem inválidos.
+    """
+    model, _ = table_mapping.get(table, (None, None))
+    columns = project_columns(table, fields)
+    keys = [column.name for column in columns]
+    conditions = record_filters(table, **filters)
+
+    if year_from is None and year_to is None:
+        statement = (
+            select(*columns)
+            .where(partition_filter(model, sub_table, year), *conditions)
+            .order_by(model.id)
+        )
+    else:
+        sub_table_filter = (
+            model.sub_table.is_(None) if sub_table is None else model.sub_table == sub_table
+        )
+        statement = (
+            select(*columns, model.year)
+            .where(sub_table_filter, model.year.between(year_from, year_to), *conditions)
+            .order_by(model.year, model.id)
+        )
+        keys.append("Ano")
+
+    with store_read_engine.connect() as connection:
+        result = connection.execution_options(yield_per=batch_size).execute(statement)
+        for row in result:
+            yield dict(zip(keys, row))
+
+
+def stored_years(
+    table: str, year_from: int, year_to: int, sub_table: str = None
+) -> set[int]:
+    """
+    Retorna os anos de um intervalo já salvos para uma sub-tabela, incluindo os salvos sem linhas.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "processamento").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        set[int]: Anos registrados em `partition_freshness` ou com ao menos uma linha salva.
+    """
+    model, _ = table_mapping[table]
+    sub_table_filter = (
+        model.sub_table.is_(None) if sub_table is None else model.sub_table == sub_table
+    )
+    partitions = {
+        generate_table_name(table=table, sub_table=sub_table, year=year): year
+        for year in range(year_from, year_to + 1)
+    }
+    with store_read_engine.connect() as connection:
+        years = set(
+            connection.execute(
+                select(model.year)
+                .distinct()
+                .where(sub_table_filter, model.year.between(year_from, year_to))
+            ).scalars()
+        )
+        recorded = connection.execute(
+            select(PartitionFreshness.partition).where(
+                PartitionFreshness.partition.in_(list(partitions))
+            )
+        ).scalars()
+        years.update(partitions[partition] for partition in recorded)
+    return years
+
+
+def aggregation_fields(table: str) -> tuple:
+    """
+    Retorna as colunas usadas nas agregações de uma tabela.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+
+    Returns:
+        tuple: Modelo, campo identificador do item (ex: "Países") e um
+            dicionário {campo numérico: rótulo na resposta} (ex: {"Valor_USD": "Valor (US$)"}).
+
+    Raises:
+        ValueError: Se o modelo ou schema correspondente à tabela não for encontrado.
+    """
+    model, schema = table_mapping.get(table, (None, None))
+    if not model or not schema:
+        raise ValueError(
+            f"Modelo ou schema para a tabela '{table}' não encontrado."
+        )
+
+    key_field = None
+    metrics = {}
+    for name, field in schema.model_fields.items():
+        if field.annotation is str:
+            key_field = key_field or name
+        else:
+            metrics[name] = field.alias or name
+    return model, key_field, metrics
+
+
+def aggregation_filter(model, key_field: str, year_from: int, year_to: int, sub_table: str = None):
+    """
+    Monta o filtro comum das agregações: sub-tabela, intervalo de anos e exclusão da
+    linha de totais da própria Embrapa (para não somá-la duas vezes).
+
+    Args:
+        model: Modelo SQLAlchemy da tabela.
+        key_field (str): Campo identificador do item (ex: "Países").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        Expressão SQLAlchemy para uso em `where`.
+    """
+    sub_table_filter = (
+        model.sub_table.is_(None) if sub_table is None else model.sub_table == sub_table
+    )
+    return and_(
+        sub_table_filter,
+        model.year.between(year_from, year_to),
+        getattr(model, key_field) != TOTAL_ROW_LABEL,
+    )
+
+
+def aggregate_totals(
+    table: str, year_from: int, year_to: int, sub_table: str = None
+) -> list[dict]:
+    """
+    Calcula no SQLite os totais anuais de cada coluna numérica de uma tabela.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        list[dict]: Um registro por ano (ex: {"Ano": 2020, "Quantidade (Kg)": ...,
+            "Valor (US$)": ..., "Registros": 120}), ordenados por ano.
+    """
+    model, key_field, metrics = aggregation_fields(table)
+    columns = [
+        cast(func.sum(getattr(model, name)), Integer).label(alias)
+        for name, alias in metrics.items()
+    ]
+
+    with store_read_engine.connect() as connection:
+        rows = connection.execute(
+            select(model.year.label("Ano"), *columns, func.count().label("Registros"))
+            .where(aggregation_filter(model, key_field, year_from, year_to, sub_table))
+            .group_by(model.year)
+            .order_by(model.year)
+        ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def aggregate_top(
+    table: str,
+    metric: str,
+    year_from: int,
+    year_to: int,
+    sub_table: str = None,
+    limit: int = 10,
+) -> list[dict]:
+    """
+    Calcula no SQLite o ranking dos itens (ex: países) por uma coluna numérica,
+    somada no intervalo de anos.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        metric (str): Campo usado na ordenação (ex: "Valor_USD", "Quantidade_Kg").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        limit (int, opcional): Quantidade de itens retornados. Padrão é 10.
+
+    Returns:
+        list[dict]: Itens em ordem decrescente da métrica, com a soma de todas as colunas numéricas.
+
+    Raises:
+        ValueError: Se a métrica não for uma coluna numérica da tabela.
+    """
+    model, key_field, metrics = aggregation_fields(table)
+    if metric not in metrics:
+        raise ValueError(f"Métrica '{metric}' inválida para a tabela '{table}'.")
+
+    key = getattr(model, key_field)
+    totals = {name: func.sum(getattr(model, name)) for name in metrics}
+    with store_read_engine.connect() as connection:
+        rows = connection.execute(
+            select(
+                key.label(key_field),
+                *(cast(total, Integer).label(metrics[name]) for name, total in totals.items()),
+            )
+            .where(aggregation_filter(model, key_field, year_from, year_to, sub_table))
+            .group_by(key)
+            .order_by(totals[metric].desc(), key)
+            .limit(limit)
+        ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def aggregate_year_over_year(
+    table: str,
+    metric: str,
+    year_from: int,
+    year_to: int,
+    sub_table: str = None,
+    item: str = None,
+) -> list[dict]:
+    """
+    Calcula no SQLite a variação ano a ano de uma coluna numérica para cada item.
+
+    A variação usa a função de janela `LAG` sobre os totais por (item, ano); o ano
+    anterior a `year_from` também é lido para que o primeiro ano tenha variação.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "importacao").
+        metric (str): Campo analisado (ex: "Valor_USD", "Quantidade_Kg").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        item (str, opcional): Restringe o resultado a um item (ex: um país). Padrão é None.
+
+    Returns:
+        list[dict]: Registros com o item, "Ano", o valor, "Anterior", "Variação" e
+            "Variação (%)" (nulos quando não há dado do ano anterior), ordenados por item e ano.
+
+    Raises:
+        ValueError: Se a métrica não for uma coluna numérica da tabela.
+    """
+    model, key_field, metrics = aggregation_fields(table)
+    if metric not in metrics:
+        raise ValueError(f"Métrica '{metric}' inválida para a tabela '{table}'.")
+
+    key = getattr(model, key_field)
+    conditions = [aggregation_filter(model, key_field, year_from - 1, year_to, sub_table)]
+    if item is not None:
+        conditions.append(key == item)
+    yearly = (
+        select(
+            key.label("item"),
+            model.year.label("year"),
+            cast(func.sum(getattr(model, metric)), Integer).label("value"),
+        )
+        .where(*conditions)
+        .group_by(key, model.year)
+        .subquery()
+    )
+    window = {"partition_by": yearly.c.item, "order_by": yearly.c.year}
+    lagged = select(
+        yearly.c.item,
+        yearly.c.year,
+        yearly.c.value,
+        func.lag(yearly.c.value).over(**window).label("previous"),
+        func.lag(yearly.c.year).over(**window).label("previous_year"),
+    ).subquery()
+
+    # Só há variação quando o ano anterior imediato está salvo
+    previous = case(
+        (lagged.c.previous_year == lagged.c.year - 1, lagged.c.previous), else_=None
+    )
+    with store_read_engine.connect() as connection:
+        rows = connection.execute(
+            select(
+                lagged.c.item.label(key_field),
+                lagged.c.year.label("Ano"),
+                lagged.c.value.label(metrics[metric]),
+                previous.label("Anterior"),
+                (lagged.c.value - previous).label("Variação"),
+                func.round(
+                    (lagged.c.value - previous) * 100.0 / func.nullif(previous, 0), 2
+                ).label("Variação (%)"),
+            )
+            .where(lagged.c.year >= year_from)
+            .order_by(lagged.c.item, lagged.c.year)
+        ).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def parse_legacy_file_name(table: str, file_name: str) -> tuple[Optional[str], Optional[int]]:
+    """
+    Extrai a sub-tabela e o ano do nome de um arquivo de banco de dados legado.
+
+    Faz o caminho inverso de `generate_table_name`, por exemplo
+    "importacao_Vinhos de mesa_2023.db" -> ("Vinhos de mesa", 2023).
+
+    Args:
+        table (str): Nome da tabela principal, que prefixa o nome do arquivo.
+        file_name (str): Nome do arquivo `.db`.
+
+    Returns:
+        tuple[Optional[str], Optional[int]]: Sub-tabela e ano do arquivo.
+
+    Raises:
+        ValueError: Se o nome do arquivo não seguir o padrão de `generate_table_name`.
+    """
+    stem = file_name[: -len(".db")] if file_name.endswith(".db") else file_name
+    if stem == table:
+        return None, None
+    if not stem.startswith(f"{table}_"):
+        raise ValueError(f"Arquivo '{file_name}' não pertence à tabela '{table}'.")
+
+    match = re.fullmatch(
+        r"(?:(?P<sub_table>.+)_)?(?P<year>\d{4})|(?P<only_sub_table>.+)",
+        stem[len(table) + 1 :],
+    )
+    if match.group("year"):
+        return match.group("sub_table"), int(match.group("year"))
+    return match.group("only_sub_table"), None
+
+
+def migrate_legacy_databases(data_dir: str = DATA_DIR, remove: bool = False) -> dict:
+    """
+    Importa os bancos de dados legados (um arquivo por tabela, sub-tabela e ano) para o banco único.
+
+    A migração pode ser executada mais de uma vez: partições que já existem no banco
+    único são ignoradas.
+
+    Args:
+        data_dir (str, opcional): Pasta com os subdiretórios legados de cada tabela. Padrão é DATA_DIR.
+        remove (bool, opcional): Se True, apaga cada arquivo legado após importá-lo. Padrão é False.
+
+    Returns:
+        dict: Quantidade de arquivos importados, ignorados e de linhas migradas.
+    """
+    summary = {"imported": 0, "skipped": 0, "rows": 0}
+
+    for table, (model, _) in table_mapping.items():
+        section_dir = os.path.join(data_dir, table)
+        if not os.path.isdir(section_dir):
+            continue
+
+        columns = ", ".join(
+            f'"{column.name}"'
+            for column in model.__table__.columns
+            if column.name not in ("id", "sub_table", "year")
+        )
+
+        for file_name in sorted(os.listdir(section_dir)):
+            if not file_name.endswith(".db"):
+                continue
+            try:
+                sub_table, year = parse_legacy_file_name(table, file_name)
+            except ValueError as e:
+                ic(f"Arquivo legado ignorado: {e}")
+                summary["skipped"] += 1
+                continue
+
+            db_path = os.path.join(section_dir, file_name)
+            with store_engine.begin() as store:
+                already_migrated = store.execute(
+                    select(model.id).where(partition_filter(model, sub_table, year)).limit(1)
+                ).first()
+                legacy_engine = engine_registry.get_engine((table, sub_table, year), db_path)
+
+                if already_migrated or not inspect(legacy_engine).has_table(
+                    model.__tablename__
+                ):
+                    summary["skipped"] += 1
+                else:
+                    with legacy_engine.connect() as legacy:
+                        rows = legacy.execute(
+                            text(f"SELECT {columns} FROM {model.__tablename__} ORDER BY id")
+                        ).mappings().all()
+
+                    if rows:
+                        store.execute(
+                            model.__table__.insert(),
+                            [{**row, "sub_table": sub_table, "year": year} for row in rows],
+                        )
+                        bump_dataset_version(store, table)
+                    summary["imported"] += 1
+                    summary["rows"] += len(rows)
+
+            engine_registry.discard((table, sub_table, year))
+            if remove:
+                os.remove(db_path)
+
+    ic(f"Migração dos bancos legados concluída: {summary}")
+    return summary
@@ -0,0 +1,193 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from icecream import ic
+
+from tech_challenge.services.db import DATA_DIR
+from tech_challenge.utils.db import (
+    generate_table_name,
+    get_dataset_version,
+    load_series_from_db,
+    read_snapshot,
+    table_mapping,
+)
+
+# Diretório dos arquivos exportados (um por tabela, sub-tabela, intervalo e versão)
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(DATA_DIR, "exports"))
+
+# Extensão e tipo de conteúdo de cada formato de exportação
+EXPORT_FORMATS = {
+    "arrow": (".arrows", "application/vnd.apache.arrow.stream"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+# Compressão das colunas nos arquivos Parquet
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+
+# Versões mais recentes mantidas em disco por intervalo exportado (as anteriores podem
+# ainda estar sendo enviadas a clientes que pediram o arquivo antes da nova versão)
+EXPORT_KEEP_VERSIONS = int(os.getenv("EXPORT_KEEP_VERSIONS", "3"))
+
+
+def arrow_schema(table: str) -> pa.Schema:
+    """
+    Monta o schema Arrow de uma tabela a partir do schema Pydantic da resposta da API.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+
+    Returns:
+        pa.Schema: Colunas de texto como `string`, quantidades como `int64` e a coluna "Ano".
+
+    Raises:
+        ValueError: Se o schema correspondente à tabela não for encontrado.
+    """
+    _, schema = table_mapping.get(table, (None, None))
+    if not schema:
+        raise ValueError(f"Schema para a tabela '{table}' não encontrado.")
+
+    fields = [
+        pa.field(field.alias or name, pa.string() if field.annotation is str else pa.int64())
+        for name, field in schema.model_fields.items()
+    ]
+    return pa.schema(fields + [pa.field("Ano", pa.int16())])
+
+
+def load_arrow_table(
+    table: str, year_from: int, year_to: int, sub_table: str = None, connection=None
+) -> pa.Table:
+    """
+    Carrega os dados salvos de um intervalo de anos como uma tabela Arrow.
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+        connection (opcional): Conexão de leitura a ser usada (ex: de `read_snapshot`).
+
+    Returns:
+        pa.Table: Tabela com as colunas de `arrow_schema`.
+    """
+    records = load_series_from_db(
+        table=table,
+        year_from=year_from,
+        year_to=year_to,
+        sub_table=sub_table,
+        connection=connection,
+    )
+    return pa.Table.from_pylist(records, schema=arrow_schema(table))
+
+
+def export_path(
+    table: str, year_from: int, year_to: int, fmt: str, version: int, sub_table: str = None
+) -> str:
+    """
+    Retorna o caminho do arquivo exportado de um intervalo de anos em uma versão dos dados.
+
+    Args:
+        table (str): Nome da tabela principal.
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        fmt (str): Formato da exportação ("arrow" ou "parquet").
+        version (int): Versão da tabela (ver `get_dataset_version`).
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        str: Caminho do arquivo em `EXPORT_DIR`.
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    name = f"{generate_table_name(table, sub_table)}_{year_from}-{year_to}_v{version}{extension}"
+    return os.path.join(EXPORT_DIR, name)
+
+
+def prune_exports(
+    table: str, year_from: int, year_to: int, fmt: str, sub_table: str = None
+) -> int:
+    """
+    Remove os arquivos de versões antigas de um intervalo exportado.
+
+    As `EXPORT_KEEP_VERSIONS` versões mais recentes são mantidas, para não remover um
+    arquivo que ainda esteja sendo enviado. Arquivos que não puderem ser removidos
+    (ex: abertos no Windows) ficam para a próxima limpeza.
+
+    Args:
+        table (str): Nome da tabela principal.
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        fmt (str): Formato da exportação ("arrow" ou "parquet").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        int: Quantidade de arquivos removidos.
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    prefix = f"{generate_table_name(table, sub_table)}_{year_from}-{year_to}_v"
+    versions = []
+    for file_name in os.listdir(EXPORT_DIR):
+        if not (file_name.startswith(prefix) and file_name.endswith(extension)):
+            continue
+        version = file_name[len(prefix) : -len(extension)]
+        if version.isdigit():
+            versions.append((int(version), file_name))
+
+    removed = 0
+    for _, file_name in sorted(versions, reverse=True)[EXPORT_KEEP_VERSIONS:]:
+        try:
+            os.remove(os.path.join(EXPORT_DIR, file_name))
+            removed += 1
+        except OSError as e:
+            ic(f"Não foi possível remover a exportação antiga {file_name}: {e}")
+    return removed
+
+
+def write_export(
+    table: str, year_from: int, year_to: int, fmt: str, sub_table: str = None
+) -> str:
+    """
+    Gera (se ainda não existir) o arquivo Arrow IPC ou Parquet de um intervalo de anos.
+
+    O arquivo é identificado pela versão atual da tabela, então fica em cache no disco
+    até que novos dados sejam salvos; nesse caso, é gerado um novo arquivo e os das
+    versões antigas do mesmo intervalo são limpos (ver `prune_exports`). A versão e os
+    dados são lidos no mesmo snapshot do banco, então o arquivo sempre contém os dados
+    da versão do seu nome. A escrita é atômica (arquivo temporário seguido de
+    `os.replace`).
+
+    Args:
+        table (str): Nome da tabela principal (ex: "producao", "importacao").
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        fmt (str): Formato da exportação ("arrow" ou "parquet").
+        sub_table (str, opcional): Nome da sub-tabela. Padrão é None.
+
+    Returns:
+        str: Caminho do arquivo exportado.
+
+    Raises:
+        ValueError: Se o formato não for suportado.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação '{fmt}' não suportado.")
+
+    with read_snapshot() as connection:
+        version = get_dataset_version(table, connection)
+        path = export_path(table, year_from, year_to, fmt, version, sub_table)
+        if os.path.exists(path):
+            return path
+        arrow_table = load_arrow_table(table, year_from, year_to, sub_table, connection)
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    if fmt == "arrow":
+        with pa.OSFile(temp_path, "wb") as sink:
+            with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+    else:
+        pq.write_table(arrow_table, temp_path, compression=PARQUET_COMPRESSION)
+    os.replace(temp_path, path)
+    ic(f"Exportação gerada: {path} ({arrow_table.num_rows} linhas)")
+
+    prune_exports(table, year_from, year_to, fmt, sub_table)
+    return path
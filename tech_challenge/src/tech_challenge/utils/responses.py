@@ -0,0 +1,281 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from fastapi import Request, Response, status
+from fastapi.responses import StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+# Níveis de compressão usados na pré-serialização (feita uma vez por versão dos dados)
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+# Quantidade de linhas agrupadas em cada pedaço das respostas em streaming
+STREAM_CHUNK_ROWS = 500
+
+# Tipos de conteúdo dos formatos de streaming
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@dataclass(frozen=True)
+class DatasetPayload:
+    """
+    Corpo de resposta pré-serializado de uma versão dos dados de uma aba.
+
+    Attributes:
+        body (bytes): Registros codificados em JSON (UTF-8).
+        gzip_body (bytes): `body` comprimido com gzip.
+        brotli_body (Optional[bytes]): `body` comprimido com brotli, se a biblioteca estiver instalada.
+        etag (str): ETag forte derivado do conteúdo de `body`.
+        rows (int): Quantidade de registros.
+        scraped_at (Optional[float]): Timestamp Unix em que os dados foram obtidos da
+            Embrapa, se conhecido; usado no cabeçalho `Age`.
+        fresh_until (Optional[float]): Timestamp Unix a partir do qual os dados são
+            considerados desatualizados; usado no cabeçalho `X-Data-Stale`.
+    """
+
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+    etag: str
+    rows: int
+    scraped_at: Optional[float] = None
+    fresh_until: Optional[float] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos corpos armazenados, em bytes."""
+        return len(self.body) + len(self.gzip_body) + len(self.brotli_body or b"")
+
+
+def build_payload(
+    records: list[dict],
+    scraped_at: Optional[float] = None,
+    fresh_until: Optional[float] = None,
+) -> DatasetPayload:
+    """
+    Serializa os registros em JSON uma única vez e pré-calcula as versões comprimidas e o ETag.
+
+    A codificação é a mesma usada pelo `JSONResponse` do FastAPI.
+
+    Args:
+        records (list[dict]): Registros no formato de resposta da API.
+        scraped_at (Optional[float]): Timestamp Unix em que os dados foram obtidos.
+        fresh_until (Optional[float]): Timestamp Unix em que os dados deixam de ser frescos.
+
+    Returns:
+        DatasetPayload: Corpo pré-serializado pronto para ser servido.
+    """
+    body = json.dumps(
+        records, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+    return DatasetPayload(
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+        brotli_body=brotli.compress(body, quality=BROTLI_QUALITY) if brotli else None,
+        etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        rows=len(records),
+        scraped_at=scraped_at,
+        fresh_until=fresh_until,
+    )
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """
+    Extrai as codificações aceitas do cabeçalho `Accept-Encoding`, ignorando as com q=0.
+
+    Args:
+        accept_encoding (str): Valor do cabeçalho `Accept-Encoding`.
+
+    Returns:
+        set[str]: Codificações aceitas, em minúsculas.
+    """
+    encodings = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Verifica se o cabeçalho `If-None-Match` corresponde ao ETag informado.
+
+    Args:
+        if_none_match (str): Valor do cabeçalho `If-None-Match`.
+        etag (str): ETag atual do recurso.
+
+    Returns:
+        bool: True se o cliente já possui a versão atual.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def dataset_response(request: Request, payload: DatasetPayload) -> Response:
+    """
+    Monta a resposta HTTP de um `DatasetPayload`.
+
+    Responde 304 quando o `If-None-Match` da requisição corresponde ao ETag e, caso
+    contrário, escolhe o corpo brotli, gzip ou sem compressão de acordo com o
+    `Accept-Encoding`, sem serializar nada novamente.
+
+    Quando o payload tem informação de frescor, inclui os cabeçalhos `Age` (segundos
+    desde o scraping) e `X-Data-Stale` ("true" se os dados passaram do TTL suave e
+    estão sendo atualizados em segundo plano).
+
+    Args:
+        request (Request): Requisição recebida pela rota.
+        payload (DatasetPayload): Corpo pré-serializado dos dados.
+
+    Returns:
+        Response: Resposta 200 com o corpo adequado ou 304 sem corpo.
+    """
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding"}
+    now = time.time()
+    if payload.scraped_at is not None:
+        headers["Age"] = str(int(max(0.0, now - payload.scraped_at)))
+    if payload.fresh_until is not None:
+        headers["X-Data-Stale"] = "true" if now >= payload.fresh_until else "false"
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, payload.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    encodings = accepted_encodings(request.headers.get("accept-encoding", ""))
+    body = payload.body
+    if (
+        payload.brotli_body is not None
+        and "br" in encodings
+        and len(payload.brotli_body) < len(body)
+    ):
+        body = payload.brotli_body
+        headers["Content-Encoding"] = "br"
+    elif "gzip" in encodings and len(payload.gzip_body) < len(body):
+        body = payload.gzip_body
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def page_response(records: list[dict], next_cursor: Optional[str] = None) -> Response:
+    """
+    Monta a resposta JSON de uma página de registros.
+
+    O corpo continua sendo uma lista de registros; o cursor da próxima página, quando
+    houver, vai no cabeçalho `X-Next-Cursor`.
+
+    Args:
+        records (list[dict]): Registros da página.
+        next_cursor (Optional[str]): Cursor da próxima página, ou None na última.
+
+    Returns:
+        Response: Resposta 200 com os registros em JSON.
+    """
+    body = json.dumps(
+        records, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def iter_ndjson(records: Iterable[dict], chunk_rows: int = STREAM_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Codifica registros como NDJSON (um objeto JSON por linha), em pedaços de `chunk_rows` linhas.
+
+    Args:
+        records (Iterable[dict]): Registros no formato de resposta da API.
+        chunk_rows (int, opcional): Linhas por pedaço. Padrão é `STREAM_CHUNK_ROWS`.
+
+    Returns:
+        Iterator[bytes]: Pedaços do corpo da resposta em UTF-8.
+    """
+    lines = []
+    for record in records:
+        lines.append(
+            json.dumps(record, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+        )
+        if len(lines) >= chunk_rows:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(
+    records: Iterable[dict], columns: list[str], chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """
+    Codifica registros como CSV com cabeçalho, em pedaços de `chunk_rows` linhas.
+
+    Args:
+        records (Iterable[dict]): Registros no formato de resposta da API.
+        columns (list[str]): Colunas do CSV, na ordem do cabeçalho.
+        chunk_rows (int, opcional): Linhas por pedaço. Padrão é `STREAM_CHUNK_ROWS`.
+
+    Returns:
+        Iterator[bytes]: Pedaços do corpo da resposta em UTF-8.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, lineterminator="\n")
+    writer.writeheader()
+    rows = 0
+    for record in records:
+        writer.writerow(record)
+        rows += 1
+        if rows >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_response(records: Iterable[dict], fmt: str, columns: list[str]) -> StreamingResponse:
+    """
+    Monta uma resposta em streaming (NDJSON ou CSV) a partir de um iterador de registros.
+
+    O iterador é consumido aos poucos enquanto o corpo é enviado (no threadpool, quando
+    síncrono), de modo que nem a lista de registros nem o corpo completo ficam em memória.
+
+    Args:
+        records (Iterable[dict]): Registros no formato de resposta da API, tipicamente
+            lidos do SQLite por um cursor.
+        fmt (str): Formato da resposta ("ndjson" ou "csv").
+        columns (list[str]): Colunas dos registros (usadas no cabeçalho do CSV).
+
+    Returns:
+        StreamingResponse: Resposta com o corpo gerado incrementalmente.
+
+    Raises:
+        ValueError: Se o formato não for suportado.
+    """
+    if fmt == "ndjson":
+        body = iter_ndjson(records)
+    elif fmt == "csv":
+        body = iter_csv(records, columns)
+    else:
+        raise ValueError(f"Formato de streaming '{fmt}' não suportado.")
+    return StreamingResponse(body, media_type=STREAM_MEDIA_TYPES[fmt])
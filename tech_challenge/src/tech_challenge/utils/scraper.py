@@ -1,13 +1,122 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+from io import BytesIO
 from typing import Optional
 
+import httpx
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+from fastapi.concurrency import run_in_threadpool
 from icecream import ic
-
-from tech_challenge.utils.db import load_data_from_db, save_data_in_db
-
-URL_PREFIX = "http://vitibrasil.cnpuv.embrapa.br/index.php?"
+from lxml import etree
+
+from tech_challenge.services.breaker import CircuitOpenError, embrapa_breaker
+from tech_challenge.services.cache import response_cache
+from tech_challenge.services.db import STORE_WRITE_TIMEOUT
+from tech_challenge.services.freshness import (
+    EXPIRED,
+    FRESH,
+    STALE,
+    data_age,
+    get_policy,
+)
+from tech_challenge.services.metrics import (
+    ACTIVE_SCRAPES,
+    BACKGROUND_REFRESHES,
+    DADOS_POR_ABA_LATENCY,
+    UPSTREAM_ERRORS,
+    UPSTREAM_UNCHANGED,
+    label,
+    observe_stage,
+)
+from tech_challenge.services.singleflight import scrape_flight
+from tech_challenge.services.write_queue import store_writer
+from tech_challenge.utils.archive import (
+    content_hash,
+    iter_archive,
+    read_archive_meta,
+    read_archived_html,
+    write_archive,
+)
+from tech_challenge.utils.db import (
+    get_partition_scraped_at,
+    load_records_from_db,
+    load_series_from_db,
+    partition_exists,
+    response_records,
+    save_data_in_db,
+    stored_years,
+    touch_partition_scraped,
+    validate_records,
+)
+
+# Prefixo das URLs da Embrapa (pode apontar para um servidor local de testes)
+URL_PREFIX = os.getenv(
+    "EMBRAPA_URL_PREFIX", "http://vitibrasil.cnpuv.embrapa.br/index.php?"
+)
+
+# Classe css da tabela de dados nas páginas da Embrapa
+DATA_TABLE_CLASS = "tb_base tb_dados"
+
+# Intervalo de anos disponível no site da Embrapa
+MIN_YEAR = 1970
+MAX_YEAR = 2024
+
+# Códigos usados pela Embrapa para cada tabela (parâmetro `opcao`)
+TABLE_CODES = {
+    "producao": 2,
+    "processamento": 3,
+    "comercializacao": 4,
+    "importacao": 5,
+    "exportacao": 6,
+}
+
+# Códigos usados pela Embrapa para cada sub-tabela (parâmetro `subopcao`)
+SUB_TABLE_CODES = {
+    "producao": {},
+    "processamento": {
+        "Viníferas": 1,
+        "Americanas e híbridas": 2,
+        "Uvas de mesa": 3,
+        "Sem classificação": 4,
+    },
+    "comercializacao": {},
+    "importacao": {
+        "Vinhos de mesa": 1,
+        "Espumantes": 2,
+        "Uvas frescas": 3,
+        "Uvas passas": 4,
+        "Suco de uva": 5,
+    },
+    "exportacao": {
+        "Vinhos de mesa": 1,
+        "Espumantes": 2,
+        "Uvas frescas": 3,
+        "Suco de uva": 4,
+    },
+}
+
+# Limites do cliente HTTP compartilhado usado no scraping
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_MAX_CONCURRENCY_PER_HOST = int(os.getenv("HTTP_MAX_CONCURRENCY_PER_HOST", "4"))
+
+# Tempo máximo (segundos) que uma requisição aguarda um scraping antes de desistir dele
+UPSTREAM_LATENCY_BUDGET = float(os.getenv("UPSTREAM_LATENCY_BUDGET", "5"))
+
+# Intervalo mínimo (segundos) entre novas tentativas de atualizar uma partição após uma falha
+REFRESH_RETRY_INTERVAL = float(os.getenv("REFRESH_RETRY_INTERVAL", "60"))
+
+# Atualizações em segundo plano em andamento e momento da última falha, por (aba, sub-tabela, ano)
+_refresh_tasks: dict[tuple, asyncio.Task] = {}
+_refresh_failures: dict[tuple, float] = {}
+
+# Cliente HTTP e semáforos por host, criados sob demanda no event loop em uso
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
 
 
 def generate_url(table: str, sub_table: int = None, year: int = None) -> str:
@@ -47,9 +156,63 @@ def generate_url(table: str, sub_table: int = None, year: int = None) -> str:
     return url
 
 
-def fetch_html_from_url(url: str) -> str:
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retorna o cliente HTTP assíncrono compartilhado, com keep-alive e limite de conexões.
+
+    O cliente é criado na primeira chamada e recriado se o event loop em uso mudar.
+
+    Returns:
+        httpx.AsyncClient: Cliente HTTP compartilhado.
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _http_client_loop = loop
+        _host_semaphores.clear()
+    return _http_client
+
+
+async def close_http_client():
+    """
+    Fecha o cliente HTTP compartilhado, liberando as conexões mantidas abertas.
+    """
+    global _http_client
+
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+def get_host_semaphore(host: str) -> asyncio.Semaphore:
     """
-    Tenta acessar a URL fornecida e retorna o conteúdo HTML da página.
+    Retorna o semáforo que limita as requisições simultâneas a um mesmo host.
+
+    Args:
+        host (str): Nome do host de destino.
+
+    Returns:
+        asyncio.Semaphore: Semáforo com `HTTP_MAX_CONCURRENCY_PER_HOST` vagas.
+    """
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(HTTP_MAX_CONCURRENCY_PER_HOST)
+    return _host_semaphores[host]
+
+
+async def fetch_html_from_url(url: str) -> str:
+    """
+    Acessa a URL fornecida de forma assíncrona e retorna o conteúdo HTML da página.
+
+    Usa o cliente HTTP compartilhado, respeita o limite de requisições simultâneas por
+    host e passa pelo disjuntor do site da Embrapa (ver `request_upstream`).
 
     Args:
         url (str): Endereço da página web a ser acessada.
@@ -58,16 +221,154 @@ def fetch_html_from_url(url: str) -> str:
         str: Conteúdo HTML da página acessada.
 
     Raises:
-        requests.RequestException: Se ocorrer algum erro durante a requisição HTTP.
+        CircuitOpenError: Se o circuito do site da Embrapa estiver aberto.
+        httpx.HTTPError: Se ocorrer algum erro durante a requisição HTTP.
+    """
+    response = await request_upstream(url)
+    ic(f"Acesso bem-sucedido à URL: {url}")
+    return response.text
+
+
+async def request_upstream(url: str, headers: dict = None) -> httpx.Response:
+    """
+    Faz uma requisição GET ao site da Embrapa passando pelo disjuntor `embrapa_breaker`.
+
+    Com o circuito aberto, falha imediatamente com `CircuitOpenError`, sem ocupar o
+    semáforo do host nem esperar o timeout do cliente HTTP. Erros de conexão, timeouts
+    e respostas 5xx contam como falha do site; as demais respostas, como sucesso.
+    Requisições canceladas e erros que não vêm do transporte HTTP não contam como
+    nenhum dos dois.
+
+    Args:
+        url (str): Endereço da página.
+        headers (dict, opcional): Cabeçalhos adicionais (ex: validadores condicionais).
+
+    Returns:
+        httpx.Response: Resposta com status 2xx ou 304.
+
+    Raises:
+        CircuitOpenError: Se o circuito estiver aberto.
+        httpx.HTTPError: Se ocorrer algum erro durante a requisição HTTP.
     """
+    embrapa_breaker.before_call()
+    client = get_http_client()
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        ic(f"Acesso bem-sucedido à URL: {url}")
-        return response.text
-    except requests.RequestException as e:
+        async with get_host_semaphore(httpx.URL(url).host):
+            response = await client.get(url, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500:
+            embrapa_breaker.record_failure()
+        else:
+            embrapa_breaker.record_success()
         ic(f"Erro ao acessar {url}: {e}")
         raise
+    except httpx.TransportError as e:
+        embrapa_breaker.record_failure()
+        ic(f"Erro ao acessar {url}: {e!r}")
+        raise
+    except BaseException:
+        # Cancelamentos e erros locais não dizem nada sobre o site: só liberam a chamada
+        # de teste, se for ela
+        embrapa_breaker.release_probe()
+        raise
+    embrapa_breaker.record_success()
+    return response
+
+
+async def fetch_page(
+    url: str, nome: str, sub_table: str = None, year: int = None
+) -> tuple[str, bool]:
+    """
+    Baixa uma página da Embrapa com requisição condicional, usando o arquivo de páginas brutas.
+
+    Se a URL já foi arquivada, envia `If-None-Match` / `If-Modified-Since` com os
+    validadores guardados. Uma resposta 304, ou uma resposta 200 com o mesmo hash de
+    conteúdo da página arquivada, indica que a página não mudou. Páginas novas ou
+    alteradas são gravadas no arquivo (comprimidas) junto com os novos validadores.
+
+    Args:
+        url (str): Endereço da página.
+        nome (str): Nome da aba, guardado nos metadados para a reconstrução offline.
+        sub_table (str, opcional): Nome da sub-tabela.
+        year (int, opcional): Ano dos dados.
+
+    Returns:
+        tuple[str, bool]: Conteúdo HTML da página e se ela mudou desde o último scraping.
+
+    Raises:
+        CircuitOpenError: Se o circuito do site da Embrapa estiver aberto.
+        httpx.HTTPError: Se ocorrer algum erro durante a requisição HTTP.
+    """
+    meta = await run_in_threadpool(read_archive_meta, url)
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = await request_upstream(url, headers)
+    if response.status_code == 304:
+        html = await run_in_threadpool(read_archived_html, url)
+        if html is not None:
+            ic(f"Página não modificada (304): {url}")
+            await run_in_threadpool(write_archive, url, None, meta)
+            UPSTREAM_UNCHANGED.labels(nome, "not_modified").inc()
+            return html, False
+        # A página arquivada sumiu: baixa novamente sem validadores
+        response = await request_upstream(url)
+
+    ic(f"Acesso bem-sucedido à URL: {url}")
+    html = response.text
+    digest = content_hash(html)
+    changed = meta is None or meta.get("content_hash") != digest
+    new_meta = {
+        "etag": response.headers.get("etag"),
+        "last_modified": response.headers.get("last-modified"),
+        "content_hash": digest,
+        "table": nome,
+        "sub_table": sub_table,
+        "year": year,
+    }
+    await run_in_threadpool(write_archive, url, html if changed else None, new_meta)
+    if not changed:
+        UPSTREAM_UNCHANGED.labels(nome, "same_hash").inc()
+    return html, changed
+
+
+def find_data_table(html: str):
+    """
+    Localiza, em modo streaming, a primeira tabela com a classe 'tb_base tb_dados'.
+
+    O HTML é lido com o `iterparse` do lxml apenas até o fim da tabela procurada;
+    o restante da página não é processado.
+
+    Args:
+        html (str): Conteúdo HTML da página.
+
+    Returns:
+        lxml.etree._Element | None: Elemento da tabela ou None se não for encontrada.
+    """
+    target = None
+    events = etree.iterparse(
+        BytesIO(html.encode("utf-8")),
+        events=("start", "end"),
+        tag="table",
+        html=True,
+        encoding="utf-8",
+    )
+    for event, element in events:
+        if (
+            target is None
+            and event == "start"
+            and " ".join(element.get("class", "").split()) == DATA_TABLE_CLASS
+        ):
+            target = element
+        elif event == "end" and element is target:
+            return target
+    return target
 
 
 def parse_first_table(html: str) -> pd.DataFrame:
@@ -76,7 +377,8 @@ def parse_first_table(html: str) -> pd.DataFrame:
 
     A função localiza a primeira tabela HTML com a classe específica, extrai os dados,
     e os organiza em um DataFrame. O cabeçalho da tabela é extraído da primeira linha,
-    e as linhas subsequentes são usadas como dados.
+    e as linhas subsequentes são usadas como dados. O texto de cada célula é a junção dos
+    seus trechos de texto sem espaços nas bordas, como o `get_text(strip=True)` do BeautifulSoup.
 
     Args:
         html (str): Conteúdo HTML da página.
@@ -88,15 +390,16 @@ def parse_first_table(html: str) -> pd.DataFrame:
         AttributeError: Se a tabela esperada não for encontrada no HTML.
         ValueError: Se a tabela encontrada não contiver dados suficientes para criar um DataFrame.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    html_table = soup.find("table", {"class": "tb_base tb_dados"})
+    html_table = find_data_table(html)
+    if html_table is None:
+        raise AttributeError(f"Tabela '{DATA_TABLE_CLASS}' não encontrada no HTML.")
 
-    rows = html_table.find_all("tr")
     data = []
-
-    for row in rows:
-        cells = row.find_all(["th", "td"])
-        cells_text = [cell.get_text(strip=True) for cell in cells]
+    for row in html_table.iter("tr"):
+        cells_text = [
+            "".join(text.strip() for text in cell.itertext())
+            for cell in row.iter("th", "td")
+        ]
         data.append(cells_text)
 
     df = pd.DataFrame(data[1:], columns=data[0])
@@ -104,14 +407,245 @@ def parse_first_table(html: str) -> pd.DataFrame:
     return df
 
 
-def get_dados_por_aba(
-    nome: str, url: str, sub_table: str = None, year: int = None, force: bool = False
-) -> pd.DataFrame:
+def parse_and_save(
+    html: str, nome: str, sub_table: str = None, year: int = None
+) -> list[dict]:
     """
-    Obtém os dados de uma aba específica do site da Embrapa com fallback para o banco de dados local.
+    Extrai a tabela do HTML de uma aba, entrega a gravação à fila de escrita e retorna os registros validados.
+
+    A gravação no banco de dados é feita em segundo plano (write-behind) por
+    `store_writer`; os registros são retornados assim que o parse e a validação
+    terminam, sem aguardar o `INSERT` e o commit.
+
+    Args:
+        html (str): Conteúdo HTML da página da aba.
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+
+    Returns:
+        list[dict]: Registros no formato de resposta da API.
+    """
+    with observe_stage("parse", nome, sub_table):
+        df = parse_first_table(html)
+    with observe_stage("validate", nome, sub_table):
+        records = validate_records(df, table=nome)
+    with observe_stage("enqueue", nome, sub_table):
+        store_writer.submit(nome, records, sub_table=sub_table, year=year)
+    return response_records(records, nome)
+
+
+def load_unchanged_partition(
+    nome: str, sub_table: str = None, year: int = None
+) -> Optional[list[dict]]:
+    """
+    Reaproveita os dados salvos de uma partição cuja página não mudou na Embrapa.
+
+    Uma partição que ainda aguarda gravação na fila de escrita é respondida com os
+    registros da fila, que são mais recentes que os do banco.
+
+    Args:
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+
+    Returns:
+        Optional[list[dict]]: Registros salvos, com a partição marcada como obtida agora,
+        ou None se a partição não estiver no banco (e a página precisar ser processada).
+    """
+    pending = store_writer.pending_records(nome, sub_table, year)
+    if pending is not None:
+        return response_records(pending[0], nome)
+    if not partition_exists(table=nome, sub_table=sub_table, year=year):
+        return None
+    touch_partition_scraped(table=nome, sub_table=sub_table, year=year)
+    with observe_stage("load", nome, sub_table):
+        return load_records_from_db(table=nome, year=year, sub_table=sub_table)
+
+
+async def scrape_aba(
+    nome: str, url: str, sub_table: str = None, year: int = None
+) -> list[dict]:
+    """
+    Faz o scraping de uma aba: baixa a página, extrai a tabela e a entrega à fila de escrita.
+
+    A página é baixada com requisição condicional (`fetch_page`); se ela não mudou
+    desde o último scraping e a partição já está salva, o parse e a gravação são
+    evitados e os dados salvos são retornados.
+
+    A duração de cada etapa, as falhas de acesso ao site e a quantidade de scrapings
+    em andamento são exportadas em `/metrics`.
+
+    Args:
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        url (str): URL da aba no site da Embrapa.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+
+    Returns:
+        list[dict]: Registros no formato de resposta da API.
+    """
+    with ACTIVE_SCRAPES.labels(nome).track_inprogress():
+        try:
+            with observe_stage("fetch", nome, sub_table):
+                html, changed = await fetch_page(url, nome, sub_table, year)
+        except httpx.HTTPStatusError as e:
+            UPSTREAM_ERRORS.labels(
+                nome, label(sub_table), str(e.response.status_code)
+            ).inc()
+            raise
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            UPSTREAM_ERRORS.labels(nome, label(sub_table), type(e).__name__).inc()
+            raise
+        if not changed:
+            records = await run_in_threadpool(
+                load_unchanged_partition, nome=nome, sub_table=sub_table, year=year
+            )
+            if records is not None:
+                return records
+        return await run_in_threadpool(
+            parse_and_save, html=html, nome=nome, sub_table=sub_table, year=year
+        )
 
-    A função tenta primeiro carregar os dados do banco de dados local. Caso não existam ou se `force` for True,
-    realiza scraping da página HTML, extrai a tabela, salva os dados no banco e retorna os dados.
+
+async def scrape_with_budget(
+    nome: str,
+    url: str,
+    sub_table: str = None,
+    year: int = None,
+    budget: float = None,
+) -> list[dict]:
+    """
+    Faz o scraping de uma aba (deduplicado por `scrape_flight`) aguardando no máximo `budget` segundos.
+
+    Se o orçamento se esgotar, a requisição desiste com `TimeoutError`, mas o scraping
+    não é cancelado: ele continua em segundo plano e salva os dados para as próximas
+    requisições (e para as que estiverem aguardando a mesma chave).
+
+    Args:
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        url (str): URL da aba no site da Embrapa.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+        budget (float, opcional): Tempo máximo de espera. Padrão é `UPSTREAM_LATENCY_BUDGET`.
+
+    Returns:
+        list[dict]: Registros no formato de resposta da API.
+
+    Raises:
+        TimeoutError: Se o scraping não terminar dentro do orçamento.
+        CircuitOpenError: Se o circuito do site da Embrapa estiver aberto.
+        httpx.HTTPError: Se o acesso ao site falhar.
+    """
+    if budget is None:
+        budget = UPSTREAM_LATENCY_BUDGET
+    task = asyncio.ensure_future(
+        scrape_flight.do_async(
+            (nome, sub_table, year), scrape_aba, nome, url, sub_table, year
+        )
+    )
+    # Consome o resultado se ninguém mais aguardar a tarefa (evita avisos de exceção não lida)
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=budget)
+    except asyncio.TimeoutError:
+        raise TimeoutError(
+            f"Scraping de {nome}_{sub_table}_{year} excedeu o orçamento de {budget:g}s."
+        )
+
+
+def refresh_backoff_active(key: tuple) -> bool:
+    """
+    Indica se a última tentativa de atualizar uma partição falhou há menos de
+    `REFRESH_RETRY_INTERVAL` segundos.
+
+    Args:
+        key (tuple): Chave (aba, sub-tabela, ano).
+
+    Returns:
+        bool: True se uma nova tentativa ainda deve ser evitada.
+    """
+    failed_at = _refresh_failures.get(key)
+    return failed_at is not None and time.monotonic() - failed_at < REFRESH_RETRY_INTERVAL
+
+
+async def refresh_aba(nome: str, url: str, sub_table: str = None, year: int = None) -> None:
+    """
+    Refaz o scraping de uma partição desatualizada e descarta a resposta em cache dela.
+
+    Falhas são apenas registradas: os dados salvos continuam sendo servidos e uma
+    nova tentativa só é feita após `REFRESH_RETRY_INTERVAL` segundos.
+
+    Args:
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        url (str): URL da aba no site da Embrapa.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+    """
+    key = (nome, sub_table, year)
+    try:
+        await scrape_flight.do_async(key, scrape_aba, nome, url, sub_table, year)
+    except Exception as e:
+        ic(f"Falha ao atualizar {nome}_{sub_table}_{year} em segundo plano: {e}")
+        _refresh_failures[key] = time.monotonic()
+        BACKGROUND_REFRESHES.labels(nome, "error").inc()
+        return
+    _refresh_failures.pop(key, None)
+    response_cache.invalidate(key)
+    BACKGROUND_REFRESHES.labels(nome, "ok").inc()
+
+
+def schedule_refresh(nome: str, url: str, sub_table: str = None, year: int = None) -> bool:
+    """
+    Agenda a atualização em segundo plano de uma partição, sem aguardá-la.
+
+    Cada partição tem no máximo uma atualização agendada por vez, e nenhuma é
+    agendada enquanto a última falha for recente (ver `refresh_backoff_active`).
+
+    Args:
+        nome (str): Nome da aba (e da tabela no banco de dados).
+        url (str): URL da aba no site da Embrapa.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+
+    Returns:
+        bool: True se uma nova atualização foi agendada.
+    """
+    key = (nome, sub_table, year)
+    task = _refresh_tasks.get(key)
+    if (task is not None and not task.done()) or refresh_backoff_active(key):
+        return False
+
+    task = asyncio.get_running_loop().create_task(
+        refresh_aba(nome, url, sub_table, year)
+    )
+    _refresh_tasks[key] = task
+    task.add_done_callback(
+        lambda done: _refresh_tasks.pop(key, None) if _refresh_tasks.get(key) is done else None
+    )
+    return True
+
+
+async def get_dados_por_aba_com_idade(
+    nome: str, url: str, sub_table: str = None, year: int = None, force: bool = False
+) -> tuple[list[dict], Optional[float]]:
+    """
+    Obtém os dados de uma aba aplicando a política de frescor da aba (stale-while-revalidate).
+
+    Os dados salvos no banco de dados (ou ainda na fila de escrita, ver `store_writer`)
+    são classificados pela idade do último scraping (ver `FreshnessPolicy`):
+    - frescos: são retornados diretamente;
+    - desatualizados (após o TTL suave): são retornados diretamente e uma atualização
+      deduplicada é agendada em segundo plano (`schedule_refresh`);
+    - expirados (após o TTL rígido): a requisição aguarda um novo scraping; se ele
+      falhar, os dados salvos são retornados mesmo assim.
+
+    Sem dados salvos, ou com `force=True`, a requisição aguarda o scraping, por no
+    máximo `UPSTREAM_LATENCY_BUDGET` segundos (ver `scrape_with_budget`); com o circuito
+    do site aberto, falha ou usa os dados salvos imediatamente. Requisições
+    concorrentes para a mesma (aba, sub-tabela, ano) compartilham um único scraping por
+    meio de `scrape_flight`. A duração total, pela origem dos dados (db, stale, scrape
+    ou error), é exportada em `/metrics`.
 
     Args:
         nome (str): Nome identificador da aba (e da tabela no banco de dados).
@@ -121,36 +655,324 @@ def get_dados_por_aba(
         force (bool, opcional): Se True, ignora o banco de dados local e força scraping direto.
 
     Returns:
-        pd.DataFrame: DataFrame com os dados extraídos ou carregados.
+        tuple[list[dict], Optional[float]]: Registros no formato de resposta da API e o
+        timestamp Unix em que foram obtidos da Embrapa (None se desconhecido).
 
     Raises:
         RuntimeError: Em caso de falha ao obter os dados, seja por scraping ou por ausência no banco de dados.
     """
+    key = (nome, sub_table, year)
+    start = time.perf_counter()
+    source = "error"
+    try:
+        if force:
+            try:
+                records = await scrape_with_budget(nome, url, sub_table, year)
+            except Exception as e:
+                ic(f"[force={force}] Erro ao acessar site da Embrapa: {e}")
+                raise RuntimeError(
+                    f"Falha ao obter dados da aba '{nome}' (modo forçado)."
+                )
+            source = "scrape"
+            return records, time.time()
 
-    if force:
         try:
-            html = fetch_html_from_url(url)
-            df = parse_first_table(html)
-            save_data_in_db(df=df, table=nome, year=year, sub_table=sub_table)
-            return df
+            with observe_stage("load", nome, sub_table):
+                pending = store_writer.pending_records(nome, sub_table, year)
+                if pending is not None:
+                    records, scraped_at = response_records(pending[0], nome), pending[1]
+                else:
+                    records = await run_in_threadpool(
+                        load_records_from_db, table=nome, year=year, sub_table=sub_table
+                    )
+                    scraped_at = await run_in_threadpool(
+                        get_partition_scraped_at, table=nome, sub_table=sub_table, year=year
+                    )
         except Exception as e:
-            ic(f"[force={force}] Erro ao acessar site da Embrapa: {e}")
-            raise RuntimeError(f"Falha ao obter dados da aba '{nome}' (modo forçado).")
+            ic(
+                f"Dados para {nome}_{sub_table}_{year} não encontrados no banco de dados: {e}"
+            )
+            try:
+                records = await scrape_with_budget(nome, url, sub_table, year)
+            except Exception as e:
+                ic(f"Erro: {e}")
+                raise RuntimeError(f"Dados da aba '{nome}' indisponíveis no momento.")
+            source = "scrape"
+            return records, time.time()
+
+        state = get_policy(nome).state(data_age(scraped_at))
+        if state == EXPIRED and not refresh_backoff_active(key):
+            try:
+                records = await scrape_with_budget(nome, url, sub_table, year)
+                _refresh_failures.pop(key, None)
+                source = "scrape"
+                return records, time.time()
+            except Exception as e:
+                ic(f"Dados de {nome}_{sub_table}_{year} expirados e Embrapa indisponível: {e}")
+                _refresh_failures[key] = time.monotonic()
+        elif state == STALE:
+            schedule_refresh(nome, url, sub_table, year)
+
+        source = "db" if state == FRESH else "stale"
+        return records, scraped_at
+    finally:
+        DADOS_POR_ABA_LATENCY.labels(nome, label(sub_table), source).observe(
+            time.perf_counter() - start
+        )
 
-    try:
-        return load_data_from_db(table=nome, year=year, sub_table=sub_table)
-    except Exception as e:
-        ic(
-            f"Dados para {nome}_{sub_table}_{year} não encontrados no banco de dados: {e}"
+
+async def get_dados_por_aba(
+    nome: str, url: str, sub_table: str = None, year: int = None, force: bool = False
+) -> list[dict]:
+    """
+    Obtém os dados de uma aba específica do site da Embrapa com fallback para o banco de dados local.
+
+    Os dados salvos são servidos de acordo com a política de frescor da aba; ver
+    `get_dados_por_aba_com_idade`, que também informa a idade dos dados.
+
+    Args:
+        nome (str): Nome identificador da aba (e da tabela no banco de dados).
+        url (str): URL da aba no site da Embrapa.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano para filtrar os dados (se aplicável).
+        force (bool, opcional): Se True, ignora o banco de dados local e força scraping direto.
+
+    Returns:
+        list[dict]: Registros extraídos ou carregados, já no formato de resposta da API.
+
+    Raises:
+        RuntimeError: Em caso de falha ao obter os dados, seja por scraping ou por ausência no banco de dados.
+    """
+    records, _ = await get_dados_por_aba_com_idade(
+        nome=nome, url=url, sub_table=sub_table, year=year, force=force
+    )
+    return records
+
+
+async def scrape_missing_years(
+    nome: str, years: list[int], sub_table: str = None, budget: float = None
+) -> dict[int, list[dict]]:
+    """
+    Obtém do site da Embrapa, de forma concorrente, os anos ainda não salvos de uma aba.
+
+    A concorrência é limitada pelo semáforo por host do cliente HTTP e cada ano é
+    deduplicado por `scrape_flight`; os dados obtidos são entregues à fila de escrita.
+    Anos que ainda aguardam gravação na fila são usados sem novo scraping.
+
+    Todos os anos são aguardados juntos por no máximo `budget` segundos (ver
+    `scrape_with_budget`): os que não terminarem a tempo contam como indisponíveis,
+    mas continuam em segundo plano e ficam salvos para as próximas requisições.
+
+    Args:
+        nome (str): Nome identificador da aba (e da tabela no banco de dados).
+        years (list[int]): Anos a serem obtidos.
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        budget (float, opcional): Tempo máximo de espera. Padrão é `UPSTREAM_LATENCY_BUDGET`.
+
+    Returns:
+        dict[int, list[dict]]: Registros no formato de resposta da API, por ano.
+
+    Raises:
+        RuntimeError: Se não for possível obter algum dos anos.
+    """
+    if not years:
+        return {}
+
+    scraped = {}
+    for year in years:
+        pending = store_writer.pending_records(nome, sub_table, year)
+        if pending is not None:
+            scraped[year] = response_records(pending[0], nome)
+    years = [year for year in years if year not in scraped]
+    if not years:
+        return scraped
+
+    ic(f"Backfill de {len(years)} ano(s) ausente(s) de {nome}_{sub_table}")
+    results = await asyncio.gather(
+        *(
+            scrape_with_budget(
+                nome,
+                generate_url(table=nome, sub_table=sub_table, year=year),
+                sub_table,
+                year,
+                budget,
+            )
+            for year in years
+        ),
+        return_exceptions=True,
+    )
+
+    failed_years = []
+    for year, result in zip(years, results):
+        if isinstance(result, BaseException):
+            ic(f"Erro ao obter {nome}_{sub_table}_{year}: {result}")
+            failed_years.append(year)
+        else:
+            scraped[year] = result
+    if failed_years:
+        raise RuntimeError(
+            f"Dados da aba '{nome}' indisponíveis no momento para os anos {failed_years}."
         )
+    return scraped
+
+
+async def wait_for_writes(nome: str, keys: list[tuple]) -> None:
+    """
+    Aguarda, por no máximo `STORE_WRITE_TIMEOUT` segundos, a gravação de partições
+    entregues à fila de escrita.
+
+    Args:
+        nome (str): Nome identificador da aba.
+        keys (list[tuple]): Chaves (aba, sub-tabela, ano) das partições.
+
+    Raises:
+        WriteFailedError: Se a gravação de alguma das partições esgotou as tentativas.
+        RuntimeError: Se a gravação não terminar dentro do tempo.
+    """
+    if not await run_in_threadpool(store_writer.wait, keys, STORE_WRITE_TIMEOUT):
+        raise RuntimeError(
+            f"Gravação dos dados da aba '{nome}' não concluída em {STORE_WRITE_TIMEOUT:g}s."
+        )
+
+
+async def ensure_years(
+    nome: str, year_from: int, year_to: int, sub_table: str = None
+) -> None:
+    """
+    Garante que todos os anos de um intervalo estejam salvos no banco de dados,
+    obtendo os ausentes do site da Embrapa concorrentemente e aguardando a gravação
+    deles pela fila de escrita.
+
+    Args:
+        nome (str): Nome identificador da aba (e da tabela no banco de dados).
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+
+    Raises:
+        RuntimeError: Se não for possível obter ou gravar algum dos anos ausentes.
+    """
+    years = await run_in_threadpool(
+        stored_years, table=nome, year_from=year_from, year_to=year_to, sub_table=sub_table
+    )
+    missing = [year for year in range(year_from, year_to + 1) if year not in years]
+    await scrape_missing_years(nome, missing, sub_table)
+    await wait_for_writes(nome, [(nome, sub_table, year) for year in missing])
+
+
+async def ensure_partition(nome: str, sub_table: str = None, year: int = None) -> None:
+    """
+    Garante que uma partição (sub-tabela, ano) esteja salva no banco de dados,
+    fazendo o scraping da página da Embrapa caso ainda não esteja e aguardando a
+    gravação pela fila de escrita.
+
+    Args:
+        nome (str): Nome identificador da aba (e da tabela no banco de dados).
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+        year (int, opcional): Ano dos dados (se aplicável).
+
+    Raises:
+        RuntimeError: Se a partição não estiver salva e o scraping ou a gravação falhar.
+    """
+    if not await run_in_threadpool(
+        partition_exists, table=nome, sub_table=sub_table, year=year
+    ):
+        url = generate_url(table=nome, year=year, sub_table=sub_table)
+        await get_dados_por_aba(nome=nome, url=url, sub_table=sub_table, year=year)
+    elif store_writer.pending_records(nome, sub_table, year) is None:
+        return
+    # A partição está (ou acabou de entrar) na fila de escrita: aguarda chegar ao banco
+    await wait_for_writes(nome, [(nome, sub_table, year)])
+
+
+async def get_series_por_aba(
+    nome: str, year_from: int, year_to: int, sub_table: str = None
+) -> list[dict]:
+    """
+    Obtém os dados de uma aba para um intervalo de anos, em formato longo (com "Ano").
+
+    Todos os anos já salvos são lidos do banco de dados em uma única consulta; os anos
+    ausentes são obtidos do site da Embrapa concorrentemente (ver `scrape_missing_years`).
+
+    Args:
+        nome (str): Nome identificador da aba (e da tabela no banco de dados).
+        year_from (int): Primeiro ano do intervalo (inclusive).
+        year_to (int): Último ano do intervalo (inclusive).
+        sub_table (str, opcional): Nome da sub-tabela (se aplicável).
+
+    Returns:
+        list[dict]: Registros no formato de resposta da API com a chave "Ano", ordenados por ano.
+
+    Raises:
+        RuntimeError: Se não for possível obter algum dos anos ausentes no banco de dados.
+    """
+    records = await run_in_threadpool(
+        load_series_from_db,
+        table=nome,
+        year_from=year_from,
+        year_to=year_to,
+        sub_table=sub_table,
+    )
+    # Anos salvos sem linhas (ex: ainda não publicados) também não são buscados de novo
+    stored = await run_in_threadpool(
+        stored_years, table=nome, year_from=year_from, year_to=year_to, sub_table=sub_table
+    )
+    scraped = await scrape_missing_years(
+        nome,
+        [year for year in range(year_from, year_to + 1) if year not in stored],
+        sub_table,
+    )
+    if not scraped:
+        return records
+
+    for year, year_records in scraped.items():
+        records.extend({**record, "Ano": year} for record in year_records)
+    # sort estável: mantém a ordem original das linhas dentro de cada ano
+    records.sort(key=lambda record: record["Ano"])
+    return records
+
+
+def rebuild_from_archive(tables: Optional[list[str]] = None) -> dict:
+    """
+    Reconstrói o banco de dados a partir do arquivo de páginas brutas, sem acessar a Embrapa.
+
+    Cada página arquivada é extraída novamente com `parse_first_table` e salva na
+    partição (tabela, sub-tabela, ano) registrada nos seus metadados, com o momento
+    original do download como momento do scraping.
+
+    Args:
+        tables (Optional[list[str]]): Tabelas a reconstruir. Padrão é todas.
+
+    Returns:
+        dict: Quantidade de páginas reconstruídas, ignoradas e com falha, e de linhas salvas.
+    """
+    summary = {"rebuilt": 0, "skipped": 0, "failed": 0, "rows": 0}
+    for meta in iter_archive():
+        table = meta.get("table")
+        if table not in TABLE_CODES or (tables and table not in tables):
+            summary["skipped"] += 1
+            continue
+
+        html = read_archived_html(meta["url"])
+        if html is None:
+            summary["failed"] += 1
+            continue
         try:
-            html = fetch_html_from_url(url)
             df = parse_first_table(html)
-            save_data_in_db(df=df, table=nome, year=year, sub_table=sub_table)
-            return df
-        except Exception as e:
-            ic(f"Erro: {e}")
-            raise RuntimeError(f"Dados da aba '{nome}' indisponíveis no momento.")
+            save_data_in_db(
+                df=df,
+                table=table,
+                year=meta.get("year"),
+                sub_table=meta.get("sub_table"),
+                scraped_at=datetime.fromisoformat(meta["fetched_at"]),
+            )
+        except (AttributeError, ValueError) as e:
+            ic(f"Falha ao reconstruir {meta['url']}: {e}")
+            summary["failed"] += 1
+            continue
+        summary["rebuilt"] += 1
+        summary["rows"] += len(df)
+    return summary
 
 
 def str_tables_to_int(str_table: str, sub_table: Optional[str] = None) -> int:
@@ -169,46 +991,14 @@ def str_tables_to_int(str_table: str, sub_table: Optional[str] = None) -> int:
         ValueError: Se o nome da tabela principal ou da sub-tabela for inválido.
     """
 
-    table_mapping = {
-        "producao": 2,
-        "processamento": 3,
-        "comercializacao": 4,
-        "importacao": 5,
-        "exportacao": 6,
-    }
-
-    sub_table_mapping = {
-        "producao": {},
-        "processamento": {
-            "Viníferas": 1,
-            "Americanas e híbridas": 2,
-            "Uvas de mesa": 3,
-            "Sem classificação": 4,
-        },
-        "comercializacao": {},
-        "importacao": {
-            "Vinhos de mesa": 1,
-            "Espumantes": 2,
-            "Uvas frescas": 3,
-            "Uvas passas": 4,
-            "Suco de uva": 5,
-        },
-        "exportacao": {
-            "Vinhos de mesa": 1,
-            "Espumantes": 2,
-            "Uvas frescas": 3,
-            "Suco de uva": 4,
-        },
-    }
-
-    if str_table in table_mapping:
-        int_table = table_mapping[str_table]
+    if str_table in TABLE_CODES:
+        int_table = TABLE_CODES[str_table]
     else:
         raise ValueError(f"Invalid table name: {str_table}")
 
-    if sub_table and str_table in sub_table_mapping:
-        if sub_table in sub_table_mapping[str_table]:
-            int_sub_table = sub_table_mapping[str_table][sub_table]
+    if sub_table and str_table in SUB_TABLE_CODES:
+        if sub_table in SUB_TABLE_CODES[str_table]:
+            int_sub_table = SUB_TABLE_CODES[str_table][sub_table]
         else:
             raise ValueError(
                 f"Invalid sub-table name: {sub_table} for table {str_table}"
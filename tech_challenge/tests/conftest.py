@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Os testes que importam a aplicação usam um DATA_DIR próprio, e não o `data/` do projeto
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="tech_challenge_tests_"))
@@ -0,0 +1,319 @@
+"""
+Servidor HTTP local que imita as páginas do site da Embrapa (vitibrasil.cnpuv.embrapa.br).
+
+As páginas são geradas de forma determinística a partir dos parâmetros `opcao`,
+`subopcao` e `ano`, com a mesma estrutura do site real: tabelas de cabeçalho,
+a tabela `tb_base tb_dados` com itens e sub-itens, valores com "." como separador
+de milhar, células "-" e a linha de total no rodapé.
+
+Com `pages_dir`, páginas gravadas do site real (ver `--record`) são servidas no
+lugar das geradas sempre que houver um arquivo para a URL pedida.
+
+Uso como script:
+    python tech_challenge/tests/fake_embrapa.py --port 8081 [--latency 0.2] [--fail-rate 0.1]
+    python tech_challenge/tests/fake_embrapa.py --pages paginas/  # serve páginas gravadas
+    python tech_challenge/tests/fake_embrapa.py --record paginas/ --years 2022 2023
+
+Uso em testes:
+    server = start_server(port=0)
+    url_prefix = f"http://127.0.0.1:{server.server_port}/index.php?"
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HEADERS = {
+    "opt_02": ["Produto", "Quantidade (L.)"],
+    "opt_03": ["Cultivar", "Quantidade (Kg)"],
+    "opt_04": ["Produto", "Quantidade (L.)"],
+    "opt_05": ["Países", "Quantidade (Kg)", "Valor (US$)"],
+    "opt_06": ["Países", "Quantidade (Kg)", "Valor (US$)"],
+}
+
+ITEMS = {
+    "opt_02": {
+        "VINHO DE MESA": ["Tinto", "Branco", "Rosado"],
+        "VINHO FINO DE MESA (VINIFERA)": ["Tinto", "Branco", "Rosado"],
+        "SUCO": ["Suco de uva integral", "Suco de uva concentrado"],
+        "DERIVADOS": ["Espumante", "Vinagre", "Brandy"],
+    },
+    "opt_03": {
+        "TINTAS": ["Cabernet Sauvignon", "Merlot", "Tannat", "Pinot Noir"],
+        "BRANCAS E ROSADAS": ["Chardonnay", "Moscato Giallo", "Riesling Itálico"],
+    },
+    "opt_04": {
+        "VINHO DE MESA": ["Tinto", "Rosado", "Branco"],
+        "ESPUMANTES": ["Espumante Moscatel", "Espumante"],
+        "SUCO DE UVAS": ["Suco natural", "Suco concentrado"],
+    },
+    "opt_05": [
+        "Alemanha", "Argentina", "Chile", "Espanha", "França", "Itália", "Portugal", "Uruguai"
+    ],
+    "opt_06": [
+        "Alemanha", "China", "Estados Unidos", "Japão", "Paraguai", "Reino Unido", "Rússia"
+    ],
+}
+
+
+# Endereço do site real, usado apenas para gravar páginas com --record
+EMBRAPA_URL_PREFIX = "http://vitibrasil.cnpuv.embrapa.br/index.php?"
+
+# Sub-tabelas (parâmetro `subopcao`) de cada tabela no site da Embrapa
+SUBOPCOES = {
+    "opt_02": [""],
+    "opt_03": ["subopt_01", "subopt_02", "subopt_03", "subopt_04"],
+    "opt_04": [""],
+    "opt_05": ["subopt_01", "subopt_02", "subopt_03", "subopt_04", "subopt_05"],
+    "opt_06": ["subopt_01", "subopt_02", "subopt_03", "subopt_04"],
+}
+
+
+def page_file_name(opcao: str, subopcao: str = "", ano: str = "") -> str:
+    """
+    Nome do arquivo de uma página gravada (ex: "opt_05_subopt_01_2023.html").
+
+    Args:
+        opcao (str): Código da tabela (ex: "opt_05").
+        subopcao (str, opcional): Código da sub-tabela.
+        ano (str, opcional): Ano solicitado.
+
+    Returns:
+        str: Nome do arquivo.
+    """
+    return "_".join(part for part in (opcao, subopcao, str(ano)) if part) + ".html"
+
+
+def record_pages(pages_dir: str, years: list[int], url_prefix: str = EMBRAPA_URL_PREFIX) -> int:
+    """
+    Grava as páginas do site real para serem servidas depois com `pages_dir`.
+
+    Args:
+        pages_dir (str): Pasta de destino.
+        years (list[int]): Anos a gravar, para todas as tabelas e sub-tabelas.
+        url_prefix (str, opcional): Prefixo das URLs do site.
+
+    Returns:
+        int: Quantidade de páginas gravadas.
+    """
+    import httpx
+
+    os.makedirs(pages_dir, exist_ok=True)
+    recorded = 0
+    with httpx.Client(timeout=30) as client:
+        for opcao, subopcoes in SUBOPCOES.items():
+            for subopcao in subopcoes:
+                for ano in years:
+                    params = {"ano": ano, "opcao": opcao}
+                    if subopcao:
+                        params["subopcao"] = subopcao
+                    response = client.get(url_prefix, params=params)
+                    response.raise_for_status()
+                    path = os.path.join(pages_dir, page_file_name(opcao, subopcao, ano))
+                    with open(path, "wb") as f:
+                        f.write(response.content)
+                    recorded += 1
+    return recorded
+
+
+def format_quantity(value: int) -> str:
+    """Formata um inteiro como o site da Embrapa (ex: 1234567 -> "1.234.567")."""
+    return f"{value:,}".replace(",", ".")
+
+
+def generate_rows(opcao: str, subopcao: str, ano: str) -> list[tuple[str, list[str]]]:
+    """
+    Gera as linhas (classe css, células) da tabela de dados de uma página.
+
+    Args:
+        opcao (str): Código da tabela (ex: "opt_02").
+        subopcao (str): Código da sub-tabela (ex: "subopt_01") ou "".
+        ano (str): Ano solicitado ou "".
+
+    Returns:
+        list[tuple[str, list[str]]]: Linhas com a classe css e os textos das células.
+    """
+    rng = random.Random(f"{opcao}|{subopcao}|{ano}")
+    n_values = len(HEADERS[opcao]) - 1
+
+    def values() -> list[str]:
+        return [
+            "-" if rng.random() < 0.1 else format_quantity(rng.randint(0, 50_000_000))
+            for _ in range(n_values)
+        ]
+
+    rows = []
+    items = ITEMS[opcao]
+    if isinstance(items, dict):
+        for category, sub_items in items.items():
+            rows.append(("tb_item", [category, *values()]))
+            for sub_item in sub_items:
+                rows.append(("tb_subitem", [sub_item, *values()]))
+    else:
+        for country in items:
+            rows.append(("", [country, *values()]))
+    return rows
+
+
+def render_page(opcao: str, subopcao: str = "", ano: str = "") -> str:
+    """
+    Renderiza uma página HTML no formato do site da Embrapa.
+
+    Args:
+        opcao (str): Código da tabela (ex: "opt_02").
+        subopcao (str, opcional): Código da sub-tabela (ex: "subopt_01").
+        ano (str, opcional): Ano solicitado.
+
+    Returns:
+        str: Página HTML completa.
+    """
+    header = "".join(f"<th>{name}</th>" for name in HEADERS[opcao])
+    body = "\n".join(
+        "<tr>"
+        + "".join(
+            f'<td class="{css}">\n\t\t\t\t{cell}\n\t\t\t</td>'
+            if css
+            else f"<td>{cell}</td>"
+            for cell in cells
+        )
+        + "</tr>"
+        for css, cells in generate_rows(opcao, subopcao, ano)
+    )
+    total = "".join("<td>-</td>" for _ in HEADERS[opcao][1:])
+    return f"""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Banco de dados de uva, vinho e derivados</title></head>
+<body>
+<table class="tb_base tb_header no_print"><tr><td><img src="logo.png"> Vitibrasil</td></tr></table>
+<table class="tb_base tb_controle"><tr><td>
+<button class="btn_opt" value="opt_02">Produção</button>
+<p class="text_center">Ano: [{ano or "2023"}] <input type="number" name="ano" min="1970" max="2024"></p>
+</td></tr></table>
+<table class="tb_base tb_dados">
+<thead><tr>{header}</tr></thead>
+<tbody>
+{body}
+</tbody>
+<tfoot class="tb_total"><tr><td>Total</td>{total}</tr></tfoot>
+</table>
+<div class="footer">Embrapa Uva e Vinho</div>
+</body>
+</html>
+"""
+
+
+class FakeEmbrapaHandler(BaseHTTPRequestHandler):
+    """Responde às URLs `index.php?opcao=...&subopcao=...&ano=...`."""
+
+    latency = 0.0
+    fail_rate = 0.0
+    pages_dir = None
+    etag = False
+    hits = 0
+    _lock = threading.Lock()
+
+    def do_GET(self):
+        with self._lock:
+            type(self).hits += 1
+        query = parse_qs(urlparse(self.path).query)
+        opcao = query.get("opcao", ["opt_02"])[0]
+
+        if self.latency:
+            threading.Event().wait(self.latency)
+        if opcao not in HEADERS or random.random() < self.fail_rate:
+            self.send_error(503 if opcao in HEADERS else 404)
+            return
+
+        subopcao, ano = query.get("subopcao", [""])[0], query.get("ano", [""])[0]
+        recorded = (
+            os.path.join(self.pages_dir, page_file_name(opcao, subopcao, ano))
+            if self.pages_dir
+            else None
+        )
+        if recorded and os.path.exists(recorded):
+            with open(recorded, "rb") as f:
+                page = f.read()
+        else:
+            page = render_page(opcao, subopcao, ano).encode("utf-8")
+        etag = f'"{hashlib.sha256(page).hexdigest()[:16]}"'
+        if self.etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+    port: int = 0,
+    latency: float = 0.0,
+    fail_rate: float = 0.0,
+    pages_dir: str = None,
+    etag: bool = False,
+) -> ThreadingHTTPServer:
+    """
+    Inicia o servidor em uma thread daemon.
+
+    Args:
+        port (int, opcional): Porta local (0 escolhe uma porta livre). Padrão é 0.
+        latency (float, opcional): Atraso artificial por resposta, em segundos.
+        fail_rate (float, opcional): Fração das requisições respondidas com 503.
+        pages_dir (str, opcional): Pasta com páginas gravadas, servidas no lugar das geradas.
+        etag (bool, opcional): Se True, envia `ETag` e responde 304 a `If-None-Match`.
+
+    Returns:
+        ThreadingHTTPServer: Servidor em execução; use `server.shutdown()` para parar.
+    """
+    handler = type(
+        "Handler",
+        (FakeEmbrapaHandler,),
+        {
+            "latency": latency,
+            "fail_rate": fail_rate,
+            "pages_dir": pages_dir,
+            "etag": etag,
+            "hits": 0,
+        },
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Servidor local que imita o site da Embrapa."
+    )
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--pages", help="Pasta com páginas gravadas.")
+    parser.add_argument("--etag", action="store_true", help="Envia ETag e responde 304.")
+    parser.add_argument("--record", help="Grava as páginas do site real nesta pasta e sai.")
+    parser.add_argument("--years", type=int, nargs="*", default=[2023])
+    args = parser.parse_args()
+
+    if args.record:
+        print(f"{record_pages(args.record, args.years)} página(s) gravada(s) em {args.record}")
+        raise SystemExit(0)
+
+    server = start_server(args.port, args.latency, args.fail_rate, args.pages, args.etag)
+    print(f"Servidor Embrapa de testes em http://127.0.0.1:{server.server_port}/index.php?")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,64 @@
+import asyncio
+import os
+
+import pytest
+
+from tech_challenge.services.write_queue import store_writer
+from tech_challenge.utils import scraper
+from tech_challenge.utils.archive import archive_paths, read_archive_meta
+from tech_challenge.utils.db import get_dataset_version
+from tests.fake_embrapa import start_server
+
+YEAR = 2093
+
+
+@pytest.fixture
+def embrapa(monkeypatch):
+    """Sobe o site falso com ETag e aponta o scraper para ele."""
+    server = start_server(etag=True)
+    monkeypatch.setattr(
+        scraper, "URL_PREFIX", f"http://127.0.0.1:{server.server_port}/index.php?"
+    )
+    yield server.RequestHandlerClass
+    server.shutdown()
+
+
+def scrape(url: str) -> list[dict]:
+    async def run():
+        try:
+            return await scraper.scrape_aba("processamento", url, "Viníferas", YEAR)
+        finally:
+            await scraper.close_http_client()
+
+    records = asyncio.run(run())
+    assert store_writer.wait(timeout=10)
+    return records
+
+
+def test_unchanged_page_reuses_archive(embrapa):
+    """
+    Uma resposta 304, ou uma resposta 200 com o mesmo hash de conteúdo, reaproveita a
+    página arquivada e os dados salvos: o arquivo não é regravado e a versão da
+    tabela não muda.
+    """
+    url = scraper.generate_url("processamento", sub_table="Viníferas", year=YEAR)
+    html_path, _ = archive_paths(url)
+
+    records = scrape(url)
+    assert records
+    version = get_dataset_version("processamento")
+    archived = os.stat(html_path).st_mtime_ns
+    assert read_archive_meta(url)["etag"]
+
+    # 304: o site confirma o ETag enviado em If-None-Match
+    assert scrape(url) == records
+    assert embrapa.hits == 2
+    assert get_dataset_version("processamento") == version
+    assert os.stat(html_path).st_mtime_ns == archived
+
+    # 200 sem validadores, com a mesma página: o hash do conteúdo não mudou
+    embrapa.etag = False
+    assert scrape(url) == records
+    assert embrapa.hits == 3
+    assert get_dataset_version("processamento") == version
+    assert os.stat(html_path).st_mtime_ns == archived
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from tech_challenge.main import app
+from tech_challenge.services import auth
+from tech_challenge.services.auth import TokenCache, create_access_token, token_cache, verify_token
+
+
+def bearer(token) -> dict:
+    if isinstance(token, bytes):
+        token = token.decode()
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.parametrize("path", ["/stats", "/metrics"])
+def test_monitoring_routes_require_token(path, monkeypatch):
+    """
+    /stats e /metrics exigem token, como as rotas de dados, exceto para os IPs liberados.
+    """
+    client = TestClient(app)
+    assert client.get(path).status_code in (401, 403)
+    assert client.get(path, headers=bearer("invalido")).status_code == 401
+    assert client.get(path, headers=bearer(create_access_token({"sub": "u"}))).status_code == 200
+
+    monkeypatch.setattr(auth, "MONITORING_ALLOWED_IPS", {"testclient"})
+    assert client.get(path).status_code == 200
+
+
+def test_token_cache_drops_expired_entries():
+    """Uma entrada do cache vale só até o `exp` do token."""
+    cache = TokenCache()
+    cache.set("token", {"sub": "u", "exp": time.time() + 0.05})
+    assert cache.get("token") == {"sub": "u", "exp": pytest.approx(time.time(), abs=1)}
+
+    time.sleep(0.1)
+    assert cache.get("token") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cached_token_is_rejected_after_exp():
+    """
+    Um token aceito (e guardado no cache) volta a ser decodificado depois do `exp`
+    e é recusado como expirado.
+    """
+    token = create_access_token({"sub": "u"}, expires_delta=timedelta(seconds=1))
+    if isinstance(token, bytes):
+        token = token.decode()
+    claims = verify_token(token)
+    assert token_cache.get(token) == claims
+
+    # o PyJWT compara o `exp` com o horário em segundos inteiros
+    time.sleep(max(0.0, claims["exp"] + 1 - time.time()) + 0.1)
+    expirations = token_cache.stats()["expirations"]
+    with pytest.raises(HTTPException) as error:
+        verify_token(token)
+    assert error.value.status_code == 401
+    assert error.value.detail == "Token expirado"
+    assert token_cache.stats()["expirations"] == expirations + 1
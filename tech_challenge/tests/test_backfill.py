@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from tests.fake_embrapa import start_server
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+@pytest.fixture(scope="module")
+def fake_embrapa():
+    """Sobe o servidor local que imita o site da Embrapa."""
+    server = start_server()
+    yield f"http://127.0.0.1:{server.server_port}/index.php?"
+    server.shutdown()
+
+
+def run_backfill(data_dir, base_url, *args):
+    env = {**os.environ, "PYTHONPATH": SRC_DIR, "DATA_DIR": str(data_dir)}
+    return subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "tech_challenge.scripts.backfill",
+            "--base-url",
+            base_url,
+            "--rate",
+            "0",
+            *args,
+        ],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+
+def test_backfill_carrega_e_retoma(tmp_path, fake_embrapa):
+    """O backfill carrega todas as partições e, ao ser executado de novo, ignora as já carregadas."""
+    args = ("--tables", "producao", "exportacao", "--year-from", "2020", "--year-to", "2021")
+
+    first = run_backfill(tmp_path, fake_embrapa, *args)
+    assert first.returncode == 0, first.stderr
+    assert "ok=10 ignoradas=0 falhas=0" in first.stdout
+
+    with sqlite3.connect(tmp_path / "vitivinicultura.db") as db:
+        assert db.execute("SELECT COUNT(DISTINCT year) FROM producao").fetchone() == (2,)
+        assert db.execute("SELECT COUNT(DISTINCT sub_table) FROM exportacao").fetchone() == (4,)
+
+    second = run_backfill(tmp_path, fake_embrapa, *args)
+    assert second.returncode == 0, second.stderr
+    assert "ok=0 ignoradas=10 falhas=0" in second.stdout
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from tech_challenge.services.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    embrapa_breaker,
+)
+from tech_challenge.utils import scraper
+from tests.fake_embrapa import start_server
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """
+    O circuito abre após o limite de falhas seguidas, recusa chamadas enquanto aberto
+    e, passado o tempo de espera, libera uma única chamada de teste que o fecha.
+    """
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_cancelled_probe_releases_half_open_slot(monkeypatch):
+    """
+    Uma chamada de teste cancelada não conta como falha: o circuito continua
+    meio-aberto e a próxima chamada pode fazer o teste.
+    """
+    server = start_server(latency=1.0)
+    url = f"http://127.0.0.1:{server.server_port}/index.php?opcao=opt_02"
+    monkeypatch.setattr(embrapa_breaker, "reset_timeout", 0.0)
+    for _ in range(embrapa_breaker.failure_threshold):
+        embrapa_breaker.record_failure()
+    failures = embrapa_breaker.stats()["consecutive_failures"]
+
+    async def run():
+        probe = asyncio.ensure_future(scraper.request_upstream(url))
+        await asyncio.sleep(0.1)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await scraper.close_http_client()
+
+    try:
+        asyncio.run(run())
+        assert embrapa_breaker.state == HALF_OPEN
+        assert embrapa_breaker.stats()["consecutive_failures"] == failures
+        embrapa_breaker.before_call()
+    finally:
+        embrapa_breaker.reset()
+        server.shutdown()
+
+
+def test_local_error_does_not_count_as_upstream_failure(monkeypatch):
+    """
+    Um erro que não vem do transporte HTTP não conta como falha do site: o circuito
+    continua meio-aberto e a próxima chamada pode fazer o teste.
+    """
+
+    class BrokenClient:
+        async def get(self, url, headers=None):
+            raise ValueError("erro local")
+
+    monkeypatch.setattr(scraper, "get_http_client", lambda: BrokenClient())
+    monkeypatch.setattr(embrapa_breaker, "reset_timeout", 0.0)
+    for _ in range(embrapa_breaker.failure_threshold):
+        embrapa_breaker.record_failure()
+    failures = embrapa_breaker.stats()["consecutive_failures"]
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(scraper.request_upstream("http://127.0.0.1/index.php"))
+        assert embrapa_breaker.state == HALF_OPEN
+        assert embrapa_breaker.stats()["consecutive_failures"] == failures
+        embrapa_breaker.before_call()
+    finally:
+        embrapa_breaker.reset()
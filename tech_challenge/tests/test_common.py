@@ -0,0 +1,38 @@
+import pandas as pd
+
+from tech_challenge.utils.common import parse_quantity, parse_quantity_column
+
+VALUES = [
+    "1.234.567",
+    " 42 ",
+    "-",
+    "",
+    "nan",
+    "NaN",
+    "1,5",
+    "abc",
+    "-10",
+    None,
+    float("nan"),
+    7,
+    7.9,
+    True,
+]
+
+
+def test_parse_quantity_column_matches_parse_quantity():
+    """
+    A versão vetorizada deve produzir os mesmos valores de `parse_quantity`.
+    """
+    result = parse_quantity_column(pd.Series(VALUES, dtype=object))
+    expected = [parse_quantity(value) for value in VALUES]
+    assert [None if pd.isna(value) else int(value) for value in result] == expected
+
+
+def test_parse_quantity_column_numeric_dtype():
+    """
+    Colunas já numéricas são truncadas para inteiros anuláveis.
+    """
+    result = parse_quantity_column(pd.Series([1.9, None, 3.0]))
+    assert str(result.dtype) == "Int64"
+    assert result.tolist() == [1, pd.NA, 3]
@@ -0,0 +1,36 @@
+import pandas as pd
+
+from tech_challenge.utils.db import (
+    load_records_from_db,
+    partition_exists,
+    save_data_in_db,
+    stored_years,
+)
+
+
+def test_empty_partition_counts_as_stored():
+    """
+    Uma página sem linhas (ex: ano ainda não publicado) fica registrada como salva e
+    é lida como lista vazia, em vez de ser obtida da Embrapa a cada requisição.
+    """
+    empty = pd.DataFrame(columns=["Produto", "Quantidade (L.)"])
+    save_data_in_db(empty, table="producao", year=2099)
+
+    assert partition_exists("producao", year=2099)
+    assert load_records_from_db("producao", year=2099) == []
+    assert 2099 in stored_years("producao", year_from=2098, year_to=2099)
+    assert 2098 not in stored_years("producao", year_from=2098, year_to=2099)
+
+
+def test_saving_partition_twice_keeps_one_copy():
+    """
+    Salvar a mesma partição duas vezes substitui as linhas em vez de duplicá-las.
+    """
+    df = pd.DataFrame({"Produto": ["VINHO DE MESA", "SUCO"], "Quantidade (L.)": ["1.000", "2"]})
+    save_data_in_db(df, table="producao", year=2097)
+    save_data_in_db(df, table="producao", year=2097)
+
+    assert load_records_from_db("producao", year=2097) == [
+        {"Produto": "VINHO DE MESA", "Quantidade (L.)": 1000},
+        {"Produto": "SUCO", "Quantidade (L.)": 2},
+    ]
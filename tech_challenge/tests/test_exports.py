@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from tech_challenge.utils import exports
+from tech_challenge.utils.db import (
+    get_dataset_version,
+    load_series_from_db,
+    read_snapshot,
+    save_data_in_db,
+)
+
+
+def save_year(year: int, quantity: str) -> None:
+    df = pd.DataFrame({"Produto": ["VINHO DE MESA"], "Quantidade (L.)": [quantity]})
+    save_data_in_db(df, table="comercializacao", year=year)
+
+
+def test_read_snapshot_ignores_later_commits():
+    """
+    Dentro de `read_snapshot`, a versão e os dados continuam os do início da leitura,
+    mesmo que uma escrita seja confirmada no meio dela.
+    """
+    save_year(2095, "1")
+    with read_snapshot() as connection:
+        version = get_dataset_version("comercializacao", connection)
+        save_year(2095, "2")
+        assert get_dataset_version("comercializacao", connection) == version
+        rows = load_series_from_db("comercializacao", 2095, 2095, connection=connection)
+        assert rows[0]["Quantidade (L.)"] == 1
+
+    assert get_dataset_version("comercializacao") > version
+    assert load_series_from_db("comercializacao", 2095, 2095)[0]["Quantidade (L.)"] == 2
+
+
+def test_export_keeps_recent_versions(tmp_path, monkeypatch):
+    """
+    Uma nova versão gera um novo arquivo sem remover as versões recentes, que podem
+    ainda estar sendo enviadas; só as além de `EXPORT_KEEP_VERSIONS` são removidas.
+    """
+    monkeypatch.setattr(exports, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(exports, "EXPORT_KEEP_VERSIONS", 2)
+
+    paths = []
+    for quantity in ("10", "20", "30"):
+        save_year(2094, quantity)
+        paths.append(exports.write_export("comercializacao", 2094, 2094, "parquet"))
+
+    assert len(set(paths)) == 3
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths[1:])
+    assert pq.read_table(paths[-1]).column("Quantidade (L.)").to_pylist() == [30]
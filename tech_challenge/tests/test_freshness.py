@@ -0,0 +1,15 @@
+from tech_challenge.services.freshness import EXPIRED, FRESH, STALE, FreshnessPolicy
+
+
+def test_freshness_policy_states():
+    """
+    Dados passam de frescos a desatualizados no TTL suave e a expirados no TTL rígido;
+    idade desconhecida é tratada como desatualizada (servida e atualizada em segundo plano).
+    """
+    policy = FreshnessPolicy(soft_ttl=60, hard_ttl=3600)
+    assert policy.state(0) == FRESH
+    assert policy.state(59.9) == FRESH
+    assert policy.state(60) == STALE
+    assert policy.state(3599) == STALE
+    assert policy.state(3600) == EXPIRED
+    assert policy.state(None) == STALE
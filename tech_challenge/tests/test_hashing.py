@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tech_challenge.main import app
+from tech_challenge.routes import login, register
+from tech_challenge.services.hashing import HashingBusyError, PasswordHasher
+
+
+def test_full_queue_rejects_and_failures_are_counted():
+    """
+    Com a fila cheia, a chamada seguinte falha na hora; erros do bcrypt contam como
+    falhas, não como operações concluídas.
+    """
+    hasher = PasswordHasher(workers=1, max_pending=2, nice=0)
+    release = threading.Event()
+
+    async def run():
+        blocked = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HashingBusyError):
+            await hasher.verify("senha", "hash")
+        release.set()
+        await asyncio.gather(*blocked)
+        with pytest.raises(ValueError):
+            await hasher.verify("senha", "não é um hash bcrypt")
+
+    asyncio.run(run())
+    hasher.shutdown()
+    stats = hasher.stats()
+    assert stats["pending"] == 0
+    assert stats["completed"] == 2
+    assert stats["failed"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_full_queue_returns_429(monkeypatch):
+    """/login e /register respondem 429 com Retry-After quando a fila de hashes está cheia."""
+    client = TestClient(app)
+    credentials = {"username": "fila_cheia", "password": "senha"}
+    assert client.post("/register", json=credentials).status_code == 200
+
+    busy = PasswordHasher(workers=1, max_pending=0, nice=0)
+    monkeypatch.setattr(login, "password_hasher", busy)
+    monkeypatch.setattr(register, "password_hasher", busy)
+
+    for path, body in (
+        ("/login", credentials),
+        ("/register", {"username": "outro", "password": "senha"}),
+    ):
+        response = client.post(path, json=body)
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+    assert busy.stats()["rejected"] == 2
+    busy.shutdown()
@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from tech_challenge.main import app
+from tech_challenge.services.auth import create_access_token
+from tech_challenge.utils.db import decode_cursor, encode_cursor, save_data_in_db
+from tests.test_auth import bearer
+
+YEAR = 1971
+
+RECORDS = [
+    {"Produto": "VINHO DE MESA", "Quantidade (L.)": 500},
+    {"Produto": "VINHO FINO DE MESA (VINIFERA)", "Quantidade (L.)": 20},
+    {"Produto": "SUCO", "Quantidade (L.)": 300},
+    {"Produto": "VINHO ESPECIAL", "Quantidade (L.)": 4},
+    {"Produto": "DERIVADOS", "Quantidade (L.)": 1000},
+]
+
+
+def save_records():
+    df = pd.DataFrame(
+        {
+            "Produto": [record["Produto"] for record in RECORDS],
+            "Quantidade (L.)": [str(record["Quantidade (L.)"]) for record in RECORDS],
+        }
+    )
+    save_data_in_db(df, table="producao", year=YEAR)
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Cliente autenticado, com uma partição de produção já salva."""
+    save_records()
+    client = TestClient(app)
+    client.headers.update(bearer(create_access_token({"sub": "u"})))
+    return client
+
+
+def test_cursor_round_trip():
+    """O cursor é opaco e devolve o id e a versão codificados."""
+    assert decode_cursor(encode_cursor(12345, 678)) == (12345, 678)
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(1)[::-1])
+
+
+def test_pages_follow_next_cursor(client):
+    """
+    Seguindo o cabeçalho X-Next-Cursor, as páginas trazem todos os registros uma
+    única vez e na ordem; a última página não tem cursor.
+    """
+    pages = []
+    params = {"year": YEAR, "limit": 2}
+    while True:
+        response = client.get("/producao", params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [record for page in pages for record in page] == RECORDS
+
+
+@pytest.mark.parametrize("cursor", ["!!!", encode_cursor(1)[::-1], "aWQ6YWJj"])
+def test_invalid_cursor_returns_400(client, cursor):
+    """Um cursor que não foi gerado pela API é recusado com 400."""
+    response = client.get("/producao", params={"year": YEAR, "limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido."
+
+
+def test_cursor_expires_when_partition_is_rewritten(client):
+    """
+    A regravação da partição troca os ids das linhas: um cursor anterior a ela é
+    recusado com 400 em vez de pular ou repetir registros, e a paginação recomeçada
+    traz todos os registros.
+    """
+    response = client.get("/producao", params={"year": YEAR, "limit": 2})
+    cursor = response.headers["X-Next-Cursor"]
+
+    save_records()
+
+    response = client.get("/producao", params={"year": YEAR, "limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Cursor expirado")
+
+    response = client.get("/producao", params={"year": YEAR, "limit": 2})
+    assert response.json() == RECORDS[:2]
+    response = client.get(
+        "/producao",
+        params={"year": YEAR, "limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert response.json() == RECORDS[2:4]
+
+
+def test_fields_and_filters(client):
+    """Projeção e filtros são aplicados no SQL e podem ser combinados."""
+    response = client.get("/producao", params={"year": YEAR, "fields": "Produto"})
+    assert response.json() == [{"Produto": record["Produto"]} for record in RECORDS]
+
+    response = client.get("/producao", params={"year": YEAR, "Produto": "SUCO"})
+    assert response.json() == [RECORDS[2]]
+
+    response = client.get(
+        "/producao", params={"year": YEAR, "prefix": "VINHO", "min_quantidade": 10}
+    )
+    assert response.json() == RECORDS[:2]
+
+    response = client.get("/producao", params={"year": YEAR, "fields": "Inexistente"})
+    assert response.status_code == 400
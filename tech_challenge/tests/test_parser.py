@@ -0,0 +1,64 @@
+import glob
+import os
+
+import pandas as pd
+import pytest
+from bs4 import BeautifulSoup
+
+from tech_challenge.utils.scraper import find_data_table, parse_first_table
+from tests.fake_embrapa import SUBOPCOES, render_page
+
+# Pasta com páginas gravadas do site real (`fake_embrapa.py --record`), verificadas junto com as geradas
+RECORDED_PAGES_DIR = os.getenv("EMBRAPA_PAGES_DIR")
+
+
+def parse_first_table_bs4(html: str) -> pd.DataFrame:
+    """Implementação anterior de `parse_first_table`, baseada no BeautifulSoup."""
+    soup = BeautifulSoup(html, "html.parser")
+    html_table = soup.find("table", {"class": "tb_base tb_dados"})
+
+    rows = html_table.find_all("tr")
+    data = []
+
+    for row in rows:
+        cells = row.find_all(["th", "td"])
+        cells_text = [cell.get_text(strip=True) for cell in cells]
+        data.append(cells_text)
+
+    return pd.DataFrame(data[1:], columns=data[0])
+
+
+def embrapa_pages() -> list:
+    pages = [
+        pytest.param(render_page(opcao, subopcao, "2023"), id=f"{opcao}{subopcao}")
+        for opcao, subopcoes in SUBOPCOES.items()
+        for subopcao in subopcoes
+    ]
+    if RECORDED_PAGES_DIR:
+        for path in sorted(glob.glob(os.path.join(RECORDED_PAGES_DIR, "*.html"))):
+            with open(path, encoding="utf-8", errors="replace") as f:
+                pages.append(pytest.param(f.read(), id=os.path.basename(path)))
+    return pages
+
+
+@pytest.mark.parametrize("html", embrapa_pages())
+def test_parser_matches_beautifulsoup(html):
+    """
+    O parser em streaming (lxml) encontra a mesma tabela e produz o mesmo DataFrame
+    que a implementação anterior com BeautifulSoup.
+    """
+    table = find_data_table(html)
+    assert table is not None
+    assert " ".join(table.get("class").split()) == "tb_base tb_dados"
+
+    pd.testing.assert_frame_equal(parse_first_table(html), parse_first_table_bs4(html))
+
+
+def test_parser_without_data_table():
+    """Sem a tabela de dados, as duas implementações falham com AttributeError."""
+    html = "<html><body><table class='tb_base'><tr><td>1</td></tr></table></body></html>"
+    assert find_data_table(html) is None
+    with pytest.raises(AttributeError):
+        parse_first_table(html)
+    with pytest.raises(AttributeError):
+        parse_first_table_bs4(html)
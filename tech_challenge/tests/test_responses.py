@@ -0,0 +1,35 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from tech_challenge.utils.responses import build_payload, dataset_response
+
+RECORDS = [{"Produto": "VINHO DE MESA", "Quantidade (L.)": 1000}]
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    payload = build_payload(RECORDS)
+
+    @app.get("/dados")
+    def dados(request: Request):
+        return dataset_response(request, payload)
+
+    return TestClient(app)
+
+
+def test_matching_if_none_match_returns_304_without_body():
+    """
+    A resposta traz um ETag; repetida com `If-None-Match` igual, volta 304 sem corpo.
+    """
+    client = make_client()
+    response = client.get("/dados")
+    assert response.status_code == 200
+    assert response.json() == RECORDS
+    etag = response.headers["etag"]
+
+    cached = client.get("/dados", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    assert client.get("/dados", headers={"If-None-Match": '"outro"'}).status_code == 200
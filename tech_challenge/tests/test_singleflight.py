@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from tech_challenge.services.singleflight import SingleFlight
+from tech_challenge.utils import scraper
+from tests.fake_embrapa import start_server
+
+
+@pytest.fixture
+def slow_embrapa(monkeypatch):
+    """Sobe o site falso com atraso e aponta o scraper para ele."""
+    server = start_server(latency=0.2)
+    monkeypatch.setattr(
+        scraper, "URL_PREFIX", f"http://127.0.0.1:{server.server_port}/index.php?"
+    )
+    yield server.RequestHandlerClass
+    server.shutdown()
+
+
+def test_do_async_runs_once_per_key():
+    """
+    Corrotinas concorrentes com a mesma chave compartilham uma única execução.
+    """
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    async def run():
+        return await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(10)))
+
+    assert asyncio.run(run()) == [1] * 10
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+
+def test_concurrent_scrapes_hit_upstream_once(slow_embrapa):
+    """
+    Requisições concorrentes da mesma partição fazem um único acesso ao site da Embrapa.
+    """
+    url = scraper.generate_url("producao", year=2096)
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(
+                    scraper.scrape_with_budget("producao", url, year=2096, budget=10)
+                    for _ in range(10)
+                )
+            )
+        finally:
+            await scraper.close_http_client()
+
+    results = asyncio.run(run())
+    assert slow_embrapa.hits == 1
+    assert results[0]
+    assert all(result == results[0] for result in results)
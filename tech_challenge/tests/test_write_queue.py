@@ -0,0 +1,151 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from tech_challenge.services import write_queue
+from tech_challenge.services.write_queue import WriteBehindQueue, WriteFailedError, store_writer
+from tech_challenge.utils import scraper
+from tests.fake_embrapa import start_server
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+SUBMIT_AND_CRASH = """
+import os
+from tech_challenge.services.write_queue import store_writer
+store_writer.batch_window = 60
+store_writer.submit(
+    "producao", [{"Produto": "VINHO DE MESA", "Quantidade_L": 10}], year=2001
+)
+os._exit(0)
+"""
+
+RECOVER = """
+from tech_challenge.services.write_queue import store_writer
+store_writer.start()
+assert store_writer.shutdown()
+print(store_writer.stats()["recovered"])
+"""
+
+
+def run_python(data_dir, code):
+    env = {**os.environ, "PYTHONPATH": SRC_DIR, "DATA_DIR": str(data_dir)}
+    return subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=60
+    )
+
+
+def test_pending_write_survives_crash(tmp_path):
+    """
+    Uma escrita entregue à fila e interrompida pela queda do processo fica registrada
+    em disco e é gravada no banco quando a fila é iniciada novamente.
+    """
+    result = run_python(tmp_path, SUBMIT_AND_CRASH)
+    assert result.returncode == 0, result.stderr
+    assert os.listdir(tmp_path / "write_queue")
+
+    result = run_python(tmp_path, RECOVER)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "1"
+    assert os.listdir(tmp_path / "write_queue") == []
+
+    with sqlite3.connect(tmp_path / "vitivinicultura.db") as connection:
+        rows = connection.execute(
+            "SELECT Produto, Quantidade_L, year FROM producao"
+        ).fetchall()
+    assert rows == [("VINHO DE MESA", 10, 2001)]
+
+
+RECORDS = [{"Produto": "VINHO DE MESA", "Quantidade_L": 10}]
+
+
+def test_failed_batch_is_retried_without_blocking(tmp_path, monkeypatch):
+    """
+    Um lote com falha volta para a fila com horário para a nova tentativa; enquanto
+    isso, as escritas seguintes são gravadas normalmente.
+    """
+    calls = []
+
+    def flaky_save(writes):
+        calls.append([write["year"] for write in writes])
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(write_queue, "save_partitions_in_db", flaky_save)
+    queue = WriteBehindQueue(spool_dir=str(tmp_path), batch_window=0, retry_delay=0.5)
+    try:
+        queue.submit("producao", RECORDS, year=2001)
+        assert not queue.wait([("producao", None, 2001)], timeout=0.2)
+        assert queue.pending_records("producao", year=2001) is not None
+
+        queue.submit("producao", RECORDS, year=2002)
+        assert queue.wait([("producao", None, 2002)], timeout=0.2)
+        assert queue.pending_records("producao", year=2001) is not None
+
+        assert queue.wait([("producao", None, 2001)], timeout=2)
+        assert calls == [[2001], [2002], [2001]]
+        assert queue.stats()["retries"] == 1
+        assert os.listdir(tmp_path) == []
+    finally:
+        queue.shutdown()
+
+
+def test_exhausted_write_fails_wait(tmp_path, monkeypatch):
+    """
+    Esgotadas as tentativas, a partição sai da fila, mas `wait` lança
+    `WriteFailedError` e o arquivo da escrita fica para o próximo início.
+    """
+
+    def failing_save(writes):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(write_queue, "save_partitions_in_db", failing_save)
+    queue = WriteBehindQueue(
+        spool_dir=str(tmp_path), batch_window=0, max_retries=2, retry_delay=0.01
+    )
+    try:
+        queue.submit("producao", RECORDS, year=2003)
+        with pytest.raises(WriteFailedError, match="producao_2003"):
+            queue.wait([("producao", None, 2003)], timeout=5)
+        assert queue.pending_records("producao", year=2003) is None
+        assert queue.stats()["retries"] == 2
+        assert queue.stats()["failed"] == 1
+        assert len(os.listdir(tmp_path)) == 1
+    finally:
+        queue.shutdown()
+
+
+def test_ensure_partition_raises_when_write_fails(monkeypatch):
+    """
+    Se a gravação da partição obtida da Embrapa falhar, `ensure_partition` lança
+    RuntimeError em vez de seguir para uma leitura sem os dados.
+    """
+    server = start_server()
+    monkeypatch.setattr(
+        scraper, "URL_PREFIX", f"http://127.0.0.1:{server.server_port}/index.php?"
+    )
+    monkeypatch.setattr(store_writer, "max_retries", 0)
+
+    def failing_save(writes):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    async def run():
+        try:
+            await scraper.ensure_partition("comercializacao", year=2092)
+        finally:
+            await scraper.close_http_client()
+
+    try:
+        with monkeypatch.context() as patch:
+            patch.setattr(write_queue, "save_partitions_in_db", failing_save)
+            with pytest.raises(RuntimeError):
+                asyncio.run(run())
+
+        # Uma nova obtenção da partição limpa a falha
+        asyncio.run(run())
+        assert store_writer.stats()["failed_partitions"] == 0
+    finally:
+        server.shutdown()